@@ -0,0 +1,359 @@
+"""Banc d'essai sans terminal : flux PTY enregistrés rejoués dans la chaîne de sortie
+
+Usage :
+    python benchmarks/bench_pipeline.py [--workload NOM ...] [--save FICHIER] [--compare FICHIER]
+    python benchmarks/bench_pipeline.py --record NOM -- commande [arguments...]
+
+Chaque charge est un flux d'octets tel que le PTY le livre : les charges
+synthétiques de bench_vt.py (journal de build, ls coloré, redessins façon
+htop...) et les enregistrements `benchmarks/recordings/*.pty` faits avec
+`--record` (par exemple `--record ls_R -- ls -R --color=always /usr` ou
+`--record top --seconds 5 -- top -d 0.2`), répétés jusqu'à la taille des
+charges synthétiques. Le dépôt fournit `compileall` (journal de
+`python -m compileall -f` sur la bibliothèque standard), `ls_R` (`ls -R -l
+--color=always`) et `top` (redessins plein écran, comme htop).
+
+Le flux passe par le vrai chemin de l'interface : un tube lu par `PtyReader`
+(décodage UTF-8 incrémental), `Screen.feed`, puis une image toutes les
+`--chunks-per-frame` lectures : `display_terminal_output` dans une fausse
+fenêtre curses, avec System Info et Running Processes redessinés à chaque
+image, et `Renderer.flush`. On mesure le débit d'analyse, le nombre d'images,
+le temps de rendu par section (meilleur de `--repeat` rejeux) et, dans une
+seconde passe sous tracemalloc, les allocations. `--save` écrit ces mesures en JSON ; `--compare` relit une
+référence et sort en erreur si une mesure se dégrade de plus de `--tolerance`.
+`benchmarks/baseline.json` est la référence enregistrée avec ces charges :
+
+    python benchmarks/bench_pipeline.py --compare benchmarks/baseline.json
+
+Les mesures dépendent de la machine : une référence se refait (`--save`) sur
+la machine qui sert aux comparaisons.
+"""
+import argparse
+import curses
+import fcntl
+import glob
+import json
+import os
+import platform
+import pty
+import select
+import signal
+import struct
+import sys
+import termios
+import time
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_vt import WORKLOADS as SYNTHETIC_WORKLOADS  # noqa: E402
+from temporalis import app  # noqa: E402
+from temporalis.metrics import Snapshot  # noqa: E402
+from temporalis.procs import ProcessRow  # noqa: E402
+from temporalis.ptyio import PtyReader  # noqa: E402
+from temporalis.render import Panel, Renderer  # noqa: E402
+from temporalis.scrollback import Scrollback  # noqa: E402
+from temporalis.vt import Screen  # noqa: E402
+
+RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+ROWS, COLS = 40, 120  # Taille du terminal simulé (et des enregistrements)
+CHUNK = 4096  # Taille d'une lecture du PTY
+SYNTHETIC_SIZE = 4 << 20  # Taille de chaque charge synthétique
+NOISE_MS = 0.05  # Écart de rendu par image en dessous duquel une différence n'est pas une régression
+
+
+# --- Fausse fenêtre curses ------------------------------------------------
+
+class FakeWindow:
+    """Fenêtre curses en mémoire : assez de l'API pour Panel, TerminalView et Renderer"""
+
+    def __init__(self, height, width):
+        self.height, self.width = height, width
+        self.writes = 0  # Appels qui écrivent des cellules
+        self.cells = 0  # Cellules écrites
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        if not (0 <= y < self.height and 0 <= x < self.width) or x + len(text) > self.width:
+            raise curses.error("addstr hors de la fenêtre")
+        self.writes += 1
+        self.cells += len(text)
+
+    def chgat(self, y, x, count, attr=0):
+        self.writes += 1
+
+    def box(self):
+        self.writes += 1
+
+    def attron(self, attr):
+        pass
+
+    def attroff(self, attr):
+        pass
+
+    def erase(self):
+        self.writes += 1
+
+    def noutrefresh(self):
+        pass
+
+
+class FakeCurses:
+    """Remplace, le temps du banc, les fonctions de curses qui exigent initscr()"""
+
+    PATCHES = {
+        "color_pair": lambda n: n << 8,
+        "init_pair": lambda *args: None,
+        "doupdate": lambda: None,
+        "COLORS": 256,
+        "COLOR_PAIRS": 256,
+    }
+
+    def __enter__(self):
+        self._saved = {name: getattr(curses, name, None) for name in self.PATCHES}
+        for name, value in self.PATCHES.items():
+            setattr(curses, name, value)
+        return self
+
+    def __exit__(self, *exc):
+        for name, value in self._saved.items():
+            if value is None:
+                delattr(curses, name)
+            else:
+                setattr(curses, name, value)
+
+
+class ReplaySession:
+    """Ce que `display_terminal_output` lit d'une session, sans shell"""
+
+    def __init__(self, rows, cols):
+        self.number = 1
+        self.scrollback = Scrollback(app.scrollback_lines)
+        self.screen = Screen(rows, cols, self.scrollback)
+        self.scroll_pos = 0
+        self.search = None
+        self.unseen = False
+        self.exit_status = 0
+        self.program = None
+        self.fast_forward = False
+
+
+# --- Charges --------------------------------------------------------------
+
+def load_workloads(names=None):
+    """{nom: octets} : charges synthétiques puis enregistrements, répétés jusqu'à la même taille"""
+    workloads = {name: make(SYNTHETIC_SIZE).encode() for name, make in SYNTHETIC_WORKLOADS.items()}
+    for path in sorted(glob.glob(os.path.join(RECORDINGS, "*.pty"))):
+        with open(path, "rb") as f:
+            data = f.read()
+        # Un enregistrement court ne donnerait qu'une ou deux images : mesures trop bruitées
+        workloads[os.path.splitext(os.path.basename(path))[0]] = data * max(1, SYNTHETIC_SIZE // max(1, len(data)))
+    if names:
+        missing = set(names) - set(workloads)
+        if missing:
+            raise SystemExit(f"charges inconnues : {', '.join(sorted(missing))}")
+        workloads = {name: workloads[name] for name in names}
+    return workloads
+
+
+def record(name, command, seconds=None):
+    """Enregistre la sortie brute de `command` dans un PTY de ROWS x COLS"""
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.environ["TERM"] = "xterm-256color"
+        os.environ["COLUMNS"], os.environ["LINES"] = str(COLS), str(ROWS)
+        os.execvp(command[0], command)
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", ROWS, COLS, 0, 0))
+    deadline = time.monotonic() + seconds if seconds else None
+    chunks = []
+    while deadline is None or time.monotonic() < deadline:
+        ready, _, _ = select.select([fd], [], [], 0.1)
+        if not ready:
+            continue
+        try:
+            chunk = os.read(fd, 65536)
+        except OSError:
+            break
+        if not chunk:
+            break
+        chunks.append(chunk)
+    if deadline is not None:
+        os.kill(pid, signal.SIGTERM)
+    os.waitpid(pid, 0)
+    os.close(fd)
+    os.makedirs(RECORDINGS, exist_ok=True)
+    path = os.path.join(RECORDINGS, name + ".pty")
+    with open(path, "wb") as f:
+        f.write(b"".join(chunks))
+    return path, sum(len(c) for c in chunks)
+
+
+# --- Rejeu ----------------------------------------------------------------
+
+def fake_snapshot(step):
+    """Relevé système synthétique (64 cœurs, 10 minutes d'historique)"""
+    history = array("f", ((i * 7 + step) % 100 for i in range(600)))
+    percpu = array("f", ((i * 13 + step) % 100 for i in range(64)))
+    return Snapshot(time.time(), percpu, history, history, history, array("f", [1.5] * 600), 64, 1.0)
+
+
+def fake_processes(count=2000):
+    return [ProcessRow(pid, 1, f"proc-{pid}", "root", f"/usr/bin/proc-{pid}", (pid * 7) % 100 / 3, pid * 4096)
+            for pid in range(1, count + 1)]
+
+
+def replay(data, chunks_per_frame):
+    """Rejoue `data` dans la chaîne de sortie ; retourne les mesures"""
+    renderer = Renderer(max_fps=1000)  # Sans réacteur : les images sont envoyées par flush()
+    layout = app.compute_layout(ROWS + 3, COLS * 2)
+    output = Panel(FakeWindow(*layout["output"][:2]), "Terminal Output", renderer)
+    system = Panel(FakeWindow(*layout["system_info"][:2]), "System Info", renderer)
+    processes_panel = Panel(FakeWindow(*layout["processes"][:2]), "Running Processes", renderer)
+    session = ReplaySession(output.height, output.width)
+    app.sessions[:] = [session]
+    processes = fake_processes()
+
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    reader = PtyReader(read_fd)
+    parse_time = 0.0
+    render_time = {"terminal_output": 0.0, "system_info": 0.0, "processes": 0.0, "flush": 0.0}
+    frames = 0
+    try:
+        for index, start in enumerate(range(0, len(data), CHUNK)):
+            os.write(write_fd, data[start:start + CHUNK])
+            t0 = time.perf_counter()
+            text, _ = reader.read()
+            session.screen.feed(text)
+            parse_time += time.perf_counter() - t0
+            if (index + 1) % chunks_per_frame:
+                continue
+            frames += 1
+            t0 = time.perf_counter()
+            app.display_terminal_output(output, session)
+            t1 = time.perf_counter()
+            app.display_system_info(system, fake_snapshot(frames))
+            t2 = time.perf_counter()
+            app.display_running_processes(processes_panel, frames % 100, processes)
+            t3 = time.perf_counter()
+            renderer.flush()
+            t4 = time.perf_counter()
+            render_time["terminal_output"] += t1 - t0
+            render_time["system_info"] += t2 - t1
+            render_time["processes"] += t3 - t2
+            render_time["flush"] += t4 - t3
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+    return {
+        "bytes": len(data),
+        "parse_mib_s": round(len(data) / (1 << 20) / parse_time, 2) if parse_time else None,
+        "frames": frames,
+        "render_ms_per_frame": {name: round(total * 1000 / frames, 4) if frames else 0.0
+                                for name, total in render_time.items()},
+        "scrollback_lines": session.scrollback.total,
+    }
+
+
+def best_of(data, chunks_per_frame, repeat):
+    """Meilleur de `repeat` rejeux : débit le plus haut et rendu le plus rapide (le bruit ne fait que ralentir)"""
+    best = replay(data, chunks_per_frame)
+    for _ in range(repeat - 1):
+        result = replay(data, chunks_per_frame)
+        if result["parse_mib_s"] and (best["parse_mib_s"] or 0) < result["parse_mib_s"]:
+            best["parse_mib_s"] = result["parse_mib_s"]
+        for panel, ms in result["render_ms_per_frame"].items():
+            best["render_ms_per_frame"][panel] = min(best["render_ms_per_frame"][panel], ms)
+    return best
+
+
+def measure_allocations(data, chunks_per_frame):
+    """Blocs alloués et pic mémoire pendant un rejeu (passe séparée : tracemalloc ralentit tout)"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    replay(data, chunks_per_frame)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return {"allocated_blocks": allocated, "peak_kib": round(peak / 1024)}
+
+
+# --- Références -----------------------------------------------------------
+
+def regressions(results, baseline, tolerance):
+    """Mesures dégradées de plus de `tolerance` par rapport à la référence"""
+    found = []
+    for name, current in results.items():
+        reference = baseline.get("workloads", {}).get(name)
+        if reference is None:
+            continue
+        if reference.get("parse_mib_s") and current["parse_mib_s"] < reference["parse_mib_s"] * (1 - tolerance):
+            found.append(f"{name}: analyse {current['parse_mib_s']} Mio/s < {reference['parse_mib_s']}")
+        for panel, ms in current["render_ms_per_frame"].items():
+            old = reference.get("render_ms_per_frame", {}).get(panel)
+            if old and ms > old * (1 + tolerance) and ms - old > NOISE_MS:
+                found.append(f"{name}: rendu {panel} {ms} ms > {old} ms")
+        old = reference.get("allocated_blocks")
+        if old and current.get("allocated_blocks", 0) > old * (1 + tolerance):
+            found.append(f"{name}: {current['allocated_blocks']} blocs alloués > {old}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workload", nargs="*", help="charges à rejouer (toutes par défaut)")
+    parser.add_argument("--chunks-per-frame", type=int, default=16, help="lectures du PTY entre deux images")
+    parser.add_argument("--repeat", type=int, default=3, help="rejeux par charge (le meilleur est gardé)")
+    parser.add_argument("--no-alloc", action="store_true", help="sans la passe tracemalloc")
+    parser.add_argument("--save", help="écrit les mesures dans ce fichier JSON")
+    parser.add_argument("--compare", help="référence JSON à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dégradation tolérée (0.25 = 25 %%)")
+    parser.add_argument("--record", metavar="NOM", help="enregistre la sortie de la commande qui suit --")
+    parser.add_argument("--seconds", type=float, help="durée d'enregistrement (programmes qui ne se terminent pas)")
+    parser.add_argument("command", nargs="*", help="commande à enregistrer (après --)")
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.command:
+            parser.error("--record demande une commande après --")
+        path, size = record(args.record, args.command, args.seconds)
+        print(f"{size} octets enregistrés dans {path}")
+        return
+
+    results = {}
+    print(f"{'charge':<22}{'Mio':>7}{'Mio/s':>8}{'images':>8}{'sortie ms':>10}{'système ms':>11}"
+          f"{'processus ms':>13}{'blocs':>9}")
+    with FakeCurses():
+        for name, data in load_workloads(args.workload).items():
+            result = best_of(data, args.chunks_per_frame, max(1, args.repeat))
+            if not args.no_alloc:
+                result.update(measure_allocations(data, args.chunks_per_frame))
+            results[name] = result
+            ms = result["render_ms_per_frame"]
+            print(f"{name:<22}{len(data) / (1 << 20):>7.1f}{result['parse_mib_s'] or 0:>8.1f}{result['frames']:>8}"
+                  f"{ms['terminal_output']:>10.3f}{ms['system_info']:>11.3f}{ms['processes']:>13.3f}"
+                  f"{result.get('allocated_blocks', '-'):>9}")
+
+    report = {"python": platform.python_version(), "machine": platform.machine(),
+              "chunks_per_frame": args.chunks_per_frame, "repeat": args.repeat, "workloads": results}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"mesures écrites dans {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            print("RÉGRESSION", line)
+        if found:
+            sys.exit(1)
+        print(f"aucune régression au-delà de {args.tolerance:.0%} par rapport à {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Compare la source /proc à psutil pour le relevé des processus et des mesures système
+
+Usage : python benchmarks/bench_procfs.py [--processes 1000,5000,20000] [--samples 5]
+
+Pour chaque population, le script lance des processus `sleep` jusqu'à
+atteindre le nombre demandé (processus déjà présents compris), puis mesure
+pour chaque source le nombre de relevés par seconde et le temps CPU consommé
+par relevé. Les processus lancés sont tués à la fin. Linux uniquement.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from temporalis import procfs  # noqa: E402
+from temporalis.metrics import PsutilSystemSource  # noqa: E402
+from temporalis.procs import PsutilProcessSource  # noqa: E402
+
+
+def spawn_until(target, children):
+    """Lance des `sleep` jusqu'à `target` processus au total ; retourne le total atteint"""
+    count = sum(1 for name in os.listdir("/proc") if name.isdigit())
+    while count < target:
+        try:
+            children.append(subprocess.Popen(["sleep", "3600"], stdin=subprocess.DEVNULL,
+                                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        except OSError as e:
+            print(f"  arrêt à {count} processus : {e}")
+            break
+        count += 1
+    return count
+
+
+def measure(source, samples):
+    """(relevés par seconde, secondes CPU par relevé) après un premier relevé de mise en cache"""
+    source.read()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    for _ in range(samples):
+        source.read()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return samples / wall, cpu / samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", default="1000,5000,20000", help="populations à tester (séparées par des virgules)")
+    parser.add_argument("--samples", type=int, default=5, help="relevés mesurés par source")
+    args = parser.parse_args()
+
+    if not procfs.available():
+        sys.exit("La source procfs n'est disponible que sous Linux")
+
+    system = [("psutil", PsutilSystemSource()), ("procfs", procfs.ProcfsSystemSource())]
+    print("Mesures système (CPU, RAM, swap)")
+    for name, source in system:
+        rate, cpu = measure(source, args.samples * 100)
+        print(f"  {name:<8}{rate:>10.0f} relevés/s {cpu * 1e6:>10.1f} µs CPU/relevé")
+
+    children = []
+    try:
+        print(f"{'processus':>10}{'source':>9}{'relevés/s':>12}{'ms CPU/relevé':>16}")
+        for target in (int(n) for n in args.processes.split(",")):
+            reached = spawn_until(target, children)
+            for name, source in (("psutil", PsutilProcessSource()), ("procfs", procfs.ProcfsProcessSource())):
+                rate, cpu = measure(source, args.samples)
+                print(f"{reached:>10}{name:>9}{rate:>12.2f}{cpu * 1000:>16.1f}")
+    finally:
+        for child in children:
+            child.send_signal(signal.SIGKILL)
+        for child in children:
+            child.wait()
+
+
+if __name__ == "__main__":
+    main()
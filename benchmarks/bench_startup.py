@@ -0,0 +1,111 @@
+"""Mesure le démarrage : temps d'import et délai avant la première image
+
+Usage : python benchmarks/bench_startup.py [--runs 5] [--platform auto|linux|bsd] [--top 10]
+
+1. Import : `python -X importtime -c "import temporalis.app"`, répété
+   `--runs` fois ; on affiche la médiane du temps cumulé et les modules les
+   plus coûteux (temps propre), et on signale si psutil a été chargé.
+2. Première image : `python -m temporalis` est lancé dans un pseudo-terminal
+   de 40x120 ; on mesure le temps jusqu'à ce que le titre "Terminal Input"
+   (dessiné dans la première image) apparaisse sur le terminal, puis on quitte
+   avec F8.
+"""
+import argparse
+import fcntl
+import os
+import pty
+import select
+import signal
+import statistics
+import struct
+import subprocess
+import sys
+import termios
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_FRAME_MARK = b"Terminal Input"
+F8 = b"\x1b[19~"
+
+
+def import_times():
+    """{module: (temps propre, temps cumulé)} en microsecondes pour un import de temporalis.app"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import temporalis.app"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def time_to_first_frame(platform, rows=40, cols=120, timeout=10.0):
+    """Secondes entre le lancement et la première image, ou None si elle n'arrive pas avant `timeout`"""
+    start = time.perf_counter()
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.chdir(ROOT)
+        os.environ.setdefault("TERM", "xterm-256color")
+        os.execv(sys.executable, [sys.executable, "-m", "temporalis", "--platform", platform])
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+    output = b""
+    elapsed = None
+    deadline = start + timeout
+    try:
+        while time.perf_counter() < deadline:
+            ready, _, _ = select.select([fd], [], [], 0.01)
+            if not ready:
+                continue
+            try:
+                output += os.read(fd, 65536)
+            except OSError:
+                break
+            if FIRST_FRAME_MARK in output:
+                elapsed = time.perf_counter() - start
+                break
+        os.write(fd, F8)
+        for _ in range(100):
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                break
+            ready, _, _ = select.select([fd], [], [], 0.05)
+            try:
+                if ready:
+                    os.read(fd, 65536)  # Le PTY ne doit pas se remplir pendant la fermeture
+            except OSError:
+                pass
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+    finally:
+        os.close(fd)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="nombre de mesures (médiane)")
+    parser.add_argument("--platform", default="auto", choices=("auto", "linux", "bsd"))
+    parser.add_argument("--top", type=int, default=10, help="modules les plus coûteux affichés")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    total = statistics.median(times["temporalis.app"][1] for times in runs)
+    print(f"import temporalis.app : {total / 1000:.1f} ms (médiane de {args.runs})")
+    print(f"psutil chargé à l'import : {'oui' if 'psutil' in runs[-1] else 'non'}")
+    print(f"{'module':<40}{'propre ms':>10}{'cumulé ms':>11}")
+    for name, (self_us, cumulative_us) in sorted(runs[-1].items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>11.1f}")
+
+    frames = [time_to_first_frame(args.platform) for _ in range(args.runs)]
+    measured = [t for t in frames if t is not None]
+    if measured:
+        print(f"première image : {statistics.median(measured) * 1000:.0f} ms "
+              f"(médiane, min {min(measured) * 1000:.0f} ms, max {max(measured) * 1000:.0f} ms)")
+    else:
+        print("première image : non observée")
+
+
+if __name__ == "__main__":
+    main()
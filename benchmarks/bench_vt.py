@@ -0,0 +1,107 @@
+"""Compare l'émulateur VT incrémental à l'ancien nettoyage par regex
+
+Usage : python benchmarks/bench_vt.py [--size MIO] [--chunk OCTETS]
+
+Chaque charge est découpée en morceaux de `--chunk` octets comme les lectures
+du PTY. On mesure le débit de l'ancien `clean_terminal_output` (regex
+recompilée à chaque morceau) et celui de `Screen.feed` avec un historique.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from temporalis.scrollback import Scrollback  # noqa: E402
+from temporalis.vt import Screen  # noqa: E402
+
+
+def legacy_clean_terminal_output(output):
+    """Ancienne implémentation (avant l'émulateur VT), conservée pour comparaison"""
+    ansi_escape = re.compile(r'(?:\x1B[@-_][0-?]*[ -/]*[@-~])|[\x07\x0e\x0f]')
+    cleaned_output = ansi_escape.sub('', output)
+    cleaned_output = re.sub(r'.*?(\$)', r'\1', cleaned_output)
+    return cleaned_output.strip()
+
+
+def workload_build_log(size):
+    line = "[ 42%] Building C object src/CMakeFiles/core.dir/module_{:05d}.c.o\r\n"
+    return "".join(line.format(i) for i in range(size // len(line) + 1))[:size]
+
+
+def workload_colored_ls(size):
+    entries = ["\x1b[01;34mdirectory\x1b[0m", "\x1b[01;32mscript.sh\x1b[0m", "README.md", "\x1b[01;36mlink\x1b[0m"]
+    line = "  ".join(entries) + "\r\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def workload_prompts(size):
+    line = "user@host:~/src$ echo $HOME $PATH | cut -d: -f1\r\n/home/user /usr/bin\r\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def workload_fullscreen(size):
+    # Redessins façon htop : positionnement absolu, couleurs, effacements de ligne
+    frame = []
+    for row in range(1, 40):
+        frame.append(f"\x1b[{row};1H\x1b[K\x1b[32m{row:4d}\x1b[0m root \x1b[1m{row * 1.5:5.1f}\x1b[0m /usr/bin/prog --flag")
+    frame = "".join(frame)
+    return (frame * (size // len(frame) + 1))[:size]
+
+
+def workload_cjk(size):
+    # Caractères larges (CJK, emoji) et accents : chemin caractère par caractère avec largeur en cache
+    line = "ファイル 一覧 — données éditées 🚀 완료 (章節 42)\r\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+WORKLOADS = {
+    "build_log": workload_build_log,
+    "colored_ls": workload_colored_ls,
+    "prompts_with_dollar": workload_prompts,
+    "fullscreen_redraw": workload_fullscreen,
+    "cjk_emoji": workload_cjk,
+}
+
+
+def chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def bench_legacy(parts):
+    start = time.perf_counter()
+    lines = []
+    for part in parts:
+        lines += legacy_clean_terminal_output(part).splitlines()
+    return time.perf_counter() - start
+
+
+def bench_screen(parts, rows=40, cols=80):
+    screen = Screen(rows, cols, Scrollback(100000))
+    start = time.perf_counter()
+    for part in parts:
+        screen.feed(part)
+        screen.take_dirty()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=float, default=4, help="taille de chaque charge en Mio")
+    parser.add_argument("--chunk", type=int, default=1024, help="taille des lectures simulées")
+    args = parser.parse_args()
+
+    size = int(args.size * (1 << 20))
+    print(f"{'charge':<22}{'regex Mio/s':>14}{'vt Mio/s':>12}{'rapport':>10}")
+    for name, make in WORKLOADS.items():
+        parts = chunks(make(size), args.chunk)
+        legacy = bench_legacy(parts)
+        screen = bench_screen(parts)
+        mib = size / (1 << 20)
+        print(f"{name:<22}{mib / legacy:>14.1f}{mib / screen:>12.1f}{legacy / screen:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
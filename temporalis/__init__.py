@@ -0,0 +1 @@
+"""Composants partagés par les interfaces Temporalis (commander et BSD)"""
@@ -0,0 +1,4 @@
+"""`python -m temporalis`"""
+from temporalis.app import run
+
+run()
@@ -0,0 +1,1070 @@
+"""Interface Temporalis : système, fichiers, processus et sessions shell dans une seule fenêtre curses
+
+Point d'entrée unique (`temporalis`, `python -m temporalis`). `--platform`
+choisit comment les mesures, les processus et le répertoire du shell sont
+relevés : lecture directe de /proc (linux) ou psutil (bsd, macOS). Rien ne se
+lance à l'import : `run()` lit la ligne de commande puis appelle
+`curses.wrapper(main)`. psutil n'est importé que par les sources qui s'en
+servent, et la première image est dessinée avant le premier relevé ; les
+sessions (et le fichier de hook du shell), le cache des répertoires, les débits,
+la recherche et l'enregistrement sont importés là où ils servent.
+`--record` écrit un journal des sessions que `--replay` relit (voir
+`temporalis.recording` et `temporalis.replay`).
+"""
+import curses
+import os
+import sys
+import signal
+import time
+
+from temporalis.cpuview import MODES as CPU_VIEW_MODES, cpu_lines
+from temporalis.filebrowser import SORT_KEYS as FILE_SORT_KEYS, FileBrowser, format_mtime, load_listing
+from temporalis.keys import encode_key
+from temporalis.layout import IO_MIN_HEIGHT, compute_layout, terminal_size
+from temporalis.metrics import MetricsSampler, sparkline
+from temporalis.perf import Profiler
+from temporalis.procs import SORT_KEYS as PROCESS_SORT_KEYS, ProcessMonitor, format_size
+from temporalis.reactor import Reactor
+from temporalis.render import Panel, Renderer
+from temporalis.scheduler import BACKOFF, IDLE_AFTER, Scheduler, read_config
+from temporalis.termview import TerminalView
+
+# Variables globales pour le défilement et la fenêtre active
+file_scroll_pos = 0
+process_scroll_pos = 0
+current_window = "input"  # Focus par défaut sur l'input du terminal
+program_return_window = "input"  # Focus rendu quand le programme interactif se termine
+input_buffer = ""  # Buffer pour la saisie du terminal
+scrollback_lines = int(os.environ.get("TEMPORALIS_SCROLLBACK", 100000))  # Historique de chaque session (borne sa mémoire)
+fast_forward = os.environ.get("TEMPORALIS_FAST_FORWARD", "0") == "1"  # Avance rapide par défaut (touche f dans Terminal Output)
+fast_forward_interval = float(os.environ.get("TEMPORALIS_FAST_FORWARD_INTERVAL", 0.5))  # Secondes entre deux images en avance rapide
+fast_forward_timer = None  # Prochaine image de Terminal Output en avance rapide
+max_sessions = 9  # Sessions shell simultanées (onglets 1 à 9)
+sessions = []  # Sessions ouvertes, dans l'ordre des onglets
+active_session = None  # Session affichée dans Terminal Output et qui reçoit la saisie
+terminal_view = TerminalView()
+max_fps = int(os.environ.get("TEMPORALIS_MAX_FPS", 30))  # Nombre maximal d'images par seconde
+sample_interval = float(os.environ.get("TEMPORALIS_SAMPLE_INTERVAL", 1.0))  # Secondes entre deux relevés CPU/RAM
+history_minutes = float(os.environ.get("TEMPORALIS_HISTORY_MINUTES", 10))  # Durée de l'historique des mesures
+stats_backend = os.environ.get("TEMPORALIS_BACKEND", "auto")  # Source des mesures : auto, procfs (Linux) ou psutil
+collector_socket = os.environ.get("TEMPORALIS_COLLECTOR")  # Collecteur partagé (None : socket de l'utilisateur, "" : jamais)
+use_procfs = True  # Répertoire du shell lu dans /proc quand il existe (faux avec --platform bsd : psutil)
+shell = os.environ.get("SHELL", "/bin/bash")  # Shell lancé dans chaque session (--shell)
+process_interval = float(os.environ.get("TEMPORALIS_PROCESS_INTERVAL", 2.0))  # Secondes entre deux relevés des processus
+io_interval = float(os.environ.get("TEMPORALIS_IO_INTERVAL", 1.0))  # Secondes entre deux relevés des débits disque/réseau
+directory_cache_size = int(os.environ.get("TEMPORALIS_DIRECTORY_CACHE", 16))  # Nombre de répertoires gardés en cache
+directory_cache = None  # Listes des répertoires récents (créé dans main)
+directory_refresh_pending = False  # Relistage déjà programmé après un événement inotify
+resize_delay = float(os.environ.get("TEMPORALIS_RESIZE_DELAY", 0.1))  # Calme attendu après SIGWINCH avant la remise en page
+resize_timer = None  # Remise en page programmée (repoussée à chaque SIGWINCH)
+search_regex = False  # Recherche par expression régulière plutôt que par sous-chaîne (Ctrl+R pendant la saisie)
+search_timer = None  # Prochaine tranche de recherche programmée dans le réacteur
+file_browser = None  # Lignes visibles triées, stat dans des threads de fond (créé dans main)
+file_details = False  # Mode navigateur : colonnes type, taille et date (touche b dans Files/Directories)
+file_sort = "name"  # Tri des fichiers : name, size, mtime ou type
+file_sort_reverse = False  # Sens inverse (touche r)
+process_sort = "cpu"  # Tri des processus : cpu, mem ou pid
+process_tree_mode = False  # Affichage des processus en arbre (touche t dans Running Processes)
+process_collapsed = set()  # pids dont les descendants sont repliés en mode arbre
+shell_hook = os.environ.get("TEMPORALIS_SHELL_HOOK", "1") != "0"  # Hook de prompt (OSC 7) injecté dans bash / zsh
+refresh_rates = {  # Rythme de chaque section : intervalle de base, maximal (ralenti) et budget CPU (fraction d'un cœur)
+    "system_info": {"interval": 0.5, "max_interval": 5.0, "budget": 0.002},
+    "datetime": {"interval": 1.0, "max_interval": 1.0, "budget": None},  # Les secondes doivent avancer
+    "files": {"interval": 1.0, "max_interval": 10.0, "budget": 0.002},
+    "processes": {"interval": 1.0, "max_interval": 30.0, "budget": 0.004},  # Relevé du thread compris
+    "io": {"interval": 1.0, "max_interval": 10.0, "budget": 0.002},
+}
+idle_after = IDLE_AFTER  # Secondes sans touche avant de ralentir toutes les sections
+refresh_backoff = BACKOFF  # Facteur de ralentissement par rafraîchissement sans changement
+config_path = os.environ.get("TEMPORALIS_CONFIG", os.path.join(  # Rythmes de rafraîchissement (--config)
+    os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config")), "temporalis", "temporalis.ini"))
+refresh_scheduler = None  # Tâches de rafraîchissement (créé dans main)
+perf = Profiler()  # Temps de la boucle, des images et de chaque display_* (mesuré seulement quand activé)
+perf_log = os.environ.get("TEMPORALIS_PERF_LOG")  # Fichier JSONL des mesures, une ligne par seconde (--perf-log)
+record_path = None  # Journal binaire des sessions (--record), relu par --replay
+show_perf = False  # Mesures affichées à la place d'Additional Info (touche F10)
+cpu_view_mode = "auto"  # Affichage des cœurs : auto, bars (une ligne par cœur) ou heatmap (grille compacte)
+last_directory = ""  # Pour suivre le répertoire actuel du terminal
+last_prompt = "$"  # On laisse uniquement le symbole "$" pour le prompt
+
+# Liste des programmes interactifs que nous allons traiter
+interactive_programs = ["nano", "vim", "vi", "htop", "less", "more" , "w3m", "chafa" ,"alpine","weechat" ,"lynx", "man"]
+# Autocomplete commande
+autocomplete_commands = interactive_programs + ["ls", "cd", "cat", "mkdir", "rm", "touch"]
+# Fonction pour quitter proprement avec Ctrl+C ou F8
+def handle_exit(signum=None, frame=None):
+    try:
+        curses.endwin()
+    except curses.error:
+        pass
+    sys.exit(0)
+
+def completer(text, state, cwd="."):
+    """
+    Fonction d'autocomplétion (touche Tab dans Terminal Input).
+    Fournit des suggestions basées sur l'entrée utilisateur ; les chemins relatifs partent du répertoire du shell.
+    """
+    # Suggestions pour les commandes
+    options = [cmd for cmd in autocomplete_commands if cmd.startswith(text)]
+
+    # Ajouter les fichiers et dossiers du répertoire courant
+    if '/' in text or '.' in text:
+        dirname = os.path.dirname(text) or '.'
+        basename = os.path.basename(text)
+        try:
+            options += [
+                os.path.join(dirname, f)
+                for f in os.listdir(os.path.join(cwd, dirname))
+                if f.startswith(basename)
+            ]
+        except OSError:
+            pass
+
+    return options[state] if state < len(options) else None
+
+def complete_input(buffer, cwd):
+    """Complète le dernier mot de la saisie avec la première suggestion"""
+    head, space, word = buffer.rpartition(" ")
+    match = completer(word, 0, cwd) if word else None
+    return head + space + match if match else buffer
+
+def create_section(renderer, window, height, width, y, x, title):
+    """Crée une section avec un titre"""
+    section = window.subwin(height, width, y, x)
+    return Panel(section, title, renderer)  # La bordure est dessinée et préparée pour la prochaine image
+
+@perf.timed
+def display_system_info(section, snapshot):
+    """Affiche l'utilisation CPU et RAM et leur historique à partir du dernier relevé du thread de mesures"""
+    if snapshot is None:
+        section.update(["Sampling..."])  # Premier relevé pas encore disponible
+        return
+
+    # Une ligne par cœur, ou une grille compacte quand les cœurs ne tiennent plus (8 lignes réservées à la suite)
+    lines = cpu_lines(snapshot.percpu, section.height - 8, section.width, cpu_view_mode)
+
+    ram_usage = snapshot.ram[-1]
+    bar_ram = '█' * int(ram_usage / 10)
+    lines.append("")
+    lines.append(f"RAM usage: {ram_usage:.1f}% | {bar_ram.ljust(10)}")
+
+    # Historique de chaque mesure, réduit à la largeur de la section
+    width = section.width - 10
+    load_scale = max(snapshot.cpu_count, max(snapshot.load))
+    lines.append("")
+    lines.append(f"History (last {history_minutes:g} min)")
+    lines.append(f"CPU  {snapshot.cpu[-1]:3.0f}% {sparkline(snapshot.cpu, width)}")
+    lines.append(f"RAM  {snapshot.ram[-1]:3.0f}% {sparkline(snapshot.ram, width)}")
+    lines.append(f"Swap {snapshot.swap[-1]:3.0f}% {sparkline(snapshot.swap, width)}")
+    lines.append(f"Load {snapshot.load[-1]:4.1f} {sparkline(snapshot.load, width, high=load_scale)}")
+
+    section.update(lines)  # Seules les lignes qui ont changé sont réécrites
+
+@perf.timed
+def display_directory_contents(section, scroll_pos, directory):
+    """Affiche les fichiers et dossiers du répertoire courant du terminal ; retourne le défilement borné
+
+    Seules les lignes visibles sont formatées, et leur stat est fait en arrière-plan.
+    """
+    try:
+        listing = directory_cache.listing(directory)  # Relu (dans le pool) seulement si le répertoire a changé
+    except Exception as e:
+        section.update([f"Error: {e}"])
+        return 0
+    if listing is None:
+        # Premier listage en cours : la section est redessinée quand il est prêt
+        section.set_title("Files/Directories (…)")
+        section.update(["Loading…"])
+        return 0
+
+    scroll_pos = min(scroll_pos, max(0, len(listing) - 1))
+    sorting = "…" if file_browser.order(listing, file_sort) is None else ""  # Tri en cours dans le pool
+    direction = " ↑" if file_sort_reverse else ""
+    section.set_title(f"Files/Directories ({len(listing)}, {file_sort}{direction}{sorting})")
+    if file_details:
+        lines = ["T  SIZE MODIFIED     NAME"]
+        for name, kind, size, mtime in file_browser.rows(listing, file_sort, file_sort_reverse,
+                                                         scroll_pos, section.height - 1):
+            size_text = "…" if size is None else "?" if size < 0 else format_size(size)
+            lines.append(f"{kind} {size_text:>5} {format_mtime(mtime)} {name}")
+    else:
+        lines = [row[0] for row in file_browser.rows(listing, file_sort, file_sort_reverse,
+                                                     scroll_pos, section.height, with_stats=False)]
+    section.update(lines)
+    return scroll_pos
+
+@perf.timed
+def display_running_processes(section, scroll_pos, processes):
+    """Affiche les processus en cours dans la section spécifiée avec défilement (seules les lignes visibles sont formatées)"""
+    lines = ["  PID  CPU%   RSS NAME"]
+    for row in processes[scroll_pos:scroll_pos + section.height - 1]:
+        lines.append(f"{row.pid:>5} {row.cpu:5.1f} {format_size(row.rss):>5} {row.name}")
+    section.update(lines)
+
+@perf.timed
+def display_process_tree(section, scroll_pos, tree_rows):
+    """Affiche l'arbre des processus avec CPU et RSS cumulés par sous-arbre ; la première ligne visible est la sélection"""
+    lines = ["  PID  CPU%   RSS TREE"]
+    for idx, node in enumerate(tree_rows[scroll_pos:scroll_pos + section.height - 1]):
+        marker = ("▸ " if node.collapsed else "▾ ") if node.has_children else "  "
+        indent = " " * min(node.depth, 8)
+        selected = ">" if idx == 0 else " "
+        lines.append(f"{selected}{node.row.pid:>4} {node.cpu:5.1f} {format_size(node.rss):>5} {indent}{marker}{node.row.name}")
+    section.update(lines)
+
+@perf.timed
+def display_datetime(section):
+    """Affiche la date et l'heure dans la section 4"""
+    now = time.strftime("%H:%M:%S - %d/%m/%Y")
+    section.update([now])
+
+@perf.timed
+def display_io(section, snapshot):
+    """Débits des disques puis des interfaces réseau les plus chargés (seules les lignes affichées sont formatées)"""
+    if snapshot is None:
+        section.update(["Sampling..."])  # Il faut deux relevés pour un débit
+        return
+    from temporalis.iostats import format_count, top as top_io
+    disks, nics = snapshot.disks, snapshot.nics
+    section.set_title(f"I/O Throughput ({sum(row.count for row in disks)} disks, "
+                      f"{sum(row.count for row in nics)} nics)")
+    if section.height < IO_MIN_HEIGHT - 2:
+        section.update([f"Needs {IO_MIN_HEIGHT - 2} lines"])  # Un en-tête seul ne montre aucun débit
+        return
+
+    # Une ligne d'en-tête par famille ; la moitié du reste chacune, ou plus si l'autre en a moins
+    room = max(0, section.height - 2)
+    disk_count = min(len(disks), max(room // 2, room - len(nics)))
+    nic_count = min(len(nics), room - disk_count)
+    name_width = 10
+    spark_width = section.width - name_width - 22  # Historique du débit total si la section est assez large
+    lines = []
+    for header, rows, count in ((("DISK", "READ", "WRITE", "IOPS"), disks, disk_count),
+                                (("NIC", "RX", "TX", "PKT/S"), nics, nic_count)):
+        lines.append(f"{header[0]:<{name_width}} {header[1]:>6} {header[2]:>6} {header[3]:>5}")
+        for row in top_io(rows, count):
+            name = f"{row.name}({row.count})" if row.count > 1 else row.name
+            line = (f"{name[:name_width]:<{name_width}} {format_size(row.read):>6} {format_size(row.write):>6}"
+                    f" {format_count(row.ops):>5}")
+            if spark_width >= 4:
+                line += " " + sparkline(row.history, spark_width, high=max(max(row.history), 1.0))
+            lines.append(line)
+    section.update(lines)
+
+def display_additional_info(section):
+    """Affiche les informations supplémentaires avec les touches à utiliser (contenu statique, dessiné une fois)"""
+    section.update([
+        "F1 = System Info",
+        "F2 = Files/Directories",
+        "F3 = Running Processes",
+        "F4 = Terminal Input",
+        "F5 = Terminal Output",
+        "F6 = Clear Input",
+        "F7 = Clear Output",
+        "F8 = Exit Program",
+        "F5 n/x/1-9 = Sessions",
+        "F5 f = Fast-forward",
+        "F5 i / F12 = Program keys",
+        "F5 / , . v = Search, filter",
+        "F9 = Background Program",
+        "F10 = Performance",
+    ])
+
+def display_performance(section):
+    """Affiche le dernier résumé des mesures (image, boucle, PTY, appels système, phases) et le rythme des sections"""
+    section.update(perf.lines(section.height - 1, section.width) + [refresh_scheduler.summary()])
+
+def update_terminal_input(section, input_buffer):
+    """Met à jour l'affichage du texte dans la zone de saisie du terminal sans effacer le titre"""
+    section.update([input_buffer])
+
+
+@perf.timed
+def display_terminal_output(section, session, full=False):
+    """Affiche l'écran émulé de la session (lignes modifiées seulement), ou son historique si l'on a remonté"""
+    scroll_pos = session.scroll_pos
+    search = session.search
+    if search is not None and search.filter and search.active:
+        # Vue filtrée : seules les lignes trouvées, complétée au fil de la sortie
+        terminal_view.draw_filtered(section.window, session.scrollback, session.screen, scroll_pos, search)
+    elif scroll_pos or (search is not None and search.active):
+        terminal_view.draw_history(section.window, session.scrollback, session.screen, scroll_pos, search)
+    else:
+        terminal_view.draw(section.window, session.screen, full)
+
+    # Onglets s'il y a plusieurs sessions (* : affichée, + : sortie reçue en arrière-plan)
+    tabs = ""
+    if len(sessions) > 1:
+        tabs = " [" + " ".join(f"{s.number}{'*' if s is session else '+' if s.unseen else ''}" for s in sessions) + "]"
+    # Code de sortie de la dernière commande (hook de prompt) et position dans l'historique
+    status = session.exit_status
+    mode = " [ff]" if session.fast_forward else ""  # Avance rapide : sortie gardée, dessinée moins souvent
+    if session.program:
+        # Programme interactif dans le PTY : il a le clavier, ou on le lui rend avec i
+        mode += f" [{session.program}: {'F12' if current_window == 'program' else 'i'}]"
+    found = search.describe(session.screen) if search is not None else ""
+    section.set_title("Terminal Output" + tabs + mode + (f" [exit {status}]" if status else "")
+                      + (f" [-{scroll_pos}/{len(session.scrollback)}]" if scroll_pos else "") + found)
+    section.stage()
+
+def clear_terminal_output(section):
+    """Efface le contenu de la section terminal output (session affichée)"""
+    active_session.clear()
+    display_terminal_output(section, active_session)
+
+def run_interactive_program(session, command):
+    """
+    Lance un programme interactif (nano, vim, htop...) dans le shell de la session : il s'affiche dans
+    Terminal Output par l'émulateur, dans le répertoire et l'environnement du shell, sans quitter curses.
+    """
+    session.run_program(command)
+    enter_program_mode()
+
+def enter_program_mode():
+    """Le clavier passe au programme de la session affichée ; en mode raw, Ctrl+C et Ctrl+Z lui reviennent aussi"""
+    global current_window, program_return_window
+    curses.raw()
+    if current_window != "program":
+        program_return_window = current_window  # Retrouvé à la fin du programme
+    current_window = "program"
+
+def leave_program_mode(detach=False):
+    """Rend le clavier à l'interface ; le programme continue s'il tourne encore
+
+    Au retour au prompt, le focus revient là où il était (Terminal Input, où les lettres
+    ne sont pas des raccourcis de session) ; F12 (`detach`) le laisse sur Terminal Output.
+    """
+    global current_window
+    curses.noraw()
+    curses.cbreak()
+    current_window = "output" if detach else program_return_window
+
+def handle_background(signum, frame):
+    """
+    Suspend temporairement l'interface et la remet en arrière-plan.
+    """
+    curses.endwin()  # Fermer temporairement curses
+    print("Interface suspendue. Appuyez sur 'fg' dans le terminal pour la restaurer.")
+    os.kill(os.getpid(), signal.SIGSTOP)  # Suspendre le processus
+
+def handle_restore():
+    """
+    Restaure l'interface après qu'elle ait été suspendue.
+    """
+    curses.initscr()  # Réinitialiser curses
+    curses.curs_set(0)
+    curses.start_color()
+    curses.init_pair(1, curses.COLOR_GREEN, curses.COLOR_BLACK)
+
+def main(stdscr):
+    global current_window  # Déclarer current_window comme global pour éviter l'erreur
+    curses.curs_set(0)
+    curses.start_color()  # Initialiser les couleurs
+    curses.init_pair(1, curses.COLOR_GREEN, curses.COLOR_BLACK)  # Couleur verte pour tout le texte
+
+    stdscr.clear()
+
+    # Géométrie des sections, recalculée à chaque changement de taille du terminal
+    layout = compute_layout(*stdscr.getmaxyx())
+
+    # Configurer les signaux pour quitter (Ctrl+C) et suspendre l'interface
+    signal.signal(signal.SIGINT, handle_exit)
+    signal.signal(signal.SIGTSTP, handle_background)
+
+    if perf_log:
+        perf.enable(perf_log)  # Mesures dès le lancement, écrites chaque seconde
+    recorder = None  # Sortie, saisie et tailles de chaque session
+    if record_path:
+        from temporalis.recording import Recorder
+        recorder = Recorder(record_path)
+    reactor = Reactor(perf)
+    renderer = Renderer(reactor, max_fps, perf)
+    global refresh_scheduler
+    refresh_scheduler = Scheduler(reactor, idle_after, refresh_backoff)
+
+    # Crée les sections une seule fois
+    top_section1 = create_section(renderer, stdscr, *layout["system_info"], "System Info")
+    top_section2 = create_section(renderer, stdscr, *layout["files"], "Files/Directories")
+    left_section = create_section(renderer, stdscr, *layout["processes"], "Running Processes")
+    right_section_output = create_section(renderer, stdscr, *layout["output"], "Terminal Output")
+    right_section_input = create_section(renderer, stdscr, *layout["input"], "Terminal Input")
+
+    # Section Date and Time
+    bottom_section1 = create_section(renderer, stdscr, *layout["datetime"], "Date and Time")
+    io_section = create_section(renderer, stdscr, *layout["io"], "I/O Throughput")
+
+    # Section Additional Info avec les touches
+    bottom_section2 = create_section(renderer, stdscr, *layout["info"], "Additional Info")
+    sections = {"system_info": top_section1, "files": top_section2, "processes": left_section,
+                "output": right_section_output, "input": right_section_input,
+                "datetime": bottom_section1, "io": io_section, "info": bottom_section2}
+
+    stdscr.refresh()
+    display_additional_info(bottom_section2)  # Les touches ne changent pas : dessinées une seule fois
+    display_system_info(top_section1, None)  # "Sampling..." jusqu'au premier relevé
+    renderer.flush()  # Première image avant le shell, les threads de mesure et le premier relevé
+
+    # Relevés du collecteur partagé de l'utilisateur s'il tourne, sinon faits ici (et ici aussi s'il s'arrête)
+    client = None
+    if collector_socket != "":
+        from temporalis.collector import connect
+        client = connect(collector_socket, stats_backend)
+
+    # Les mesures CPU/RAM/swap/charge sont relevées dans un thread de fond
+    sampler = MetricsSampler(sample_interval, history_minutes * 60, stats_backend,
+                             client.system_source() if client else None)
+    sampler.sample = perf.timed(sampler.sample, "metrics.sample")  # Dans son thread : psutil ou /proc
+    sampler.start()
+
+    # La liste des processus est relevée dans son propre thread, à son propre rythme
+    process_monitor = ProcessMonitor(process_interval, stats_backend, client.process_source() if client else None)
+    process_monitor.sample = perf.timed(process_monitor.sample, "processes.sample")
+    process_monitor.start()
+
+    # Débits des disques et des interfaces, relevés localement (le collecteur ne les partage pas)
+    from temporalis.iostats import IOSampler
+    io_sampler = IOSampler(io_interval, stats_backend)
+    io_sampler.sample = perf.timed(io_sampler.sample, "io.sample")
+    io_sampler.start()
+
+    # Chaque session lance `shell` dans son propre pseudo-terminal (pty.fork : le PTY devient
+    # le terminal de contrôle du shell, le contrôle des tâches fonctionne)
+    curses.noecho()
+    if hasattr(curses, "set_escdelay"):
+        curses.set_escdelay(25)  # Échap seul arrive vite au programme (vim)
+
+    # Cache des listes de répertoires, invalidé par inotify (Linux) ou par la date de modification
+    global directory_cache, file_browser
+    from temporalis.dirwatch import DirectoryCache
+    # Les threads du pool réveillent la boucle quand des stat ou un listage sont prêts
+    file_browser = FileBrowser(on_ready=lambda: reactor.call_soon_threadsafe(refresh_directory_panel))
+    directory_cache = DirectoryCache(directory_cache_size, loader=load_listing, watch_content=True,
+                                     submit=file_browser.submit)
+
+    seen = {"snapshot": None, "processes": None, "io": None}  # Dernier relevé affiché par chaque tâche
+
+    def refresh_system_panels():
+        """System Info et l'heure, redessinées même sans nouveau relevé (remise en page)"""
+        display_system_info(top_section1, sampler.snapshot)
+        display_datetime(bottom_section1)
+
+    @perf.timed
+    def refresh_system_info():
+        """Tâche System Info : ne redessine qu'après un nouveau relevé du thread de mesures"""
+        snapshot = sampler.snapshot  # Aucune mesure n'est faite ici
+        if snapshot is None:
+            return  # Premier relevé attendu : pas de ralentissement
+        if snapshot is seen["snapshot"]:
+            return False
+        seen["snapshot"] = snapshot
+        display_system_info(top_section1, snapshot)
+
+    @perf.timed
+    def refresh_directory_panel():
+        """Mise à jour dynamique du contenu de Files/Directories"""
+        global file_scroll_pos, last_directory
+        if active_session.cwd != last_directory:
+            file_scroll_pos = 0  # Réinitialise le défilement si le répertoire change
+            last_directory = active_session.cwd
+        file_scroll_pos = display_directory_contents(top_section2, file_scroll_pos, last_directory)
+
+    def on_session_cwd(session):
+        """Répertoire poussé par le hook de prompt (OSC 7) : seul celui de la session affichée compte"""
+        if session is active_session:
+            refresh_directory_panel()
+
+    @perf.timed
+    def poll_shell_directory():
+        """Repli pour les shells sans hook : le répertoire du processus est relu ; retourne False si rien n'a changé"""
+        moved = active_session.tracker.poll()
+        ended = active_session.poll_program()  # Programme interactif terminé sans rien écrire
+        frame = top_section2.frame
+        refresh_directory_panel()  # Sans inotify, la date de modification du répertoire est comparée
+        from temporalis.session import reap_closed
+        reap_closed()  # Shells des sessions fermées
+        return moved or ended or top_section2.frame != frame
+
+    @perf.timed
+    def on_directory_events():
+        """Appelé par le réacteur quand inotify signale un changement dans un répertoire en cache"""
+        global directory_refresh_pending
+        if directory_cache.handle_events() and not directory_refresh_pending:
+            # Une rafale d'événements (décompression d'une archive...) ne donne qu'un seul relistage
+            directory_refresh_pending = True
+            reactor.call_later(0.2, flush_directory_refresh)
+
+    def flush_directory_refresh():
+        global directory_refresh_pending
+        directory_refresh_pending = False
+        refresh_directory_panel()
+
+    @perf.timed
+    def refresh_processes_panel():
+        """Affiche le dernier relevé du thread des processus, trié selon process_sort"""
+        global process_scroll_pos
+        if process_tree_mode:
+            # L'arbre est construit une fois par relevé à partir du même cache, sans appel système
+            tree = process_monitor.tree(process_sort)
+            process_collapsed.intersection_update(tree.totals)  # Oublie les processus terminés
+            processes = tree.flatten(process_collapsed)
+        else:
+            processes = process_monitor.sorted_rows(process_sort)
+        process_scroll_pos = min(process_scroll_pos, max(0, len(processes) - 1))
+        mode = "tree, " if process_tree_mode else ""
+        left_section.set_title(f"Running Processes ({len(process_monitor.snapshot)}, {mode}{process_sort})")
+        if process_tree_mode:
+            display_process_tree(left_section, process_scroll_pos, processes)
+        else:
+            display_running_processes(left_section, process_scroll_pos, processes)
+
+    def refresh_processes_job():
+        """Tâche Running Processes : ne redessine qu'après un nouveau relevé (dont le coût est compté)"""
+        generation = process_monitor.generation
+        if generation == seen["processes"]:
+            return False
+        seen["processes"] = generation
+        processes_job.charge(process_monitor.cost)  # Payé dans le thread, au rythme de la tâche
+        refresh_processes_panel()
+
+    def refresh_io_job():
+        """Tâche I/O Throughput : ne redessine qu'après un nouveau relevé (dont le coût est compté)"""
+        snapshot = io_sampler.snapshot
+        if snapshot is None:
+            return  # Deuxième relevé attendu : pas de ralentissement
+        if snapshot is seen["io"]:
+            return False
+        seen["io"] = snapshot
+        io_job.charge(io_sampler.cost)
+        display_io(io_section, snapshot)
+
+    def refresh_output_panel(full=False):
+        display_terminal_output(right_section_output, active_session, full)
+
+    def open_session():
+        """Nouvelle session shell, de la taille de la section Terminal Output, affichée tout de suite"""
+        used = {session.number for session in sessions}
+        number = min(n for n in range(1, max_sessions + 1) if n not in used)
+        from temporalis.session import Session  # PTY, émulateur et hook du shell (fichier temporaire)
+        session = Session(number, right_section_output.height, right_section_output.width, shell,
+                          scrollback_lines, shell_hook, use_procfs)
+        session.on_cwd_change = on_session_cwd
+        session.on_command_done = on_command_done
+        session.fast_forward = fast_forward
+        session.on_write_pending = on_write_pending
+        session.on_hangup = on_session_hangup
+        if recorder is not None:
+            session.recorder = recorder
+            recorder.keyframe(session)  # Point de départ de la lecture
+        sessions.append(session)
+        sessions.sort(key=lambda s: s.number)
+        # Un seul sélecteur pour toutes les sessions : chacune a son lecteur dans le réacteur
+        reactor.add_reader(session.fd, lambda: on_terminal_output(session))
+        switch_session(session)
+
+    def switch_session(session):
+        """Affiche `session` : seules les lignes visibles sont redessinées"""
+        global active_session
+        if current_window == "program":
+            leave_program_mode()
+        active_session = session
+        session.unseen = False
+        refresh_output_panel(full=True)
+        refresh_directory_panel()
+
+    def on_write_pending(session):
+        """PTY plein (collage volumineux) : le reste est écrit dès que le shell a lu"""
+        def flush():
+            if session.flush():
+                reactor.remove_writer(session.fd)
+        reactor.add_writer(session.fd, flush)
+
+    def on_session_hangup(session):
+        """Le shell ne lit plus (EIO) : sa session est fermée après le traitement en cours (touche, réponse)"""
+        reactor.call_later(0, lambda: session in sessions and close_session(session))
+
+    def close_session(session):
+        """Ferme une session ; l'interface se termine avec la dernière"""
+        reactor.remove_reader(session.fd)
+        reactor.remove_writer(session.fd)
+        session.close()
+        index = sessions.index(session)
+        sessions.remove(session)
+        if not sessions:
+            handle_exit()
+        if session is active_session:
+            switch_session(sessions[min(index, len(sessions) - 1)])
+        else:
+            refresh_output_panel()  # Met à jour les onglets
+
+    def on_command_done(session):
+        """Retour au prompt (ou sortie de l'écran alternatif) : le programme interactif a rendu la main"""
+        if session is active_session and current_window == "program":
+            leave_program_mode()
+        if session is active_session:
+            renderer.request(refresh_output_panel)
+
+    @perf.timed
+    def on_terminal_output(session):
+        """Appelé par le réacteur dès que le shell d'une session a écrit quelque chose"""
+        was_unseen = session.unseen
+        reader = session.reader
+        bytes_read, reads = reader.bytes_read, reader.reads
+        alive = session.read()  # Vide le PTY ; les sessions en arrière-plan ne sont pas dessinées
+        if perf.enabled:
+            perf.count("pty_bytes", reader.bytes_read - bytes_read)
+            perf.count("pty_reads", reader.reads - reads)
+        if session is active_session:
+            session.unseen = False
+            # Le PTY est toujours lu tout de suite, mais on ne dessine qu'une fois par image :
+            # entre deux images, seules les lignes encore visibles à la fin sont dessinées
+            if session.fast_forward:
+                schedule_fast_forward()
+            else:
+                renderer.request(refresh_output_panel)
+            schedule_search()  # Seules les nouvelles lignes de l'historique sont lues
+        elif session.unseen and not was_unseen:
+            renderer.request(refresh_output_panel)  # Seul l'onglet change (+)
+        if not alive:
+            # Le shell s'est terminé : on ferme sa session (et l'interface si c'était la dernière)
+            close_session(session)
+
+    def schedule_fast_forward():
+        """Avance rapide : tout passe dans l'émulateur et l'historique, une image toutes les `fast_forward_interval` s"""
+        global fast_forward_timer
+        if fast_forward_timer is None:
+            fast_forward_timer = reactor.call_later(fast_forward_interval, flush_fast_forward)
+
+    def flush_fast_forward():
+        global fast_forward_timer
+        fast_forward_timer = None
+        renderer.request(refresh_output_panel)
+
+    def schedule_search():
+        """Programme la prochaine tranche de recherche s'il reste des lignes à lire"""
+        global search_timer
+        search = active_session.search
+        if search_timer is None and search is not None and search.pending:
+            search_timer = reactor.call_later(0, search_step)  # Après les touches et le PTY de ce tour
+
+    @perf.timed
+    def search_step():
+        global search_timer
+        search_timer = None
+        search = active_session.search
+        if search is not None:
+            search.step()
+            renderer.request(refresh_output_panel)  # Compteur et surbrillance
+            schedule_search()
+
+    def show_search_match(direction):
+        """Sélectionne l'occurrence suivante ou précédente et remonte l'historique jusqu'à elle"""
+        search = active_session.search
+        if search.move(active_session.screen, direction) is not None:
+            active_session.scroll_pos = search.offset(active_session.screen, right_section_output.height)
+        refresh_output_panel()
+
+    def on_search_key(key):
+        """Saisie du motif (F5 puis /) : la recherche repart à chaque caractère, Entrée garde le motif, Échap l'abandonne"""
+        from temporalis.search import ScrollbackSearch
+        global current_window, search_regex
+        search = active_session.search or ScrollbackSearch(active_session.scrollback, "", search_regex)
+        pattern = search.pattern
+        if key == 27:  # Échap
+            active_session.search = None
+            active_session.scroll_pos = 0
+            current_window = "output"
+            update_terminal_input(right_section_input, input_buffer)
+            refresh_output_panel(full=True)
+            return
+        if key in (curses.KEY_ENTER, 10, 13):
+            current_window = "output"
+            update_terminal_input(right_section_input, input_buffer)
+            if search.active and search.current is None:
+                show_search_match(-1)  # Occurrence la plus récente (parmi les lignes déjà lues)
+            return
+        if key == 18:  # Ctrl+R : expression régulière / sous-chaîne
+            search_regex = not search_regex
+        elif key == 6:  # Ctrl+F : vue filtrée
+            search.filter = not search.filter
+            active_session.scroll_pos = 0
+        elif key in (127, 8, curses.KEY_BACKSPACE):
+            pattern = pattern[:-1]
+        elif 32 <= key <= 126:
+            pattern += chr(key)
+        if pattern != search.pattern or search_regex != search.regex:
+            # Un caractère de plus sur une sous-chaîne : seules les lignes déjà trouvées sont relues
+            search = ScrollbackSearch(active_session.scrollback, pattern, search_regex, previous=search)
+        active_session.search = search
+        update_terminal_input(right_section_input, ("re/" if search_regex else "/") + pattern)
+        schedule_search()
+        refresh_output_panel(full=True)
+
+    def refresh_info_panel():
+        """Additional Info : les touches, ou les mesures de performance (F10)"""
+        bottom_section2.set_title("Performance (p50/p99)" if show_perf else "Additional Info")
+        if show_perf:
+            display_performance(bottom_section2)
+        else:
+            display_additional_info(bottom_section2)
+
+    def on_perf_tick():
+        """Chaque seconde : résumé des mesures (et ligne JSONL), affiché s'il est demandé"""
+        perf.tick()
+        if show_perf:
+            display_performance(bottom_section2)
+
+    def on_key(key):
+        global current_window, input_buffer, file_scroll_pos, process_scroll_pos, cpu_view_mode, process_sort, process_tree_mode
+        global file_details, file_sort, file_sort_reverse, show_perf
+
+        # Saisie d'une recherche dans l'historique : les touches vont au motif
+        if current_window == "search":
+            on_search_key(key)
+            return
+
+        # Programme interactif dans le PTY : toutes les touches lui sont envoyées, sauf F12
+        if current_window == "program":
+            if key == curses.KEY_F12:
+                leave_program_mode(detach=True)
+                refresh_output_panel()
+            else:
+                data = encode_key(key, active_session.screen.app_cursor)
+                if data:
+                    active_session.write(data)
+            return
+
+        # Gestion des touches F1, F2, F3, F4, F5, F6, F7, F8 pour changer la fenêtre active et les actions
+        if key == curses.KEY_F1:
+            current_window = "system_info"
+        elif key == curses.KEY_F2:
+            current_window = "files"
+        elif key == curses.KEY_F3:
+            current_window = "processes"
+        elif key == curses.KEY_F4:
+            current_window = "input"
+        elif key == curses.KEY_F5:
+            current_window = "output"
+        elif key == curses.KEY_F6:
+            input_buffer = ""  # Efface l'input du terminal
+            update_terminal_input(right_section_input, input_buffer)
+        elif key == curses.KEY_F7:
+            clear_terminal_output(right_section_output)  # Vider la sortie du terminal
+        elif key == curses.KEY_F8:
+            handle_exit(None, None)  # Ferme le programme proprement
+        elif key == curses.KEY_F9:
+            handle_background(None, None)  # Met l'interface en background
+            redraw_all()  # Au retour (fg), l'écran doit être repeint
+        elif key == curses.KEY_F10:
+            show_perf = not show_perf
+            if show_perf:
+                perf.enable()
+            else:
+                perf.disable()  # Sauf avec --perf-log : le fichier continue d'être écrit
+            refresh_info_panel()
+
+        # Gérer la saisie dans "Terminal Input" lorsque sélectionné
+        if current_window == "input":
+            if key in [curses.KEY_ENTER, 10]:  # Touche Entrée
+                if input_buffer.strip():  # Vérifie si la commande n'est pas vide
+                    command = input_buffer.strip().split()[0]  # Récupère juste la commande (sans arguments)
+                    if command in interactive_programs:  # Si c'est un programme interactif
+                        run_interactive_program(active_session, input_buffer.strip())  # Affiché dans Terminal Output
+                        refresh_output_panel()
+                    else:
+                        active_session.write((input_buffer + "\n").encode())  # Envoie la commande à la session affichée
+                input_buffer = ""  # Réinitialise le buffer après exécution de la commande
+            elif key == 9:  # Tab : complète la commande ou le chemin
+                input_buffer = complete_input(input_buffer, active_session.cwd)
+            elif key in [127, 8]:  # Touche Retour arrière (Backspace)
+                if len(input_buffer) > 0:
+                    input_buffer = input_buffer[:-1]  # Supprimer le dernier caractère du buffer
+            elif 32 <= key <= 126:  # Caractères imprimables
+                input_buffer += chr(key)
+
+            # Afficher le contenu saisi et le remplacer par des espaces si nécessaire
+            update_terminal_input(right_section_input, input_buffer)
+
+        # Touche m dans System Info : change l'affichage des cœurs (auto / barres / grille)
+        if current_window == "system_info" and key == ord('m'):
+            cpu_view_mode = CPU_VIEW_MODES[(CPU_VIEW_MODES.index(cpu_view_mode) + 1) % len(CPU_VIEW_MODES)]
+            display_system_info(top_section1, sampler.snapshot)
+
+        # Touche s dans Running Processes : change le tri (CPU, mémoire, pid)
+        if current_window == "processes" and key == ord('s'):
+            process_sort = PROCESS_SORT_KEYS[(PROCESS_SORT_KEYS.index(process_sort) + 1) % len(PROCESS_SORT_KEYS)]
+            process_scroll_pos = 0
+            refresh_processes_panel()
+
+        # Mode arbre (t), puis repli / dépli de la ligne sélectionnée (gauche, droite, espace)
+        if current_window == "processes" and key == ord('t'):
+            process_tree_mode = not process_tree_mode
+            process_scroll_pos = 0
+            refresh_processes_panel()
+        elif current_window == "processes" and process_tree_mode and key in (curses.KEY_LEFT, curses.KEY_RIGHT, ord(' ')):
+            tree_rows = process_monitor.tree(process_sort).flatten(process_collapsed)
+            if process_scroll_pos < len(tree_rows):
+                pid = tree_rows[process_scroll_pos].row.pid
+                if key == curses.KEY_LEFT or (key == ord(' ') and pid not in process_collapsed):
+                    process_collapsed.add(pid)
+                else:
+                    process_collapsed.discard(pid)
+                refresh_processes_panel()
+
+        # Navigateur de fichiers : colonnes (b), clé de tri (o), sens (r), pages (PgUp / PgDn / Home / End)
+        if current_window == "files":
+            page = top_section2.height
+            if key == ord('b'):
+                file_details = not file_details
+            elif key == ord('o'):
+                file_sort = FILE_SORT_KEYS[(FILE_SORT_KEYS.index(file_sort) + 1) % len(FILE_SORT_KEYS)]
+                file_scroll_pos = 0
+            elif key == ord('r'):
+                file_sort_reverse = not file_sort_reverse
+                file_scroll_pos = 0
+            elif key == curses.KEY_NPAGE:
+                file_scroll_pos += page
+            elif key == curses.KEY_PPAGE:
+                file_scroll_pos = max(0, file_scroll_pos - page)
+            elif key == curses.KEY_HOME:
+                file_scroll_pos = 0
+            elif key == curses.KEY_END:
+                file_scroll_pos = sys.maxsize  # Borné au nombre d'entrées par l'affichage
+            if key in (ord('b'), ord('o'), ord('r'), curses.KEY_NPAGE, curses.KEY_PPAGE, curses.KEY_HOME, curses.KEY_END):
+                refresh_directory_panel()
+
+        # Défilement dans la section fichiers ou processus (redessinée tout de suite)
+        if key == curses.KEY_DOWN and current_window == "files":
+            file_scroll_pos += 1  # Défilement vers le bas dans la liste des fichiers
+            refresh_directory_panel()
+        elif key == curses.KEY_UP and current_window == "files":
+            file_scroll_pos = max(0, file_scroll_pos - 1)  # Défilement vers le haut dans la liste des fichiers
+            refresh_directory_panel()
+        elif key == curses.KEY_DOWN and current_window == "processes":
+            process_scroll_pos += 1  # Défilement vers le bas dans la liste des processus
+            refresh_processes_panel()
+        elif key == curses.KEY_UP and current_window == "processes":
+            process_scroll_pos = max(0, process_scroll_pos - 1)  # Défilement vers le haut dans la liste des processus
+            refresh_processes_panel()
+
+        # Sessions (F5 puis n : nouvelle, x : fermer, 1-9 : aller à, [ et ] : précédente / suivante)
+        if current_window == "output":
+            if key == ord('n'):
+                if len(sessions) < max_sessions:
+                    open_session()
+                return
+            elif key == ord('x'):
+                close_session(active_session)
+                return
+            elif key == ord('i'):
+                if active_session.program:
+                    enter_program_mode()  # Rend le clavier au programme interactif
+                    refresh_output_panel()
+                return
+            elif key == ord('f'):
+                active_session.fast_forward = not active_session.fast_forward
+                refresh_output_panel()
+                return
+            elif key == ord('/'):
+                current_window = "search"  # Le motif est saisi dans Terminal Input
+                on_search_key(-1)
+                return
+            elif active_session.search is not None and key in (ord(','), ord('.')):
+                show_search_match(1 if key == ord('.') else -1)  # . : plus récente, , : plus ancienne
+                return
+            elif active_session.search is not None and key == ord('v'):
+                active_session.search.filter = not active_session.search.filter
+                active_session.scroll_pos = active_session.search.offset(active_session.screen,
+                                                                         right_section_output.height)
+                refresh_output_panel(full=True)
+                return
+            elif active_session.search is not None and key == 27:
+                on_search_key(27)  # Échap : fin de la recherche
+                return
+            elif key in (ord('['), ord(']')):
+                index = sessions.index(active_session) + (1 if key == ord(']') else -1)
+                switch_session(sessions[index % len(sessions)])
+                return
+            elif ord('1') <= key <= ord('9'):
+                for session in sessions:
+                    if session.number == key - ord('0'):
+                        switch_session(session)
+                return
+
+        # Défilement dans l'historique de la session (F5 puis flèches / PgUp / PgDn)
+        if current_window == "output":
+            page = right_section_output.height
+            search = active_session.search
+            if search is not None and search.filter and search.active:
+                max_scroll = max(0, len(search.positions(active_session.screen)) - page)  # Lignes trouvées
+            else:
+                max_scroll = max(0, len(active_session.scrollback) - page)
+            scroll_pos = active_session.scroll_pos
+            if key == curses.KEY_UP:
+                scroll_pos = min(max_scroll, scroll_pos + 1)
+            elif key == curses.KEY_DOWN:
+                scroll_pos = max(0, scroll_pos - 1)
+            elif key == curses.KEY_PPAGE:
+                scroll_pos = min(max_scroll, scroll_pos + page)
+            elif key == curses.KEY_NPAGE:
+                scroll_pos = max(0, scroll_pos - page)
+            elif key == curses.KEY_HOME:
+                scroll_pos = max_scroll
+            elif key == curses.KEY_END:
+                scroll_pos = 0
+            else:
+                return
+            active_session.scroll_pos = scroll_pos
+            refresh_output_panel()
+
+    @perf.timed
+    def on_stdin():
+        """Lit toutes les touches disponibles (getch ne bloque pas grâce à nodelay)"""
+        key = stdscr.getch()
+        while key != -1:
+            on_key(key)
+            key = stdscr.getch()
+        refresh_scheduler.activity(current_window)  # Rythme de base, et le plus rapide pour la section active
+
+    def redraw_all():
+        """Réaffichage complet (après SIGWINCH ou un retour de suspension)"""
+        stdscr.clear()  # Le prochain doupdate repeint tout l'écran
+        renderer.stage(stdscr)
+        for section in sections.values():
+            section.redraw()
+        refresh_output_panel(full=True)
+
+    def on_resize():
+        """SIGWINCH : la remise en page attend la fin de la rafale (redimensionnement à la souris)"""
+        global resize_timer
+        refresh_scheduler.activity(current_window)
+        if resize_timer is not None:
+            resize_timer.cancel()
+        resize_timer = reactor.call_later(resize_delay, relayout)
+
+    @perf.timed
+    def relayout():
+        """Recalcule la géométrie, déplace les sections existantes et donne la nouvelle taille à chaque PTY"""
+        global resize_timer
+        resize_timer = None
+        size = terminal_size()
+        if size is None:
+            return
+        curses.resizeterm(*size)  # Le réacteur gère SIGWINCH à la place de curses
+        layout = compute_layout(*stdscr.getmaxyx())
+        for name, section in sections.items():
+            section.move_resize(*layout[name])
+        for session in sessions:
+            session.resize(right_section_output.height, right_section_output.width)
+        stdscr.clear()  # Le prochain doupdate repeint tout l'écran
+        renderer.stage(stdscr)
+        refresh_info_panel()
+        update_terminal_input(right_section_input, input_buffer)
+        refresh_system_panels()
+        refresh_directory_panel()
+        refresh_processes_panel()
+        display_io(io_section, io_sampler.snapshot)
+        refresh_output_panel(full=True)
+
+    stdscr.nodelay(True)
+    open_session()  # Première session ; les suivantes s'ouvrent avec F5 puis n
+    if directory_cache.fd is not None:
+        reactor.add_reader(directory_cache.fd, on_directory_events)
+    reactor.add_reader(sys.stdin.fileno(), on_stdin)
+    reactor.add_signal_handler(signal.SIGWINCH, on_resize)
+    refresh_scheduler.add("system_info", refresh_system_info, **refresh_rates["system_info"])
+    refresh_scheduler.add("datetime", lambda: display_datetime(bottom_section1), **refresh_rates["datetime"])
+    refresh_scheduler.add("files", poll_shell_directory, **refresh_rates["files"])
+    processes_job = refresh_scheduler.add("processes", refresh_processes_job, **refresh_rates["processes"])
+    # Le thread des processus suit le rythme de la section (jamais plus vite que `process_interval`)
+    processes_job.on_interval = lambda interval: process_monitor.set_interval(max(process_interval, interval))
+    io_job = refresh_scheduler.add("io", refresh_io_job, **refresh_rates["io"])
+    io_job.on_interval = lambda interval: io_sampler.set_interval(max(io_interval, interval))
+    reactor.call_every(1, on_perf_tick)
+
+    try:
+        reactor.run()
+
+    except KeyboardInterrupt:
+        # Gérer proprement la fermeture avec Ctrl+C
+        curses.endwin()
+    finally:
+        if recorder is not None:
+            recorder.close()  # Index des images clés (F8 et Ctrl+C passent par SystemExit)
+
+
+PLATFORM_BACKENDS = {"linux": "procfs", "bsd": "psutil"}  # Source des mesures selon --platform
+
+
+def parse_args(argv=None):
+    import argparse  # Seulement au lancement : l'import du module reste léger
+    parser = argparse.ArgumentParser(prog="temporalis", description=__doc__.splitlines()[0])
+    parser.add_argument("--platform", choices=("auto", "linux", "bsd"), default="auto",
+                        help="source des mesures et du répertoire du shell : /proc (linux), psutil (bsd), "
+                             "ou /proc quand il est disponible (auto)")
+    parser.add_argument("--shell", default=os.environ.get("SHELL", "/bin/bash"),
+                        help="shell lancé dans chaque session")
+    parser.add_argument("--collector", metavar="SOCKET", default=collector_socket,
+                        help="socket du collecteur partagé (temporalis-collector, celle de l'utilisateur par défaut) ; "
+                             "relevé local s'il ne répond pas ou appartient à un autre utilisateur, "
+                             "jamais avec une chaîne vide")
+    parser.add_argument("--record", metavar="FICHIER",
+                        help="enregistre la sortie, la saisie et la taille de chaque session dans ce fichier")
+    parser.add_argument("--replay", metavar="FICHIER", help="rejoue un enregistrement au lieu de lancer l'interface")
+    parser.add_argument("--speed", type=float, default=1.0, help="vitesse de lecture de --replay")
+    parser.add_argument("--session", type=int, help="session rejouée ou exportée (la première par défaut)")
+    parser.add_argument("--export-asciicast", metavar="FICHIER",
+                        help="avec --replay : écrit la session au format asciicast v2 au lieu de la rejouer")
+    parser.add_argument("--config", metavar="FICHIER", default=config_path,
+                        help="fichier INI des rythmes de rafraîchissement (sections [refresh] et [refresh.SECTION])")
+    parser.add_argument("--perf-log", metavar="FICHIER", default=perf_log,
+                        help="mesures de performance ajoutées à ce fichier JSONL, une ligne par seconde")
+    return parser.parse_args(argv)
+
+
+def replay_recording(args):
+    """`--replay` : lecture dans curses, ou export asciicast avec `--export-asciicast`"""
+    from temporalis import replay
+    from temporalis.recording import Recording, RecordingError, export_asciicast
+    try:
+        recording = Recording(args.replay)
+    except (OSError, RecordingError) as e:
+        sys.exit(f"temporalis: {e}")
+    try:
+        if not recording.sessions:
+            sys.exit(f"temporalis: {args.replay}: aucune session enregistrée")
+        session = args.session if args.session is not None else recording.sessions[0]
+        if session not in recording.sessions:
+            sys.exit(f"temporalis: session {session} absente (sessions : {', '.join(map(str, recording.sessions))})")
+        if args.export_asciicast:
+            with open(args.export_asciicast, "w") as out:
+                export_asciicast(recording, session, out)
+        else:
+            curses.wrapper(replay.main, recording, session, args.speed, max_fps)
+    finally:
+        recording.close()
+
+
+def run(argv=None):
+    """Point d'entrée : `temporalis [--platform auto|linux|bsd] [--shell SHELL] [--config FICHIER] [--record FICHIER] [--perf-log FICHIER]`
+
+`temporalis --replay FICHIER [--speed N] [--session N] [--export-asciicast SORTIE]` relit un enregistrement.
+"""
+    global stats_backend, use_procfs, shell, perf_log, record_path, collector_socket
+    global refresh_rates, idle_after, refresh_backoff
+    args = parse_args(argv)
+    if args.replay:
+        replay_recording(args)
+        return
+    try:
+        refresh_rates, idle_after, refresh_backoff = read_config(args.config, refresh_rates, idle_after, refresh_backoff)
+    except ValueError as e:
+        sys.exit(f"temporalis: {e}")
+    if args.platform != "auto" and "TEMPORALIS_BACKEND" not in os.environ:
+        stats_backend = PLATFORM_BACKENDS[args.platform]
+    use_procfs = args.platform != "bsd"
+    shell = args.shell
+    perf_log = args.perf_log
+    record_path = args.record
+    collector_socket = args.collector
+    curses.wrapper(main)
+
@@ -0,0 +1,443 @@
+"""Collecteur partagé : un seul relevé système et processus pour toutes les interfaces d'un utilisateur
+
+`python -m temporalis.collector` (ou `temporalis-collector`) lance les threads
+de mesure habituels (`MetricsSampler`, `ProcessMonitor`) une seule fois et
+publie chaque relevé sur une socket UNIX à toutes les interfaces connectées.
+Les messages sont binaires et compacts :
+
+    en-tête     type (1 octet), longueur (uint32)
+    SYSTEM      instant (double), RAM %, swap % (float), nombre de cœurs (uint16), CPU % par cœur (float)
+    PROCESSES   remise à zéro (1 octet), pids disparus, lignes modifiées (pid,
+                parent, CPU %, RSS), lignes nouvelles (les mêmes champs puis
+                début du processus, nom, utilisateur et ligne de commande)
+
+Une interface qui se connecte reçoit le dernier relevé système et la table
+complète des processus ; ensuite seules les différences lui sont envoyées : le
+nom, l'utilisateur et la ligne de commande d'un processus ne passent qu'une
+fois, et un pid réutilisé (autre début) est envoyé comme un nouveau processus.
+Côté interface, `connect` donne un `CollectorClient` dont les sources
+(`system_source`, `process_source`) se branchent sur les threads de mesure à
+la place de /proc ou psutil ; elles ne rendent rien (None) avant le premier
+message du collecteur et, s'il s'arrête, reviennent d'elles-mêmes à un relevé
+local.
+
+Le collecteur sert les interfaces de son utilisateur : la socket (0600) est
+placée dans `$XDG_RUNTIME_DIR`, sinon dans un répertoire 0700 à son nom sous
+le répertoire temporaire (`default_socket`). Avant de croire les données
+reçues, le client vérifie que la socket et le processus qui l'écoute
+(`SO_PEERCRED` sous Linux) appartiennent au même utilisateur que lui (ou à
+root).
+"""
+import os
+import signal
+import socket
+import struct
+import stat
+import sys
+import tempfile
+import threading
+from array import array
+
+from temporalis.procs import ProcessRow
+
+SOCKET_NAME = "temporalis-collector.sock"
+HEADER = struct.Struct("<BI")
+SYSTEM_FIELDS = struct.Struct("<dffH")
+ROW = struct.Struct("<IIfQ")  # pid, parent, CPU %, RSS
+STARTED = struct.Struct("<d")  # Début du processus (lignes nouvelles)
+COUNT = struct.Struct("<I")
+TEXT_LENGTH = struct.Struct("<H")
+SYSTEM, PROCESSES = 1, 2
+MAX_TEXT = 4096  # Octets gardés d'une ligne de commande
+MAX_BACKLOG = 4 << 20  # Un client qui ne lit plus est déconnecté au-delà (en plus de la table initiale)
+
+
+# --- Encodage -------------------------------------------------------------
+
+def _message(kind, payload):
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+def encode_system(when, percpu, ram, swap):
+    return _message(SYSTEM, SYSTEM_FIELDS.pack(when, ram, swap, len(percpu)) + array("f", percpu).tobytes())
+
+
+def decode_system(payload):
+    """(instant, CPU % par cœur, RAM %, swap %)"""
+    when, ram, swap, count = SYSTEM_FIELDS.unpack_from(payload)
+    percpu = array("f")
+    percpu.frombytes(payload[SYSTEM_FIELDS.size:SYSTEM_FIELDS.size + 4 * count])
+    return when, percpu, ram, swap
+
+
+def _text(value):
+    data = value.encode("utf-8", "replace")[:MAX_TEXT]
+    return TEXT_LENGTH.pack(len(data)) + data
+
+
+def encode_processes(previous, rows, reset=False):
+    """Différences entre la table publiée `previous` (pid -> ProcessRow) et `rows` ; met `previous` à jour"""
+    current = {row.pid: row for row in rows}
+    removed = [] if reset else [pid for pid in previous if pid not in current]
+    changed, added = [], []
+    for pid, row in current.items():
+        old = None if reset else previous.get(pid)
+        if old is None or old.started != row.started or old.name != row.name:
+            added.append(row)  # Nouveau processus (ou pid réutilisé)
+        elif old.ppid != row.ppid or old.cpu != row.cpu or old.rss != row.rss:
+            changed.append(row)
+    parts = [bytes([reset]), COUNT.pack(len(removed)), array("I", removed).tobytes(), COUNT.pack(len(changed))]
+    parts.extend(ROW.pack(row.pid, row.ppid, row.cpu, row.rss) for row in changed)
+    parts.append(COUNT.pack(len(added)))
+    for row in added:
+        parts.append(ROW.pack(row.pid, row.ppid, row.cpu, row.rss) + STARTED.pack(row.started))
+        parts.append(_text(row.name) + _text(row.user) + _text(row.cmdline))
+    previous.clear()
+    previous.update(current)
+    return _message(PROCESSES, b"".join(parts))
+
+
+def apply_processes(table, payload):
+    """Applique un message PROCESSES à `table` (pid -> ProcessRow)"""
+    view = memoryview(payload)
+    if view[0]:
+        table.clear()
+    offset = 1
+    (count,) = COUNT.unpack_from(view, offset)
+    offset += COUNT.size
+    for pid in array("I", view[offset:offset + 4 * count].tobytes()):
+        table.pop(pid, None)
+    offset += 4 * count
+    (count,) = COUNT.unpack_from(view, offset)
+    offset += COUNT.size
+    for _ in range(count):
+        pid, ppid, cpu, rss = ROW.unpack_from(view, offset)
+        offset += ROW.size
+        old = table.get(pid)
+        if old is not None:
+            table[pid] = old._replace(ppid=ppid, cpu=cpu, rss=rss)
+    (count,) = COUNT.unpack_from(view, offset)
+    offset += COUNT.size
+    for _ in range(count):
+        pid, ppid, cpu, rss = ROW.unpack_from(view, offset)
+        offset += ROW.size
+        (started,) = STARTED.unpack_from(view, offset)
+        offset += STARTED.size
+        texts = []
+        for _ in range(3):
+            (length,) = TEXT_LENGTH.unpack_from(view, offset)
+            offset += TEXT_LENGTH.size
+            texts.append(bytes(view[offset:offset + length]).decode("utf-8", "replace"))
+            offset += length
+        name, user, cmdline = texts
+        table[pid] = ProcessRow(pid, ppid, name, user, cmdline, cpu, rss, started)
+
+
+# --- Côté interface -------------------------------------------------------
+
+class CollectorClient(threading.Thread):
+    """Connexion au collecteur : reçoit les relevés dans un thread et les garde pour les sources"""
+
+    def __init__(self, sock, backend="auto"):
+        super().__init__(name="temporalis-collector-client", daemon=True)
+        self.sock = sock
+        self.backend = backend  # Relevé local si le collecteur s'arrête
+        self.connected = True
+        self.system = None  # (instant, CPU % par cœur, RAM %, swap %) du dernier relevé
+        self.rows = None  # Table des processus publiée (tuple de ProcessRow), None avant le premier message
+        self._table = {}
+
+    def run(self):
+        try:
+            while True:
+                header = self._receive(HEADER.size)
+                if header is None:
+                    break
+                kind, length = HEADER.unpack(header)
+                payload = self._receive(length)
+                if payload is None:
+                    break
+                if kind == SYSTEM:
+                    self.system = decode_system(payload)
+                elif kind == PROCESSES:
+                    apply_processes(self._table, payload)
+                    self.rows = tuple(self._table.values())  # Publication atomique pour la source
+        except (OSError, struct.error):
+            pass
+        self.connected = False
+        self.sock.close()
+
+    def _receive(self, size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return bytes(data)
+
+    def system_source(self):
+        return RemoteSystemSource(self)
+
+    def process_source(self):
+        return RemoteProcessSource(self)
+
+
+class RemoteSystemSource:
+    """Dernier relevé système du collecteur ; relevé local dès que la connexion est perdue"""
+
+    name = "collector"
+
+    def __init__(self, client):
+        self.client = client
+        self._local = None
+
+    def read(self):
+        client = self.client
+        if client.connected:
+            if client.system is None:
+                return None  # Premier relevé du collecteur pas encore reçu : pas de fausse mesure
+            _, percpu, ram, swap = client.system
+            return percpu, ram, swap
+        if self._local is None:
+            from temporalis.metrics import system_source
+            self._local = system_source(client.backend)
+        return self._local.read()
+
+
+class RemoteProcessSource:
+    """Table des processus tenue à jour par le collecteur ; relevé local dès que la connexion est perdue"""
+
+    name = "collector"
+
+    def __init__(self, client):
+        self.client = client
+        self._local = None
+
+    def read(self):
+        if self.client.connected:
+            return self.client.rows  # None avant la première table
+        if self._local is None:
+            from temporalis.procs import process_source
+            self._local = process_source(self.client.backend)
+        return self._local.read()
+
+
+def default_socket():
+    """Socket de l'utilisateur : dans `$XDG_RUNTIME_DIR`, sinon dans `temporalis-UID` sous le répertoire temporaire"""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, SOCKET_NAME)
+    return os.path.join(tempfile.gettempdir(), f"temporalis-{os.getuid()}", SOCKET_NAME)
+
+
+def _trusted_uid(uid):
+    return uid in (os.getuid(), 0)
+
+
+def prepare_directory(path):
+    """Crée au besoin le répertoire de la socket (0700) ; lève OSError s'il appartient à un autre utilisateur
+
+    Un répertoire où d'autres peuvent écrire n'est accepté que s'il est collant
+    (le répertoire temporaire lui-même) : personne n'y remplace la socket.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise OSError(f"{directory}: pas un répertoire")
+    if not _trusted_uid(info.st_uid):
+        raise OSError(f"{directory}: appartient à l'utilisateur {info.st_uid}")
+    if info.st_mode & 0o022 and not info.st_mode & stat.S_ISVTX:
+        raise OSError(f"{directory}: modifiable par d'autres utilisateurs (mode {stat.S_IMODE(info.st_mode):o})")
+
+
+def _peer_uid(sock):
+    """Utilisateur du processus à l'autre bout de `sock` (SO_PEERCRED, Linux), ou None ailleurs"""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    return struct.unpack("3i", creds)[1]
+
+
+def connect(path=None, backend="auto"):
+    """Client connecté au collecteur de `path` (`default_socket()` par défaut), ou None s'il ne tourne pas
+
+    Une socket ou un collecteur d'un autre utilisateur est ignoré comme s'il ne tournait pas (relevé local).
+    """
+    path = path or default_socket()
+    try:
+        if not _trusted_uid(os.stat(path).st_uid):
+            return None
+    except OSError:
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        uid = _peer_uid(sock)
+    except OSError:
+        sock.close()
+        return None
+    if uid is not None and not _trusted_uid(uid):
+        sock.close()
+        return None
+    client = CollectorClient(sock, backend)
+    client.start()
+    return client
+
+
+# --- Collecteur -----------------------------------------------------------
+
+class Collector:
+    """Socket d'écoute et clients ; chaque relevé des threads de mesure est encodé une fois et envoyé à tous"""
+
+    def __init__(self, reactor, path, sampler, monitor):
+        self.reactor = reactor
+        self.path = path
+        self.sampler = sampler
+        self.monitor = monitor
+        self.clients = {}  # socket -> octets pas encore envoyés
+        self._limits = {}  # socket -> taille de retard tolérée (MAX_BACKLOG plus la table initiale)
+        self._published = {}  # Table des processus telle que les clients la connaissent
+        self._system = b""  # Dernier message SYSTEM (envoyé aux nouveaux clients)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)  # Socket créée en 0600 : seules les interfaces de l'utilisateur s'y connectent
+        try:
+            self.server.bind(path)
+        finally:
+            os.umask(umask)
+        self.server.listen(16)
+        self.server.setblocking(False)
+        reactor.add_reader(self.server.fileno(), self._accept)
+
+    def _accept(self):
+        try:
+            sock, _ = self.server.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        # Dernier relevé et table complète : les différences suivantes s'y appliquent
+        initial = self._system + encode_processes({}, self._published.values(), reset=True)
+        self.clients[sock] = bytearray()
+        self._limits[sock] = MAX_BACKLOG + len(initial)  # Une grosse table ne coupe pas un client qui arrive
+        self.reactor.add_reader(sock.fileno(), lambda: self._on_client(sock))
+        self._send(sock, initial)
+
+    def _on_client(self, sock):
+        """Les clients n'envoient rien : une lecture signale leur départ"""
+        try:
+            data = sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(sock)
+
+    def _drop(self, sock):
+        self.reactor.remove_reader(sock.fileno())
+        self.clients.pop(sock, None)
+        self._limits.pop(sock, None)
+        sock.close()
+
+    def _send(self, sock, message):
+        """Envoie sans bloquer ; le reste attend le message suivant (client lent déconnecté au-delà de sa limite)"""
+        backlog = self.clients.get(sock)
+        if backlog is None:
+            return
+        backlog += message
+        try:
+            sent = sock.send(backlog)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(sock)
+            return
+        del backlog[:sent]
+        if len(backlog) > self._limits[sock]:
+            self._drop(sock)
+
+    def broadcast(self, message):
+        for sock in list(self.clients):
+            self._send(sock, message)
+
+    def publish_system(self):
+        snapshot = self.sampler.snapshot
+        if snapshot is not None:
+            self._system = encode_system(snapshot.time, snapshot.percpu, snapshot.ram[-1], snapshot.swap[-1])
+            self.broadcast(self._system)
+
+    def publish_processes(self):
+        self.broadcast(encode_processes(self._published, self.monitor.snapshot))
+
+    def close(self):
+        for sock in list(self.clients):
+            self._drop(sock)
+        self.reactor.remove_reader(self.server.fileno())
+        self.server.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _notify(method, reactor, callback):
+    """`method` (relevé dans un thread) suivi d'un rappel dans la boucle du collecteur"""
+    def wrapper():
+        method()
+        reactor.call_soon_threadsafe(callback)
+    return wrapper
+
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(prog="temporalis-collector", description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", default=os.environ.get("TEMPORALIS_COLLECTOR") or None,
+                        help="socket UNIX d'écoute (par défaut dans $XDG_RUNTIME_DIR, ou un répertoire 0700 "
+                             "à son nom sous le répertoire temporaire)")
+    parser.add_argument("--interval", type=float, default=1.0, help="secondes entre deux relevés système")
+    parser.add_argument("--process-interval", type=float, default=2.0, help="secondes entre deux relevés des processus")
+    parser.add_argument("--backend", choices=("auto", "procfs", "psutil"),
+                        default=os.environ.get("TEMPORALIS_BACKEND", "auto"), help="source des mesures")
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    """Point d'entrée : `temporalis-collector [--socket CHEMIN] [--interval S] [--process-interval S] [--backend B]`"""
+    from temporalis.metrics import MetricsSampler
+    from temporalis.procs import ProcessMonitor
+    from temporalis.reactor import Reactor
+
+    args = parse_args(argv)
+    args.socket = args.socket or default_socket()
+    try:
+        prepare_directory(args.socket)
+        if os.path.lexists(args.socket):
+            if connect(args.socket) is not None:
+                sys.exit(f"temporalis-collector: un collecteur écoute déjà sur {args.socket}")
+            os.unlink(args.socket)  # Socket laissée par un collecteur arrêté brutalement
+    except OSError as e:
+        sys.exit(f"temporalis-collector: {e}")
+
+    reactor = Reactor()
+    sampler = MetricsSampler(args.interval, args.interval, args.backend)  # Les interfaces gardent l'historique
+    monitor = ProcessMonitor(args.process_interval, args.backend)
+    collector = Collector(reactor, args.socket, sampler, monitor)
+    sampler.sample = _notify(sampler.sample, reactor, collector.publish_system)
+    monitor.sample = _notify(monitor.sample, reactor, collector.publish_processes)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        reactor.add_signal_handler(signum, reactor.stop)
+    sampler.start()
+    monitor.start()
+    try:
+        reactor.run()
+    finally:
+        collector.close()
+        reactor.close()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,116 @@
+"""Affichage de l'utilisation CPU adapté au nombre de cœurs
+
+Jusqu'à ce que les barres ne tiennent plus dans la section, on garde une ligne
+par cœur. Au-delà, les cœurs sont dessinés en grille compacte (un caractère
+par cœur, ombré selon la charge), suivie de la moyenne par nœud NUMA / socket
+et des cœurs les plus chargés.
+"""
+import glob
+import heapq
+import os
+from functools import lru_cache
+
+SHADES = "·░▒▓█"
+# Table pré-calculée : pourcentage entier -> caractère d'ombrage (bornée à 100 %)
+_SHADE_FOR_PERCENT = [SHADES[min(p, 100) * len(SHADES) // 101] for p in range(256)]
+
+MODES = ("auto", "bars", "heatmap")
+
+
+def parse_cpulist(text):
+    """'0-3,8,10-11' -> [0, 1, 2, 3, 8, 10, 11] (format de /sys)"""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+@lru_cache(maxsize=1)
+def cpu_groups():
+    """Groupes de cœurs : nœuds NUMA, sinon sockets physiques (liste vide si un seul groupe)
+
+    Lu une seule fois dans /sys (Linux) ; ailleurs on retourne aussi une liste vide.
+    """
+    nodes = []
+    for path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*/cpulist"),
+                       key=lambda p: int(p.split("/node")[-1].split("/")[0])):
+        try:
+            with open(path) as f:
+                cpus = parse_cpulist(f.read())
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes.append((os.path.basename(os.path.dirname(path)), cpus))
+    if len(nodes) > 1:
+        return nodes
+
+    sockets = {}
+    for path in glob.glob("/sys/devices/system/cpu/cpu[0-9]*/topology/physical_package_id"):
+        try:
+            with open(path) as f:
+                socket = int(f.read())
+        except (OSError, ValueError):
+            continue
+        cpu = int(path.split("/cpu/cpu")[1].split("/")[0])
+        sockets.setdefault(socket, []).append(cpu)
+    if len(sockets) > 1:
+        return [(f"socket{s}", sorted(cpus)) for s, cpus in sorted(sockets.items())]
+    return []
+
+
+def choose_mode(cpu_count, height):
+    """Une ligne par cœur si elles tiennent dans la hauteur disponible, sinon la grille"""
+    return "bars" if cpu_count <= height else "heatmap"
+
+
+def bar_lines(percpu):
+    lines = []
+    for i, cpu_percent in enumerate(percpu):
+        bar = '█' * int(cpu_percent / 10)
+        lines.append(f"CPU {i+1}: {cpu_percent:.1f}% | {bar.ljust(10)}")
+    return lines
+
+
+def heatmap_lines(percpu, height, width, groups=None, top_n=5):
+    """Grille de cœurs + moyennes par groupe + cœurs les plus chargés, en `height` lignes au plus"""
+    # Un seul passage sur le tableau : table d'ombrage appliquée via map (boucle en C)
+    shades = "".join(map(_SHADE_FOR_PERCENT.__getitem__, map(int, percpu)))
+    label = len(str(len(percpu))) + 1
+    per_row = max(1, width - label)
+    lines = [f"{start + 1:>{label - 1}} {shades[start:start + per_row]}"
+             for start in range(0, len(shades), per_row)]
+
+    # Moyenne par nœud NUMA / socket
+    for name, cpus in (groups or ()):
+        cpus = [c for c in cpus if c < len(percpu)]
+        if cpus:
+            average = sum(map(percpu.__getitem__, cpus)) / len(cpus)
+            lines.append(f"{name}: {average:5.1f}% {_SHADE_FOR_PERCENT[int(average)] * 5}")
+
+    # Cœurs les plus chargés, autant que la largeur le permet
+    busiest = heapq.nlargest(top_n, range(len(percpu)), key=percpu.__getitem__)
+    top = "Top:"
+    for cpu in busiest:
+        entry = f" {cpu + 1}:{percpu[cpu]:.0f}%"
+        if len(top) + len(entry) > width:
+            break
+        top += entry
+    lines.append(top)
+
+    if len(lines) > height:
+        # Priorité à la grille, puis au classement ; les moyennes par groupe sont abandonnées en premier
+        grid = (len(shades) + per_row - 1) // per_row
+        lines = lines[:max(0, min(grid, height - 1))] + [top]
+    return lines[:height]
+
+
+def cpu_lines(percpu, height, width, mode="auto"):
+    """Lignes de la partie CPU de la section System Info"""
+    if mode == "auto":
+        mode = choose_mode(len(percpu), height)
+    if mode == "bars":
+        return bar_lines(percpu)[:height]
+    return heatmap_lines(percpu, height, width, cpu_groups())
@@ -0,0 +1,251 @@
+"""Listes de répertoires mises en cache et invalidées par inotify
+
+Un répertoire n'est relu (`os.listdir`) que lorsqu'il a changé. Sous Linux,
+chaque répertoire en cache est surveillé par inotify (appelé via ctypes) : le
+descripteur est lu par le réacteur et les événements marquent les entrées
+concernées comme périmées. Ailleurs, ou si la surveillance échoue (limite de
+watches, système de fichiers sans inotify), on compare la date de
+modification du répertoire : un seul `stat` au lieu d'un listage complet.
+
+Les listes sont gardées pour les `capacity` derniers répertoires consultés
+(éviction LRU) : revenir dans un répertoire récent ne coûte rien. Le listage
+est fait par `loader` (`os.listdir` par défaut, `filebrowser.load_listing`
+pour le navigateur) ; avec `watch_content`, une modification du contenu d'un
+fichier appelle seulement `invalidate_stats()` sur la liste en cache, quand
+elle en a une. Avec `submit`, le listage passe dans le pool du navigateur :
+l'interface garde la liste précédente jusqu'à ce que la nouvelle soit prête.
+"""
+import ctypes
+import os
+import struct
+import sys
+import time
+from collections import OrderedDict
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ONLYDIR = 0x1000000
+
+# Changements de la liste des noms (la modification du contenu des fichiers est ignorée)
+DIRECTORY_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+# Changements de taille, de date ou de droits d'un fichier du répertoire
+CONTENT_EVENTS = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (suivi du nom, complété par des \0)
+
+# Délai en dessous duquel une date de modification n'est pas fiable (granularité du système de fichiers)
+_MTIME_SLACK_NS = 1_000_000_000
+
+
+class Inotify:
+    """Descripteur inotify non bloquant (Linux), via la libc chargée par Python"""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify n'est disponible que sous Linux")
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask=DIRECTORY_EVENTS):
+        """Numéro de surveillance (wd) de `path` ; lève OSError en cas d'échec"""
+        wd = self._add_watch(self.fd, os.fsencode(path), mask | IN_ONLYDIR)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd):
+        self._rm_watch(self.fd, wd)  # Erreur ignorée : la surveillance a pu disparaître avec le répertoire
+
+    def read_events(self):
+        """Liste de (wd, mask, nom) pour tous les événements en attente"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class DirectoryCache:
+    """Cache LRU des listes de répertoires, invalidé par inotify ou par la date de modification"""
+
+    def __init__(self, capacity=16, use_inotify=True, loader=os.listdir, watch_content=False, submit=None):
+        self.capacity = max(1, capacity)
+        self.loader = loader
+        self.mask = DIRECTORY_EVENTS | (CONTENT_EVENTS if watch_content else 0)
+        # `submit(jeton, tâche, *args)` exécute le listage en arrière-plan (`FileBrowser.submit`) ; sinon tout de suite
+        self.submit = submit
+        self._entries = OrderedDict()  # chemin -> [liste, mtime_ns, début du listage (ns), wd ou None, périmé]
+        self._watched = {}  # wd -> chemins (plusieurs chemins peuvent désigner le même répertoire)
+        self._scanning = set()  # Chemins en cours de listage
+        self._scanned = {}  # chemin -> (liste, mtime_ns, début) ou OSError, publié par le listage
+        self.inotify = None
+        if use_inotify:
+            try:
+                self.inotify = Inotify()
+            except (OSError, AttributeError):
+                self.inotify = None  # Repli sur la comparaison des dates de modification
+
+    @property
+    def fd(self):
+        """Descripteur à surveiller dans le réacteur (None sans inotify)"""
+        return self.inotify.fd if self.inotify is not None else None
+
+    def listing(self, path):
+        """Liste de `path` (résultat de `loader`), relue seulement s'il a changé ; lève OSError si illisible
+
+        Avec `submit`, le listage se fait en arrière-plan : en attendant on
+        retourne la liste périmée (None pour un répertoire pas encore lu), et la
+        nouvelle au premier appel qui suit la fin du listage.
+        """
+        if path in self._scanned:
+            self._install(path)
+        entry = self._entries.get(path)
+        if entry is not None and not entry[4]:
+            if entry[3] is not None:  # Surveillé : les événements suffisent
+                self._entries.move_to_end(path)
+                return entry[0]
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                self._forget(path)
+                raise
+            # Une modification dans la même seconde que le listage peut ne pas changer la date
+            if mtime == entry[1] and mtime < entry[2] - _MTIME_SLACK_NS:
+                self._entries.move_to_end(path)
+                return entry[0]
+        if path in self._scanning:
+            return entry[0] if entry is not None else None
+        self._start_scan(path, entry)
+        if self.submit is None:
+            self._load(path)
+            return self._install(path)
+        self.submit(("scan", path), self._load, path)
+        return entry[0] if entry is not None else None
+
+    def _start_scan(self, path, entry):
+        """Surveillance et entrée (liste actuelle gardée, ou None) avant le listage"""
+        wd = entry[3] if entry is not None else None
+        if wd is None and self.inotify is not None:
+            # Surveillance posée avant le listage : aucun changement ne peut passer entre les deux
+            try:
+                wd = self.inotify.add_watch(path, self.mask)
+                self._watched.setdefault(wd, set()).add(path)
+            except OSError:
+                wd = None
+        names, mtime, started = entry[:3] if entry is not None else (None, 0, 0)
+        # Un événement reçu pendant le listage marquera de nouveau l'entrée comme périmée
+        self._entries[path] = [names, mtime, started, wd, False]
+        self._entries.move_to_end(path)
+        self._scanning.add(path)
+        while len(self._entries) > self.capacity:
+            self._forget(next(iter(self._entries)))
+
+    def _load(self, path):
+        """Listage proprement dit (éventuellement dans un thread du pool) : le résultat est seulement publié"""
+        started = time.time_ns()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            result = (self.loader(path), mtime, started)
+        except OSError as e:
+            result = e
+        self._scanned[path] = result
+
+    def _install(self, path):
+        """Range le résultat publié par `_load` dans le cache (thread de l'interface)"""
+        result = self._scanned.pop(path)
+        self._scanning.discard(path)
+        entry = self._entries.get(path)
+        if entry is None:
+            return None  # Évincé pendant le listage
+        if isinstance(result, OSError):
+            self._forget(path)
+            raise result
+        entry[:3] = result
+        return entry[0]
+
+    def _forget(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None and entry[3] is not None:
+            paths = self._watched.get(entry[3])
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._watched[entry[3]]
+                    self.inotify.rm_watch(entry[3])
+
+    def invalidate(self, path=None):
+        """Marque `path` (ou tout le cache) comme à relire"""
+        for key in ([path] if path is not None else list(self._entries)):
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[4] = True
+
+    def handle_events(self):
+        """À appeler quand le descripteur inotify est lisible : retourne les chemins invalidés"""
+        changed = set()
+        for wd, mask, _ in self.inotify.read_events():
+            if mask & IN_Q_OVERFLOW:  # Événements perdus : tout est à relire
+                self.invalidate()
+                changed.update(self._entries)
+                continue
+            paths = self._watched.get(wd, ())
+            if not mask & (DIRECTORY_EVENTS | IN_IGNORED):
+                # Seul le contenu d'un fichier a changé : la liste des noms reste valable
+                for path in paths:
+                    entry = self._entries.get(path)
+                    # Seules les listes qui gardent des attributs (`load_listing`) ont quelque chose à oublier
+                    invalidate_stats = getattr(entry[0], "invalidate_stats", None) if entry is not None else None
+                    if invalidate_stats is not None:
+                        invalidate_stats()
+                changed.update(paths)
+                continue
+            for path in paths:
+                entry = self._entries.get(path)
+                if entry is not None:
+                    entry[4] = True
+                    if mask & IN_IGNORED:  # Surveillance retirée par le noyau (répertoire supprimé)
+                        entry[3] = None
+            changed.update(paths)
+            if mask & IN_IGNORED:
+                self._watched.pop(wd, None)
+        return changed
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+        self._entries.clear()
+        self._watched.clear()
+        self._scanning.clear()
+        self._scanned.clear()
@@ -0,0 +1,181 @@
+"""Navigateur de fichiers virtualisé pour la section Files/Directories
+
+Le listage (`os.scandir`) ne donne que les noms et les types, sans `stat`.
+Tailles et dates ne sont lues que pour les lignes visibles, par un petit pool
+de threads : un système de fichiers lent (NFS...) ne bloque jamais la saisie.
+Les demandes de stat portent la génération de la fenêtre qui les a faites :
+celles d'une fenêtre déjà quittée (défilement rapide) sont abandonnées.
+Les ordres de tri sont des tableaux d'indices calculés une fois par
+répertoire et par clé ; le sens inverse se lit à l'envers, sans re-tri.
+Défiler ne coûte donc que la fenêtre visible, même pour 500 000 entrées.
+"""
+import os
+import queue
+import threading
+import time
+from array import array
+
+SORT_KEYS = ("name", "size", "mtime", "type")
+
+# Type d'entrée, comme la première colonne de `ls -l` : d (dossier), l (lien), - (fichier), ? (autre)
+_KIND_RANK = {"d": 0, "l": 1, "-": 2, "?": 3}
+
+SYNC_SORT_LIMIT = 5000  # Jusqu'à cette taille, le tri par nom ou par type est fait tout de suite
+
+
+class DirectoryListing:
+    """Noms et types d'un répertoire, avec les attributs lus et les tris déjà calculés"""
+
+    def __init__(self, path, names, kinds):
+        self.path = path
+        self.names = names
+        self.kinds = kinds  # Un caractère par entrée
+        self.stats = {}  # index -> (taille, mtime), rempli par le pool
+        self.orders = {}  # clé -> array d'indices
+
+    def __len__(self):
+        return len(self.names)
+
+    def invalidate_stats(self):
+        """Le contenu d'un fichier a changé : les attributs affichés seront relus"""
+        self.stats = {}
+
+
+def load_listing(path):
+    """Listage par `os.scandir` : le type vient de readdir, sans appel à stat"""
+    names = []
+    kinds = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            names.append(entry.name)
+            if entry.is_symlink():
+                kinds.append("l")
+            elif entry.is_dir(follow_symlinks=False):
+                kinds.append("d")
+            elif entry.is_file(follow_symlinks=False):
+                kinds.append("-")
+            else:
+                kinds.append("?")
+    return DirectoryListing(path, names, "".join(kinds))
+
+
+def compute_order(listing, key):
+    """Indices des entrées triées selon `key` (taille et date : les plus grandes / récentes d'abord)"""
+    names = listing.names
+    indices = range(len(names))
+    if key == "name":
+        order = sorted(indices, key=names.__getitem__)
+    elif key == "type":
+        kinds = listing.kinds
+        order = sorted(indices, key=lambda i: (_KIND_RANK[kinds[i]], names[i]))
+    else:
+        # Tri sur un attribut : il faut le stat de chaque entrée (toujours fait dans le pool)
+        values = []
+        path = listing.path
+        for name in names:
+            try:
+                st = os.lstat(os.path.join(path, name))
+                values.append(st.st_size if key == "size" else st.st_mtime)
+            except OSError:
+                values.append(-1)
+        order = sorted(indices, key=values.__getitem__, reverse=True)
+    return array("l", order)
+
+
+class FileBrowser:
+    """Lignes visibles d'un DirectoryListing trié, avec stat différé dans des threads de fond"""
+
+    def __init__(self, workers=4, on_ready=None):
+        self.on_ready = on_ready  # Appelé (depuis un thread du pool) quand des résultats sont disponibles
+        self._jobs = queue.LifoQueue()  # Dernières demandes d'abord : la fenêtre actuelle passe avant
+        self._pending = {}  # jeton -> génération de la demande en attente
+        self._wake_pending = False
+        self._view = None  # Dernière fenêtre affichée par `rows`
+        self.generation = 0  # Change avec la fenêtre : les stat demandés pour les précédentes sont abandonnés
+        for n in range(workers):
+            threading.Thread(target=self._work, name=f"temporalis-stat-{n}", daemon=True).start()
+
+    def _work(self):
+        while True:
+            self._run(*self._jobs.get())
+
+    def _run(self, token, generation, job, args):
+        if generation is not None and generation != self.generation:
+            # Fenêtre quittée avant son tour : la ligne sera redemandée si elle redevient visible
+            if self._pending.get(token, -1) == generation:
+                self._pending.pop(token, None)
+            return
+        try:
+            job(*args)
+        finally:
+            if self._pending.get(token, -1) == generation:
+                self._pending.pop(token, None)
+            if not self._wake_pending and self.on_ready is not None:
+                self._wake_pending = True  # Un seul réveil de l'interface par lot de résultats
+                self.on_ready()
+
+    def submit(self, token, job, *args, generation=None):
+        """Exécute `job(*args)` dans le pool, une seule fois tant que `token` est en attente ; puis `on_ready`
+
+        Une tâche marquée d'une `generation` est abandonnée si la fenêtre a changé avant son tour.
+        """
+        if self._pending.get(token, -1) != generation:
+            self._pending[token] = generation
+            self._jobs.put((token, generation, job, args))
+
+    def order(self, listing, key):
+        """Ordre de tri en cache, ou None s'il est en cours de calcul (ordre du listage en attendant)"""
+        order = listing.orders.get(key)
+        if order is None:
+            if key in ("name", "type") and len(listing) <= SYNC_SORT_LIMIT:
+                order = listing.orders[key] = compute_order(listing, key)
+            else:
+                self.submit((id(listing), key), self._sort, listing, key)
+        return order
+
+    @staticmethod
+    def _sort(listing, key):
+        listing.orders[key] = compute_order(listing, key)
+
+    @staticmethod
+    def _stat(listing, stats, index):
+        try:
+            st = os.lstat(os.path.join(listing.path, listing.names[index]))
+            stats[index] = (st.st_size, st.st_mtime)
+        except OSError:
+            stats[index] = (-1, 0.0)  # Entrée supprimée depuis le listage
+
+    def rows(self, listing, key="name", reverse=False, start=0, count=0, with_stats=True):
+        """(nom, type, taille, mtime) des lignes `start` à `start + count` ; taille et mtime valent None avant le stat"""
+        self._wake_pending = False
+        view = (id(listing), key, reverse, start, count)
+        if view != self._view:
+            self._view = view
+            self.generation += 1
+        total = len(listing)
+        order = self.order(listing, key)
+        names, kinds, stats = listing.names, listing.kinds, listing.stats
+        rows = []
+        for position in range(start, min(total, start + count)):
+            if reverse:
+                position = total - 1 - position
+            index = order[position] if order is not None else position
+            info = stats.get(index)
+            if info is None:
+                info = (None, None)
+                if with_stats:
+                    self.submit((id(stats), index), self._stat, listing, stats, index, generation=self.generation)
+            rows.append((names[index], kinds[index]) + info)
+        return rows
+
+
+def format_mtime(mtime, now=None):
+    """Date de modification sur 12 caractères, comme `ls -l` (l'année remplace l'heure après six mois)"""
+    if mtime is None:
+        return "…".rjust(12)
+    if mtime <= 0:
+        return "?".rjust(12)
+    now = time.time() if now is None else now
+    if abs(now - mtime) < 182 * 86400:
+        return time.strftime("%b %d %H:%M", time.localtime(mtime))
+    return time.strftime("%b %d  %Y", time.localtime(mtime))
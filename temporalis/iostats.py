@@ -0,0 +1,265 @@
+"""Débit des disques et des interfaces réseau, relevé dans un thread séparé
+
+Le thread `IOSampler` relit les compteurs cumulés de chaque périphérique
+(/proc/diskstats et /proc/net/dev sous Linux, psutil ailleurs) et en déduit,
+par différence avec le relevé précédent, les octets/s et les opérations/s
+(IOPS pour les disques, paquets/s pour le réseau). Pour tenir sur des machines
+à centaines de périphériques, tout est filtré et regroupé avant le moindre
+formatage :
+
+- les partitions sont ignorées (leur activité est déjà comptée par le disque),
+  ainsi que l'interface loopback ;
+- les périphériques virtuels (loop, dm-, veth, bridges...) sont regroupés par
+  préfixe de nom (`veth*`), les différences de chacun étant additionnées :
+  l'apparition ou la disparition d'une interface ne fausse pas le groupe ;
+- chaque ligne garde l'historique de son débit dans un tampon circulaire.
+
+Le résultat est publié comme un `IOSnapshot` immuable ; l'interface n'en
+formate que les lignes les plus chargées (`top`).
+"""
+import heapq
+import os
+import re
+import sys
+import threading
+import time
+from collections import namedtuple
+
+from temporalis.metrics import History
+
+SECTOR = 512  # Taille des secteurs de /proc/diskstats, quel que soit le disque
+HISTORY = 60  # Relevés gardés par ligne (sparkline)
+# Préfixes des périphériques virtuels : noms des groupes, et seul indice hors Linux (pas de /sys)
+VIRTUAL_PREFIXES = ("loop", "ram", "zram", "dm-", "md", "nbd", "veth", "docker", "br-", "virbr", "vnet",
+                    "tap", "tun", "cali", "flannel", "cni", "ifb", "bridge", "utun", "gif", "stf")
+
+IORate = namedtuple("IORate", "name count read write ops history")
+IORate.__doc__ = """Ligne publiée : débit lu/écrit (reçu/envoyé) en octets/s, opérations/s et historique du débit total"""
+IOSnapshot = namedtuple("IOSnapshot", "time disks nics interval")
+
+_LETTERS = re.compile(r"[A-Za-z_]+")
+_UNSEEN = object()  # Pas encore classé (None, False et True sont des réponses)
+
+
+def group_name(name, virtual):
+    """Nom de la ligne d'un périphérique : lui-même, ou `préfixe*` pour un virtuel (veth3f2a1b0 -> veth*)"""
+    if not virtual:
+        return name
+    for prefix in VIRTUAL_PREFIXES:
+        if name.startswith(prefix):
+            return prefix + "*"
+    match = _LETTERS.match(name)
+    return (match.group() if match else name) + "*"
+
+
+class _SysClassifier:
+    """Périphérique physique, virtuel, ou à ignorer, d'après /sys (Linux) ; gardé en cache par nom"""
+
+    def __init__(self, directory, keep_unknown):
+        self.directory = directory
+        self.keep_unknown = keep_unknown  # Faux pour les disques : absent de /sys/block = partition
+        self._cache = {}
+
+    def __call__(self, name):
+        """None (ignoré), False (physique) ou True (virtuel)"""
+        kind = self._cache.get(name, _UNSEEN)
+        if kind is _UNSEEN:
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                kind = "/devices/virtual/" in os.path.realpath(path)  # Lien vers le périphérique dans /sys/devices
+            elif self.keep_unknown:
+                kind = name.startswith(VIRTUAL_PREFIXES)
+            else:
+                kind = None
+            if len(self._cache) > 4096:
+                self._cache.clear()  # Interfaces éphémères (conteneurs) : le cache ne grossit pas sans fin
+            self._cache[name] = kind
+        return kind
+
+
+def _prefix_classifier(name):
+    return name.startswith(VIRTUAL_PREFIXES)
+
+
+class ProcfsIOSource:
+    """Compteurs des disques et des interfaces depuis /proc/diskstats et /proc/net/dev"""
+
+    name = "procfs"
+
+    def __init__(self):
+        from temporalis.procfs import PROC, _Reader
+        self._proc = PROC
+        self._reader = _Reader(1 << 20)  # Des centaines de périphériques tiennent dans une lecture
+        self.disk_kind = _SysClassifier("/sys/block", keep_unknown=False)
+        self.nic_kind = _SysClassifier("/sys/class/net", keep_unknown=True)
+
+    def read(self):
+        """({disque: (octets lus, écrits, opérations)}, {interface: (octets reçus, envoyés, paquets)})"""
+        disks = {}
+        for line in self._reader.read(f"{self._proc}/diskstats").split(b"\n"):
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            # Majeur, mineur, nom, puis lectures terminées (3), secteurs lus (5), écritures (7), secteurs écrits (9)
+            disks[fields[2].decode()] = (int(fields[5]) * SECTOR, int(fields[9]) * SECTOR,
+                                         int(fields[3]) + int(fields[7]))
+        nics = {}
+        for line in self._reader.read(f"{self._proc}/net/dev").split(b"\n")[2:]:
+            name, _, values = line.partition(b":")
+            fields = values.split()
+            if len(fields) < 10:
+                continue
+            # Reçus : octets (0), paquets (1) ; envoyés : octets (8), paquets (9)
+            nics[name.strip().decode()] = (int(fields[0]), int(fields[8]), int(fields[1]) + int(fields[9]))
+        return disks, nics
+
+
+class PsutilIOSource:
+    """Compteurs des disques et des interfaces via psutil (toutes plateformes)"""
+
+    name = "psutil"
+
+    def __init__(self):
+        if sys.platform.startswith("linux"):
+            self.disk_kind = _SysClassifier("/sys/block", keep_unknown=False)
+            self.nic_kind = _SysClassifier("/sys/class/net", keep_unknown=True)
+        else:
+            self.disk_kind = self.nic_kind = _prefix_classifier
+
+    def read(self):
+        import psutil
+        disks = {name: (c.read_bytes, c.write_bytes, c.read_count + c.write_count)
+                 for name, c in (psutil.disk_io_counters(perdisk=True) or {}).items()}
+        nics = {name: (c.bytes_recv, c.bytes_sent, c.packets_recv + c.packets_sent)
+                for name, c in (psutil.net_io_counters(pernic=True) or {}).items()}
+        return disks, nics
+
+
+def io_source(backend="auto"):
+    """Source des compteurs d'E/S : "procfs" (Linux), "psutil", ou "auto" pour procfs quand /proc est disponible"""
+    if backend in ("auto", "procfs"):
+        from temporalis import procfs
+        if procfs.available() and os.path.exists("/proc/diskstats"):
+            return ProcfsIOSource()
+    return PsutilIOSource()
+
+
+class _Rates:
+    """Différences des compteurs d'une famille de périphériques (disques ou interfaces), regroupées par ligne"""
+
+    def __init__(self, classify, skip=()):
+        self.classify = classify
+        self.skip = frozenset(skip)
+        self._last = {}  # Périphérique -> compteurs du relevé précédent
+        self._groups = {}  # Périphérique -> nom de sa ligne (None : ignoré)
+        self._history = {}  # Ligne -> History du débit total
+
+    def update(self, counters, elapsed):
+        """Lignes (IORate) pour les compteurs `counters` relevés `elapsed` secondes après les précédents
+
+        Sans `elapsed` (premier relevé), les compteurs servent seulement de référence.
+        """
+        if not elapsed:
+            self._last = counters
+            return ()
+        last, groups = self._last, self._groups
+        totals = {}  # Ligne -> [lus, écrits, opérations, nombre de périphériques]
+        for name, values in counters.items():
+            group = groups.get(name, _UNSEEN)
+            if group is _UNSEEN:
+                kind = None if name in self.skip else self.classify(name)
+                group = groups[name] = None if kind is None else group_name(name, kind)
+            if group is None:
+                continue
+            previous = last.get(name)
+            total = totals.get(group)
+            if total is None:
+                total = totals[group] = [0, 0, 0, 0]
+            total[3] += 1
+            if previous is not None:
+                # Un compteur qui recule (remise à zéro, débordement) compte pour zéro
+                total[0] += max(0, values[0] - previous[0])
+                total[1] += max(0, values[1] - previous[1])
+                total[2] += max(0, values[2] - previous[2])
+        self._last = counters
+        if len(groups) > 2 * len(counters) + 64:
+            self._groups = {name: groups[name] for name in counters if name in groups}  # Périphériques disparus
+
+        rows = []
+        history = self._history
+        for group, (read, write, ops, count) in totals.items():
+            read, write, ops = read / elapsed, write / elapsed, ops / elapsed
+            ring = history.get(group)
+            if ring is None:
+                ring = history[group] = History(HISTORY)
+            ring.append(read + write)
+            rows.append(IORate(group, count, read, write, ops, ring.ordered()))
+        for group in [group for group in history if group not in totals]:
+            del history[group]
+        return tuple(rows)
+
+
+class IOSampler(threading.Thread):
+    """Thread de fond qui relève les compteurs d'E/S toutes les `interval` secondes et publie leurs débits"""
+
+    def __init__(self, interval=1.0, backend="auto"):
+        super().__init__(name="temporalis-io", daemon=True)
+        self.interval = interval
+        self.backend = backend
+        self.source = None  # Créée dans le thread
+        self.snapshot = None  # Dernier IOSnapshot publié (None avant le deuxième relevé)
+        self.cost = 0.0  # Durée (secondes) du dernier relevé
+        self._disks = self._nics = None
+        self._previous = None  # Instant du relevé précédent
+        self._stopped = False
+        self._wake = threading.Event()  # Fin de l'attente : arrêt, ou intervalle raccourci
+
+    def run(self):
+        if self.source is None:
+            self.source = io_source(self.backend)
+        self._disks = _Rates(self.source.disk_kind)
+        self._nics = _Rates(self.source.nic_kind, skip=("lo",))  # Trafic local : pas une carte réseau
+        while True:
+            self.sample()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped:
+                break
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def set_interval(self, interval):
+        """Change le rythme des relevés ; un rythme plus rapide prend effet tout de suite"""
+        faster = interval < self.interval
+        self.interval = interval
+        if faster:
+            self._wake.set()
+
+    def sample(self):
+        start = time.perf_counter()
+        now = time.monotonic()
+        disks, nics = self.source.read()
+        elapsed = now - self._previous if self._previous is not None else None
+        self._previous = now
+        disk_rows = self._disks.update(disks, elapsed)
+        nic_rows = self._nics.update(nics, elapsed)
+        if elapsed:
+            self.snapshot = IOSnapshot(time.time(), disk_rows, nic_rows, elapsed)
+        self.cost = time.perf_counter() - start
+
+
+def top(rows, count):
+    """Les `count` lignes au plus fort débit total, de la plus chargée à la moins chargée"""
+    if count <= 0:
+        return []
+    return heapq.nlargest(count, rows, key=lambda row: (row.read + row.write, row.ops))
+
+
+def format_count(value):
+    """Opérations par seconde -> texte court (k, M)"""
+    for unit in ("", "k", "M"):
+        if value < 1000 or unit == "M":
+            return f"{value:.1f}{unit}" if unit and value < 10 else f"{value:.0f}{unit}"
+        value /= 1000
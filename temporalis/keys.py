@@ -0,0 +1,49 @@
+"""Touches curses traduites en octets pour un programme qui tourne dans le PTY
+
+Quand un programme interactif (vim, less, htop...) a le clavier, chaque touche
+lue par `getch` est réécrite telle qu'un vrai terminal xterm l'enverrait. Les
+flèches suivent le mode curseur de l'application (DECCKM, `Screen.app_cursor`) :
+ESC [ A en mode normal, ESC O A en mode application.
+"""
+import curses
+
+_CURSOR_KEYS = {
+    curses.KEY_UP: "A",
+    curses.KEY_DOWN: "B",
+    curses.KEY_RIGHT: "C",
+    curses.KEY_LEFT: "D",
+    curses.KEY_HOME: "H",
+    curses.KEY_END: "F",
+}
+
+_SEQUENCES = {
+    curses.KEY_IC: b"\x1b[2~",
+    curses.KEY_DC: b"\x1b[3~",
+    curses.KEY_PPAGE: b"\x1b[5~",
+    curses.KEY_NPAGE: b"\x1b[6~",
+    curses.KEY_BACKSPACE: b"\x7f",
+    curses.KEY_ENTER: b"\r",
+    curses.KEY_BTAB: b"\x1b[Z",
+    curses.KEY_F1: b"\x1bOP",
+    curses.KEY_F2: b"\x1bOQ",
+    curses.KEY_F3: b"\x1bOR",
+    curses.KEY_F4: b"\x1bOS",
+    curses.KEY_F5: b"\x1b[15~",
+    curses.KEY_F6: b"\x1b[17~",
+    curses.KEY_F7: b"\x1b[18~",
+    curses.KEY_F8: b"\x1b[19~",
+    curses.KEY_F9: b"\x1b[20~",
+    curses.KEY_F10: b"\x1b[21~",
+    curses.KEY_F11: b"\x1b[23~",
+}
+
+
+def encode_key(key, app_cursor=False):
+    """Octets à écrire dans le PTY pour la touche `key` (code de getch), ou None si elle n'a pas d'équivalent"""
+    if 0 <= key <= 0xFF:
+        # Caractère (les caractères UTF-8 arrivent octet par octet) ou touche de contrôle (Ctrl+C = 3...)
+        return b"\r" if key == 10 else bytes((key,))
+    final = _CURSOR_KEYS.get(key)
+    if final is not None:
+        return ("\x1bO" if app_cursor else "\x1b[").encode() + final.encode()
+    return _SEQUENCES.get(key)
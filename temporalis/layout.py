@@ -0,0 +1,58 @@
+"""Géométrie des sections, recalculée à chaque changement de taille du terminal
+
+`compute_layout` donne la place de chaque section pour une taille d'écran :
+les sections existantes sont ensuite redimensionnées et déplacées
+(`Panel.move_resize`) au lieu d'être recréées. `terminal_size` relit la taille
+réelle du terminal, que curses ne met pas à jour tout seul quand le réacteur
+gère SIGWINCH.
+"""
+import os
+import sys
+
+MIN_HEIGHT = 3  # Bordure haute, une ligne de contenu, bordure basse
+MIN_WIDTH = 3
+IO_MIN_HEIGHT = 6  # Bordures, puis en-tête et première ligne des disques et des interfaces
+
+
+def compute_layout(max_height, max_width):
+    """Section -> (hauteur, largeur, y, x) pour un écran de `max_height` x `max_width`
+
+    Le quart gauche reçoit System Info au-dessus de Running Processes, le quart
+    du milieu Files/Directories au-dessus de Date and Time, I/O Throughput et
+    Additional Info, la moitié droite Terminal Output au-dessus des 3 lignes de
+    Terminal Input. I/O Throughput prend à Additional Info les lignes qui lui
+    manquent pour atteindre `IO_MIN_HEIGHT` (sur 80x24 notamment).
+    """
+    top_height = max_height // 2
+    bottom_height = max_height - top_height
+
+    left_width = max_width // 4
+    middle_width = max_width // 4
+    right_width = max_width - left_width - middle_width
+    right_x = left_width + middle_width
+    datetime_height = min(3, bottom_height // 2)  # Une seule ligne : le reste de sa place va aux débits d'E/S
+    io_height = max(bottom_height // 2 - datetime_height,
+                    min(IO_MIN_HEIGHT, bottom_height - datetime_height - MIN_HEIGHT))
+    info_y = top_height + datetime_height + io_height
+
+    sections = {
+        "system_info": (top_height, left_width, 0, 0),
+        "files": (top_height, left_width, 0, left_width),
+        "processes": (bottom_height, left_width, top_height, 0),
+        "output": (max_height - 3, right_width, 0, right_x),
+        "input": (3, right_width, max_height - 3, right_x),
+        "datetime": (datetime_height, middle_width, top_height, left_width),
+        "io": (io_height, middle_width, top_height + datetime_height, left_width),
+        "info": (max_height - info_y, middle_width, info_y, left_width),
+    }
+    # Un terminal minuscule ne doit pas donner de fenêtre vide (curses refuse)
+    return {name: (max(MIN_HEIGHT, h), max(MIN_WIDTH, w), y, x) for name, (h, w, y, x) in sections.items()}
+
+
+def terminal_size(fd=None):
+    """(lignes, colonnes) du terminal, lues par TIOCGWINSZ"""
+    try:
+        size = os.get_terminal_size(sys.stdout.fileno() if fd is None else fd)
+    except OSError:
+        return None
+    return size.lines, size.columns
@@ -0,0 +1,129 @@
+"""Échantillonnage des mesures système dans un thread séparé
+
+Le thread `MetricsSampler` relève CPU, RAM, swap et charge à intervalle
+régulier et garde l'historique dans des tampons circulaires `array('f')`.
+À chaque relevé il publie un `Snapshot` immuable : l'interface lit
+`sampler.snapshot` sans verrou et sans jamais appeler psutil elle-même.
+
+Les valeurs viennent d'une « source » : psutil partout, ou la lecture directe
+de /proc sous Linux (voir `temporalis.procfs`) ; psutil n'est importé que par
+sa source.
+"""
+import os
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+Snapshot = namedtuple("Snapshot", "time percpu cpu ram swap load cpu_count interval")
+Snapshot.__doc__ = """Mesures publiées par le thread : dernières valeurs par CPU et historiques (plus ancien en premier)"""
+
+
+class History:
+    """Tampon circulaire de flottants à capacité fixe"""
+
+    def __init__(self, capacity):
+        self.capacity = max(1, capacity)
+        self._data = array("f", bytes(4 * self.capacity))
+        self._pos = 0  # Prochaine case écrite
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._data[self._pos] = value
+        self._pos = (self._pos + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def last(self):
+        return self._data[self._pos - 1] if self._count else 0.0
+
+    def ordered(self):
+        """Copie des valeurs, de la plus ancienne à la plus récente"""
+        if self._count < self.capacity:
+            return self._data[:self._count]
+        return self._data[self._pos:] + self._data[:self._pos]
+
+
+class PsutilSystemSource:
+    """Mesures système via psutil (toutes plateformes)"""
+
+    name = "psutil"
+
+    def __init__(self):
+        import psutil
+        psutil.cpu_percent(interval=None, percpu=True)  # Le premier appel sert de référence
+
+    def read(self):
+        """(CPU % par cœur, RAM %, swap %)"""
+        import psutil
+        return (psutil.cpu_percent(interval=None, percpu=True),
+                psutil.virtual_memory().percent,
+                psutil.swap_memory().percent)
+
+
+def system_source(backend="auto"):
+    """Source des mesures système : "procfs" (Linux), "psutil", ou "auto" pour procfs quand /proc est disponible"""
+    if backend in ("auto", "procfs"):
+        from temporalis import procfs
+        if procfs.available():
+            return procfs.ProcfsSystemSource()
+    return PsutilSystemSource()
+
+
+class MetricsSampler(threading.Thread):
+    """Thread de fond qui relève les mesures système toutes les `interval` secondes"""
+
+    def __init__(self, interval=1.0, history_seconds=600, backend="auto", source=None):
+        super().__init__(name="temporalis-metrics", daemon=True)
+        self.interval = interval
+        self.backend = backend
+        capacity = max(1, int(history_seconds / interval))
+        self.cpu = History(capacity)
+        self.ram = History(capacity)
+        self.swap = History(capacity)
+        self.load = History(capacity)
+        self.cpu_count = os.cpu_count() or 1
+        self.source = source  # Sinon créée dans le thread : la première lecture sert de référence
+        self.snapshot = None  # Dernier Snapshot publié (None avant le premier relevé)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        if self.source is None:
+            self.source = system_source(self.backend)
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def sample(self):
+        reading = self.source.read()
+        if reading is None:
+            return  # Source sans relevé (collecteur pas encore entendu) : rien n'est ajouté à l'historique
+        percpu, ram, swap = reading
+        percpu = array("f", percpu)
+        self.cpu.append(sum(percpu) / len(percpu) if percpu else 0.0)
+        self.ram.append(ram)
+        self.swap.append(swap)
+        self.load.append(os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0)
+
+        # Publication atomique : l'interface ne voit jamais un relevé à moitié écrit
+        self.snapshot = Snapshot(time.time(), percpu, self.cpu.ordered(), self.ram.ordered(),
+                                 self.swap.ordered(), self.load.ordered(), self.cpu_count, self.interval)
+
+
+def sparkline(values, width, low=0.0, high=100.0):
+    """Historique réduit à `width` caractères (maximum de chaque tranche, pour garder les pics)"""
+    if width <= 0 or not len(values):
+        return ""
+    n = len(values)
+    if n > width:
+        step = n / width
+        values = [max(values[int(i * step):max(int(i * step) + 1, int((i + 1) * step))]) for i in range(width)]
+    span = (high - low) or 1.0
+    top = len(SPARK_CHARS) - 1
+    return "".join(SPARK_CHARS[max(0, min(top, int((v - low) / span * top + 0.5)))] for v in values)
@@ -0,0 +1,163 @@
+"""Instrumentation de la boucle : temps par phase, latence, débit du PTY et appels système
+
+`Profiler` est inactif par défaut : une fonction décorée par `timed` ne coûte
+alors qu'un test de plus par appel. Une fois activé (touche F10 ou
+`--perf-log`), il chronomètre chaque appel décoré, reçoit du réacteur la
+durée de chaque tour de boucle (« loop ») et du moteur de rendu celle de
+chaque image (« frame »), et cumule les compteurs que l'interface lui passe
+(octets et lectures du PTY). Toutes les secondes, `tick` résume la fenêtre
+écoulée dans `report` (percentiles, débits, temps CPU du processus, appels
+système read/write lus dans /proc/self/io sous Linux) ; ce résumé est affiché par l'interface et,
+avec `--perf-log`, ajouté en JSON au fichier, une ligne par seconde.
+"""
+import functools
+import json
+import time
+from collections import defaultdict
+
+PROCESS_IO = "/proc/self/io"
+
+
+def percentile(values, fraction):
+    """Valeur sous laquelle tombe `fraction` des valeurs triées `values` (0 sans valeur)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def process_syscalls(path=PROCESS_IO):
+    """(appels read, appels write) du processus depuis son lancement, ou None hors de Linux"""
+    try:
+        with open(path) as f:
+            fields = dict(line.split(":", 1) for line in f.read().splitlines() if ":" in line)
+        return int(fields["syscr"]), int(fields["syscw"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def summarize(durations):
+    """Nombre d'appels, p50, p99 et maximum (ms) d'une liste de durées en secondes"""
+    values = sorted(durations)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.5) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+class Profiler:
+    """Durées et compteurs de la boucle, résumés une fois par seconde"""
+
+    def __init__(self):
+        self.enabled = False
+        self.report = None  # Dernier résumé (dict), None avant la première seconde mesurée
+        self._log = None  # Fichier JSONL ouvert par enable()
+        self._durations = defaultdict(list)  # Nom -> durées (s) de la fenêtre en cours
+        self._counters = defaultdict(int)  # Nom -> total de la fenêtre en cours
+        self._start = time.monotonic()
+        self._syscalls = None
+        self._cpu_time = 0.0
+
+    def enable(self, log_path=None):
+        if log_path and self._log is None:
+            self._log = open(log_path, "a", buffering=1)  # Une ligne par seconde, écrite tout de suite
+        if not self.enabled:
+            self.enabled = True
+            self._reset()
+
+    def disable(self):
+        """Arrête les mesures (sauf si elles vont dans un fichier) ; le dernier résumé est oublié"""
+        if self._log is None:
+            self.enabled = False
+            self.report = None
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self.enabled = False
+
+    def _reset(self):
+        self._durations = defaultdict(list)
+        self._counters = defaultdict(int)
+        self._start = time.monotonic()
+        self._syscalls = process_syscalls()
+        self._cpu_time = time.process_time()  # Tous les threads du processus
+
+    # --- Collecte ---------------------------------------------------------
+
+    def timed(self, func, name=None):
+        """Décorateur : chronomètre chaque appel de `func` sous `name` (son nom par défaut) quand on mesure"""
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._durations[name].append(time.perf_counter() - start)
+        return wrapper
+
+    def record(self, name, duration):
+        """Ajoute une durée mesurée ailleurs (tour de boucle, image)"""
+        self._durations[name].append(duration)
+
+    def count(self, name, amount=1):
+        self._counters[name] += amount
+
+    # --- Résumé -----------------------------------------------------------
+
+    def tick(self):
+        """Résume la fenêtre écoulée dans `report` (et le fichier JSONL), puis en commence une autre"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        elapsed = max(now - self._start, 1e-6)
+        durations, counters, syscalls, cpu_time = self._durations, self._counters, self._syscalls, self._cpu_time
+        self._reset()
+
+        loop = durations.pop("loop", [])
+        frame = durations.pop("frame", [])
+        rates = {name: round(total / elapsed, 1) for name, total in counters.items()}
+        rates["select"] = round(len(loop) / elapsed, 1)  # Un select par tour de boucle
+        if syscalls is not None and self._syscalls is not None:
+            rates["read"] = round((self._syscalls[0] - syscalls[0]) / elapsed, 1)
+            rates["write"] = round((self._syscalls[1] - syscalls[1]) / elapsed, 1)
+        phases = {name: {"count": len(values), "total_ms": round(sum(values) * 1000, 3),
+                         "max_ms": round(max(values) * 1000, 3)}
+                  for name, values in durations.items() if values}
+        self.report = {
+            "time": round(time.time(), 3),
+            "interval": round(elapsed, 3),
+            "frame": summarize(frame),
+            "fps": round(len(frame) / elapsed, 1),
+            "cpu": round((time.process_time() - cpu_time) / elapsed * 100, 2),  # % d'un cœur
+            "loop": summarize(loop),
+            "rates": rates,  # Par seconde : compteurs de l'interface et appels système
+            "phases": phases,
+        }
+        if self._log is not None:
+            self._log.write(json.dumps(self.report, sort_keys=True) + "\n")
+
+    def lines(self, height, width):
+        """Résumé lisible en `height` lignes au plus : image, boucle, PTY, appels système, phases les plus coûteuses"""
+        report = self.report
+        if report is None:
+            return ["Measuring..."]
+        frame, loop, rates = report["frame"], report["loop"], report["rates"]
+        lines = [
+            f"Frame {frame['p50_ms']:.1f}/{frame['p99_ms']:.1f}ms {report['fps']:g}fps",
+            f"Loop  {loop['p50_ms']:.1f}/{loop['p99_ms']:.1f}ms max {loop['max_ms']:.0f} cpu {report['cpu']:.1f}%",
+            f"PTY   {rates.get('pty_bytes', 0) / 1024:.0f} KiB/s {rates.get('pty_reads', 0):g} rd/s",
+            f"Sys/s sel {rates['select']:g} r {rates.get('read', '?')} w {rates.get('write', '?')}",
+        ]
+        # Phases triées par temps total : nom, moyenne et nombre d'appels dans la seconde
+        phases = sorted(report["phases"].items(), key=lambda item: -item[1]["total_ms"])
+        for name, phase in phases[:max(0, height - len(lines))]:
+            stats = f" {phase['total_ms'] / phase['count']:.2f}ms×{phase['count']}"
+            lines.append(name[:max(1, width - len(stats))] + stats)
+        return lines[:height]
@@ -0,0 +1,181 @@
+"""Lecture directe de /proc (Linux) : alternative rapide à psutil
+
+Sur les machines chargées, le coût des objets `psutil.Process` domine. Ici
+chaque fichier est lu d'un seul appel dans un tampon réutilisé, et on ne
+découpe que les champs utiles :
+
+- /proc/stat et /proc/meminfo pour CPU, RAM et swap ;
+- /proc/[pid]/stat pour le parent, les temps CPU et le RSS de chaque processus ;
+- /proc/[pid]/cmdline et le propriétaire de /proc/[pid], une seule fois par processus.
+
+Les sources exposent la même méthode `read()` que leurs équivalents psutil.
+"""
+import os
+import pwd
+import sys
+import time
+
+from temporalis.procs import ProcessRow
+
+PROC = "/proc"
+
+
+def available():
+    return sys.platform.startswith("linux") and os.path.exists(f"{PROC}/stat")
+
+
+class _Reader:
+    """Lit des petits fichiers de /proc dans un tampon réutilisé (pas d'objet fichier Python)"""
+
+    def __init__(self, size=65536):
+        self.buffer = bytearray(size)
+        self._view = memoryview(self.buffer)
+
+    def read_into(self, path):
+        """Lit `path` dans `buffer` (tronqué à sa taille) et retourne le nombre d'octets lus
+
+        Le contenu n'est valable que jusqu'à la lecture suivante : on le découpe
+        sur place (`find`, `split` bornés), sans copie du fichier entier.
+        Lève OSError si le fichier a disparu.
+        """
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.readv(fd, [self.buffer])
+        finally:
+            os.close(fd)
+
+    def read(self, path):
+        """Copie du contenu de `path`, pour ce qui doit survivre à la lecture suivante ou être découpé en entier"""
+        return self._view[:self.read_into(path)].tobytes()
+
+
+class ProcfsSystemSource:
+    """CPU par cœur, RAM et swap depuis /proc/stat et /proc/meminfo"""
+
+    name = "procfs"
+
+    def __init__(self):
+        self._reader = _Reader()
+        self._last = self._cpu_times()
+
+    def _cpu_times(self):
+        """[(occupé, total)] par cœur, en ticks"""
+        times = []
+        for line in self._reader.read(f"{PROC}/stat").split(b"\n"):
+            if not line.startswith(b"cpu") or line[3:4] == b" ":
+                if times:
+                    break  # Les lignes cpuN sont contiguës : inutile de lire la suite
+                continue
+            fields = line.split()
+            # user nice system idle iowait irq softirq steal (guest est déjà compté dans user)
+            values = [int(v) for v in fields[1:9]]
+            total = sum(values)
+            times.append((total - values[3] - values[4], total))
+        return times
+
+    def read(self):
+        """(CPU % par cœur, RAM %, swap %)"""
+        current = self._cpu_times()
+        percpu = []
+        for (busy, total), (last_busy, last_total) in zip(current, self._last):
+            delta = total - last_total
+            percpu.append(round(100.0 * (busy - last_busy) / delta, 1) if delta > 0 else 0.0)
+        self._last = current
+
+        mem = {}
+        for line in self._reader.read(f"{PROC}/meminfo").split(b"\n"):
+            key, _, value = line.partition(b":")
+            if key in (b"MemTotal", b"MemAvailable", b"SwapTotal", b"SwapFree"):
+                mem[key] = int(value.split()[0])
+                if len(mem) == 4:
+                    break
+        total = mem.get(b"MemTotal", 0)
+        ram = 100.0 * (total - mem.get(b"MemAvailable", total)) / total if total else 0.0
+        swap_total = mem.get(b"SwapTotal", 0)
+        swap = 100.0 * (swap_total - mem.get(b"SwapFree", swap_total)) / swap_total if swap_total else 0.0
+        return percpu, round(ram, 1), round(swap, 1)
+
+
+class ProcfsProcessSource:
+    """Relevé des processus depuis /proc/[pid]/stat, avec cache des champs fixes"""
+
+    name = "procfs"
+
+    def __init__(self):
+        self._reader = _Reader(4096)
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._cache = {}  # pid -> [début, nom, utilisateur, ligne de commande, ticks CPU précédents, début (s)]
+        self._users = {}  # uid -> nom
+        self._last_time = None
+
+    def _user(self, uid):
+        name = self._users.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)
+            self._users[uid] = name
+        return name
+
+    def _static_fields(self, pid, start, name):
+        """Champs lus une seule fois : utilisateur et ligne de commande"""
+        try:
+            user = self._user(os.stat(f"{PROC}/{pid}").st_uid)
+            cmdline = self._reader.read(f"{PROC}/{pid}/cmdline").rstrip(b"\0").replace(b"\0", b" ")
+            cmdline = cmdline.decode("utf-8", "replace")
+        except OSError:
+            user, cmdline = "?", ""
+        if len(name) == 15 and cmdline:
+            # Le noyau tronque le nom à 15 caractères : on le complète avec la commande, comme psutil
+            program = os.path.basename(cmdline.split(" ", 1)[0])
+            if program.startswith(name):
+                name = program
+        return [start, name, user, cmdline or name, None, int(start) / self._ticks]
+
+    def read(self):
+        """Liste de ProcessRow pour tous les processus visibles"""
+        now = time.monotonic()
+        elapsed = now - self._last_time if self._last_time is not None else 0.0
+        self._last_time = now
+        scale = 100.0 / (self._ticks * elapsed) if elapsed > 0 else 0.0
+        page_size = self._page_size
+        read_into = self._reader.read_into
+        buffer = self._reader.buffer
+        cache = self._cache
+        seen = {}
+        rows = []
+
+        for entry in os.scandir(PROC):
+            pid_text = entry.name
+            if not pid_text.isdigit():
+                continue
+            try:
+                n = read_into(f"{PROC}/{pid_text}/stat")
+            except OSError:
+                continue  # Processus terminé entre le listage et la lecture
+            # Le nom est entre parenthèses et peut contenir des espaces : on coupe sur la dernière.
+            # Seuls les champs qui suivent sont extraits du tampon (les 23 premiers, le reste en un bloc)
+            close = buffer.rfind(b")", 0, n)
+            fields = buffer[close + 2:n].split(b" ", 22)
+            # Après le nom : état(0) ppid(1) ... utime(11) stime(12) ... starttime(19) vsize(20) rss(21)
+            pid = int(pid_text)
+            start = fields[19]
+            cached = cache.get(pid)
+            if cached is None or cached[0] != start:  # Nouveau processus (ou pid réutilisé)
+                name = buffer[buffer.find(b"(", 0, close) + 1:close].decode("utf-8", "replace")
+                cached = cache[pid] = self._static_fields(pid, start, name)
+            ticks = int(fields[11]) + int(fields[12])
+            last = cached[4]
+            cached[4] = ticks
+            cpu = round((ticks - last) * scale, 1) if last is not None else 0.0
+            seen[pid] = None
+            rows.append(ProcessRow(pid, int(fields[1]), cached[1], cached[2], cached[3],
+                                   cpu, int(fields[21]) * page_size, cached[5]))
+
+        # Oubli des processus terminés
+        if len(cache) > len(seen):
+            for pid in [pid for pid in cache if pid not in seen]:
+                del cache[pid]
+        return rows
@@ -0,0 +1,228 @@
+"""Table des processus mise en cache et rafraîchie dans un thread de fond
+
+Les champs qui ne changent pas pendant la vie d'un processus (nom, ligne de
+commande, utilisateur) sont lus une seule fois et gardés dans un cache indexé
+par pid. À chaque relevé, seuls les champs dynamiques (CPU %, RSS, parent)
+sont relus, groupés par `oneshot()`. Le résultat est publié comme un tuple
+immuable de `ProcessRow` ; le tri et le formatage se font côté interface, et
+seulement pour les lignes visibles.
+
+Le relevé vient d'une « source » : psutil partout, ou la lecture directe de
+/proc sous Linux (voir `temporalis.procfs`). psutil n'est importé que par
+la source qui s'en sert : avec /proc, le démarrage ne le charge pas.
+"""
+import threading
+import time
+from collections import namedtuple
+
+ProcessRow = namedtuple("ProcessRow", "pid ppid name user cmdline cpu rss started", defaults=(0.0,))
+ProcessRow.__doc__ = """Ligne d'un relevé ; `started` (début du processus, dans l'unité de la source) distingue un pid réutilisé"""
+TreeRow = namedtuple("TreeRow", "row depth cpu rss has_children collapsed")
+
+SORT_KEYS = ("cpu", "mem", "pid")
+_SORTS = {
+    "cpu": (lambda row: row.cpu, True),
+    "mem": (lambda row: row.rss, True),
+    "pid": (lambda row: row.pid, False),
+}
+
+
+class PsutilProcessSource:
+    """Relevé des processus via psutil (toutes plateformes)"""
+
+    name = "psutil"
+
+    def __init__(self):
+        self._cache = {}  # pid -> (psutil.Process, nom, utilisateur, ligne de commande, création)
+
+    def _static_fields(self, pid):
+        """Lit une seule fois les champs fixes d'un nouveau processus"""
+        import psutil
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            name = proc.name()
+            try:
+                user = proc.username()
+            except (psutil.AccessDenied, KeyError):
+                user = "?"
+            try:
+                cmdline = " ".join(proc.cmdline())
+            except psutil.AccessDenied:
+                cmdline = ""
+            proc.cpu_percent(interval=None)  # Référence pour le prochain calcul de CPU %
+            started = proc.create_time()
+        return proc, name, user, cmdline or name, started
+
+    def read(self):
+        """Liste de ProcessRow pour tous les processus visibles"""
+        import psutil
+        cache = self._cache
+        rows = []
+        pids = psutil.pids()
+        for pid in pids:
+            entry = cache.get(pid)
+            try:
+                if entry is None:
+                    entry = cache[pid] = self._static_fields(pid)
+                proc, name, user, cmdline, started = entry
+                with proc.oneshot():
+                    cpu = proc.cpu_percent(interval=None)
+                    rss = proc.memory_info().rss
+                    ppid = proc.ppid()
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                cache.pop(pid, None)
+                continue
+            except psutil.AccessDenied:
+                cpu, rss, ppid = 0.0, 0, 0
+                if entry is None:
+                    continue
+            rows.append(ProcessRow(pid, ppid, name, user, cmdline, cpu, rss, started))
+
+        # Oubli des processus terminés
+        if len(cache) > len(rows):
+            alive = set(pids)
+            for pid in [pid for pid in cache if pid not in alive]:
+                del cache[pid]
+        return rows
+
+
+def process_source(backend="auto"):
+    """Source du relevé des processus : "procfs" (Linux), "psutil", ou "auto" pour procfs quand /proc est disponible"""
+    if backend in ("auto", "procfs"):
+        from temporalis import procfs
+        if procfs.available():
+            return procfs.ProcfsProcessSource()
+    return PsutilProcessSource()
+
+
+class ProcessMonitor(threading.Thread):
+    """Thread de fond qui relève la liste des processus toutes les `interval` secondes"""
+
+    def __init__(self, interval=2.0, backend="auto", source=None):
+        super().__init__(name="temporalis-processes", daemon=True)
+        self.interval = interval
+        self.backend = backend
+        self.source = source  # Sinon créée dans le thread
+        self.snapshot = ()  # Dernier relevé publié (tuple de ProcessRow)
+        self.generation = 0  # Incrémenté à chaque publication
+        self.cost = 0.0  # Durée (secondes) du dernier relevé
+        self._sorted = (None, None, ())  # (génération, clé, lignes triées), utilisé par l'interface
+        self._tree = (None, None, None)  # (génération, clé, ProcessTree), utilisé par l'interface
+        self._stopped = False
+        self._wake = threading.Event()  # Fin de l'attente : arrêt, ou intervalle raccourci
+
+    def run(self):
+        if self.source is None:
+            self.source = process_source(self.backend)
+        while True:
+            self.sample()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped:
+                break
+
+    def stop(self):
+        self._stopped = True
+        self._wake.set()
+
+    def set_interval(self, interval):
+        """Change le rythme des relevés ; un rythme plus rapide prend effet tout de suite (relevé immédiat)"""
+        faster = interval < self.interval
+        self.interval = interval
+        if faster:
+            self._wake.set()
+
+    def sample(self):
+        start = time.perf_counter()
+        rows = self.source.read()
+        if rows is None:
+            return  # Source sans relevé (collecteur pas encore entendu) : le dernier relevé reste publié
+        self.snapshot = tuple(rows)
+        self.cost = time.perf_counter() - start
+        self.generation += 1
+
+    def sorted_rows(self, key="cpu"):
+        """Dernier relevé trié selon `key` (re-trié seulement quand le relevé ou la clé change)"""
+        generation, sort_key, rows = self._sorted
+        current = self.generation  # Lu avant le relevé : au pire on re-triera au prochain appel
+        if generation != current or sort_key != key:
+            getter, reverse = _SORTS[key]
+            rows = sorted(self.snapshot, key=getter, reverse=reverse)
+            self._sorted = (current, key, rows)
+        return rows
+
+    def tree(self, key="cpu"):
+        """Arbre du dernier relevé (reconstruit seulement quand le relevé ou la clé change)"""
+        generation, sort_key, tree = self._tree
+        current = self.generation
+        if generation != current or sort_key != key:
+            tree = ProcessTree(self.sorted_rows(key))
+            self._tree = (current, key, tree)
+        return tree
+
+
+class ProcessTree:
+    """Arbre parent/enfants d'un relevé, avec CPU et RSS cumulés par sous-arbre
+
+    Construit en O(n) : un passage pour rattacher chaque processus à son
+    parent, un parcours en profondeur, puis le cumul en remontant ce parcours.
+    `rows` doit déjà être trié : les enfants gardent cet ordre.
+    """
+
+    def __init__(self, rows):
+        pids = {row.pid for row in rows}
+        self.children = {}
+        self.roots = []
+        for row in rows:
+            if row.ppid in pids and row.ppid != row.pid:
+                self.children.setdefault(row.ppid, []).append(row)
+            else:
+                self.roots.append(row)
+
+        # Parcours en profondeur (pré-ordre) sans récursion ; `seen` protège des cycles
+        self._preorder = []
+        seen = set()
+        stack = [(row, 0) for row in reversed(self.roots)]
+        while stack:
+            row, depth = stack.pop()
+            if row.pid in seen:
+                continue
+            seen.add(row.pid)
+            self._preorder.append((row, depth))
+            stack.extend((child, depth + 1) for child in reversed(self.children.get(row.pid, ())))
+
+        # Cumul : en remontant le pré-ordre, chaque enfant est traité avant son parent
+        self.totals = {row.pid: [row.cpu, row.rss] for row, _ in self._preorder}
+        for row, depth in reversed(self._preorder):
+            if depth:
+                total = self.totals[row.pid]
+                parent = self.totals[row.ppid]
+                parent[0] += total[0]
+                parent[1] += total[1]
+
+    def __len__(self):
+        return len(self._preorder)
+
+    def flatten(self, collapsed=()):
+        """Lignes affichables (TreeRow) en sautant les descendants des nœuds repliés"""
+        result = []
+        skip_depth = None
+        for row, depth in self._preorder:
+            if skip_depth is not None:
+                if depth > skip_depth:
+                    continue
+                skip_depth = None
+            is_collapsed = row.pid in collapsed
+            cpu, rss = self.totals[row.pid]
+            result.append(TreeRow(row, depth, cpu, rss, row.pid in self.children, is_collapsed))
+            if is_collapsed:
+                skip_depth = depth
+        return result
+
+
+def format_size(size):
+    """Taille en octets -> texte court (K, M, G, T)"""
+    for unit in ("B", "K", "M", "G", "T"):
+        if size < 1024 or unit == "T":
+            return f"{size:.1f}{unit}" if unit != "B" and size < 10 else f"{size:.0f}{unit}"
+        size /= 1024
@@ -0,0 +1,64 @@
+"""Lecture du PTY : on vide tout ce qui est disponible à chaque réveil"""
+import codecs
+import fcntl
+import os
+import struct
+import termios
+
+DRAIN_LIMIT = 1 << 20  # On rend la main au réacteur après 1 Mio pour rester réactif aux touches
+
+
+class PtyReader:
+    """Vide le PTY dans un tampon préalloué et décode l'UTF-8 au fil des lectures
+
+    `os.readv` écrit directement dans le tampon (aucun objet bytes par appel)
+    et le décodeur incrémental garde les octets d'un caractère multi-octets
+    coupé entre deux réveils jusqu'à la lecture suivante.
+    """
+
+    def __init__(self, fd, limit=DRAIN_LIMIT):
+        self.fd = fd
+        self._view = memoryview(bytearray(max(1, limit)))
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.raw = self._view[:0]  # Octets bruts de la dernière lecture (valables jusqu'à la suivante)
+        self.bytes_read = 0  # Totaux depuis l'ouverture (instrumentation : temporalis.perf)
+        self.reads = 0
+
+    def read(self):
+        """Lit tous les octets disponibles (non bloquant) ; retourne (texte, eof)
+
+        `eof` est vrai quand le shell a fermé le PTY (os.readv renvoie 0 ou
+        EIO sous Linux).
+        """
+        view = self._view
+        limit = len(view)
+        size = 0
+        eof = False
+        while size < limit:
+            self.reads += 1
+            try:
+                count = os.readv(self.fd, [view[size:]])
+            except BlockingIOError:
+                break
+            except OSError:
+                eof = True
+                break
+            if not count:
+                eof = True
+                break
+            size += count
+        self.bytes_read += size
+        self.raw = view[:size]
+        return self._decoder.decode(self.raw, eof), eof
+
+    def pending(self):
+        """Octets d'un caractère coupé, gardés par le décodeur jusqu'à la lecture suivante"""
+        return self._decoder.getstate()[0]
+
+
+def set_winsize(fd, rows, cols):
+    """Donne au PTY la taille de l'écran émulé (les programmes plein écran la lisent par TIOCGWINSZ)"""
+    try:
+        fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+    except OSError:
+        pass
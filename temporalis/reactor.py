@@ -0,0 +1,201 @@
+"""Boucle d'événements unique basée sur `selectors`
+
+Le réacteur attend en même temps sur les descripteurs (PTY, stdin, en lecture
+et, tant que des données attendent, en écriture), les signaux
+(SIGWINCH...) et les minuteries des panneaux, et ne se réveille que lorsque
+quelque chose est prêt. Les threads de fond lui confient du travail par
+`call_soon_threadsafe`, qui passe par le même self-pipe que les signaux.
+"""
+import heapq
+import os
+import selectors
+import signal
+import time
+from collections import deque
+
+
+class Timer:
+    """Minuterie planifiée dans le réacteur (annulable)"""
+
+    __slots__ = ("deadline", "interval", "callback", "cancelled")
+
+    def __init__(self, deadline, interval, callback):
+        self.deadline = deadline
+        self.interval = interval  # None pour une minuterie à usage unique
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Reactor:
+    """Réacteur mono-thread : descripteurs, signaux et minuteries sur un seul sélecteur"""
+
+    def __init__(self, profiler=None):
+        self.selector = selectors.DefaultSelector()
+        self.profiler = profiler  # Reçoit la durée de chaque tour de boucle quand il mesure (temporalis.perf)
+        self._timers = []  # Tas de (échéance, numéro, minuterie)
+        self._seq = 0
+        self._signal_handlers = {}
+        self._previous_signal_handlers = {}
+        self._previous_wakeup_fd = None
+        self._threadsafe_calls = deque()  # Rappels déposés par d'autres threads
+        self.running = False
+
+        # Self-pipe : les signaux y écrivent leur numéro pour réveiller select()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        self.add_reader(self._wakeup_r, self._on_wakeup)
+
+    # --- Descripteurs -----------------------------------------------------
+
+    def add_reader(self, fd, callback):
+        """Appelle `callback()` chaque fois que `fd` est lisible"""
+        self._watch(fd, 0, callback)
+
+    def remove_reader(self, fd):
+        self._watch(fd, 0, None)
+
+    def add_writer(self, fd, callback):
+        """Appelle `callback()` chaque fois que `fd` accepte des données (à retirer une fois tout écrit)"""
+        self._watch(fd, 1, callback)
+
+    def remove_writer(self, fd):
+        self._watch(fd, 1, None)
+
+    def _watch(self, fd, slot, callback):
+        """Met à jour le rappel de lecture (0) ou d'écriture (1) de `fd` ; le descripteur n'est suivi que s'il en a un"""
+        try:
+            key = self.selector.get_key(fd)
+        except (KeyError, ValueError):
+            key = None
+        if key is None:
+            if callback is None:
+                return
+            handlers = [None, None]
+        else:
+            handlers = key.data
+        handlers[slot] = callback  # Même liste : un rappel retiré pendant un tour n'est plus appelé
+        events = (selectors.EVENT_READ if handlers[0] else 0) | (selectors.EVENT_WRITE if handlers[1] else 0)
+        try:
+            if key is None:
+                self.selector.register(fd, events, handlers)
+            elif events:
+                self.selector.modify(fd, events, handlers)
+            else:
+                self.selector.unregister(fd)
+        except (KeyError, ValueError, OSError):
+            pass  # Descripteur déjà fermé
+
+    # --- Minuteries -------------------------------------------------------
+
+    def call_later(self, delay, callback):
+        """Planifie `callback()` une seule fois dans `delay` secondes"""
+        return self._schedule(Timer(time.monotonic() + delay, None, callback))
+
+    def call_every(self, interval, callback, delay=0):
+        """Planifie `callback()` toutes les `interval` secondes (premier appel après `delay`)"""
+        return self._schedule(Timer(time.monotonic() + delay, interval, callback))
+
+    def _schedule(self, timer):
+        self._seq += 1
+        heapq.heappush(self._timers, (timer.deadline, self._seq, timer))
+        return timer
+
+    def _next_timeout(self):
+        """Temps avant la prochaine minuterie, ou None s'il n'y en a aucune"""
+        while self._timers and self._timers[0][2].cancelled:
+            heapq.heappop(self._timers)
+        if not self._timers:
+            return None
+        return max(0.0, self._timers[0][0] - time.monotonic())
+
+    def _run_timers(self):
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, timer = heapq.heappop(self._timers)
+            if timer.cancelled:
+                continue
+            if timer.interval is not None:
+                # On se recale sur l'heure actuelle pour ne pas rattraper les tours manqués
+                timer.deadline = max(timer.deadline + timer.interval, now)
+                self._schedule(timer)
+            timer.callback()
+
+    def call_soon_threadsafe(self, callback):
+        """Depuis n'importe quel thread : `callback()` sera appelé par la boucle au prochain réveil"""
+        self._threadsafe_calls.append(callback)
+        try:
+            os.write(self._wakeup_w, b"\0")  # 0 n'est pas un numéro de signal
+        except BlockingIOError:
+            pass  # Pipe plein : un réveil est déjà en attente
+
+    # --- Signaux ----------------------------------------------------------
+
+    def add_signal_handler(self, signum, callback):
+        """Appelle `callback()` depuis la boucle (et non depuis le gestionnaire C) à la réception de `signum`"""
+        if not self._signal_handlers:
+            self._previous_wakeup_fd = signal.set_wakeup_fd(self._wakeup_w)
+        self._signal_handlers[signum] = callback
+        # Le gestionnaire Python ne fait rien : seul l'octet écrit dans le self-pipe compte
+        self._previous_signal_handlers[signum] = signal.signal(signum, lambda s, f: None)
+
+    def remove_signal_handler(self, signum):
+        if signum not in self._signal_handlers:
+            return
+        del self._signal_handlers[signum]
+        signal.signal(signum, self._previous_signal_handlers.pop(signum))
+        if not self._signal_handlers:
+            signal.set_wakeup_fd(self._previous_wakeup_fd)
+
+    def _on_wakeup(self):
+        try:
+            data = os.read(self._wakeup_r, 512)
+        except BlockingIOError:
+            return
+        # Un même signal reçu plusieurs fois n'est traité qu'une fois par réveil
+        for signum in dict.fromkeys(data):
+            callback = self._signal_handlers.get(signum)
+            if callback:
+                callback()
+        calls = self._threadsafe_calls
+        while calls:
+            calls.popleft()()
+
+    # --- Boucle -----------------------------------------------------------
+
+    def run_once(self, timeout=None):
+        """Attend un événement (au plus `timeout` secondes) et le distribue"""
+        next_timer = self._next_timeout()
+        if next_timer is not None:
+            timeout = next_timer if timeout is None else min(timeout, next_timer)
+        events = self.selector.select(timeout)
+        profiler = self.profiler
+        start = time.perf_counter() if profiler is not None and profiler.enabled else None
+        for key, mask in events:
+            handlers = key.data
+            if mask & selectors.EVENT_READ and handlers[0] is not None:
+                handlers[0]()
+            if mask & selectors.EVENT_WRITE and handlers[1] is not None:
+                handlers[1]()
+        self._run_timers()
+        if start is not None:
+            # Temps passé hors de select : la boucle ne pouvait répondre ni aux touches ni au PTY
+            profiler.record("loop", time.perf_counter() - start)
+
+    def run(self):
+        self.running = True
+        while self.running:
+            self.run_once()
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        for signum in list(self._signal_handlers):
+            self.remove_signal_handler(signum)
+        self.selector.close()
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
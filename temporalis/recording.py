@@ -0,0 +1,225 @@
+"""Enregistrement des sessions : journal binaire horodaté, index de reprise et export asciicast
+
+Format (entiers petit-boutistes) :
+
+    en-tête      MAGIC, heure de début (double, secondes Unix)
+    événement    type (1 octet), session (1 octet), instant (double, secondes
+                 depuis le début), longueur (uint32), données
+    fin          un événement INDEX (durée, sessions, entrées de l'index) puis
+                 FOOTER (magic, position de l'index)
+
+Les types sont OUTPUT (octets bruts lus sur le PTY), INPUT (octets écrits au
+PTY), RESIZE (lignes, colonnes) et KEYFRAME : toutes les `keyframe_interval`
+secondes, l'écran émulé de chaque session est écrit sous forme de séquences VT
+qui le reconstruisent (`Screen.snapshot`), précédées des octets d'un caractère
+UTF-8 que le décodeur de la session attend encore (la sortie qui suit l'image
+clé commence par leur suite). L'index donne l'instant et la position de chaque
+image clé ; pour aller à un instant, `Recording` part de la dernière image clé
+qui le précède au lieu de tout relire depuis le début. La durée et les
+sessions sont écrites avec l'index : l'ouverture ne lit pas les événements.
+Un fichier sans index (interface tuée) reste lisible : index, durée et
+sessions sont alors reconstruits en sautant d'en-tête en en-tête, sans rien
+décoder.
+
+`Recording` lit le fichier par mmap : les données des événements sont des
+vues sur le fichier, sans copie.
+"""
+import codecs
+import json
+import mmap
+import struct
+import time
+from bisect import bisect_right
+
+MAGIC = b"TMPREC1\n"
+START = struct.Struct("<d")
+EVENT = struct.Struct("<BBdI")  # Type, session, instant, longueur des données
+RESIZE = struct.Struct("<HH")  # Lignes, colonnes
+INDEX_ENTRY = struct.Struct("<dBQ")  # Instant, session, position de l'image clé
+SUMMARY = struct.Struct("<dB")  # Durée, nombre de sessions (leurs numéros suivent, un octet chacun)
+PENDING = struct.Struct("<B")  # Longueur des octets en attente du décodeur, en tête d'une image clé
+FOOTER = struct.Struct("<8sQ")
+FOOTER_MAGIC = b"TMPIDX2\n"
+
+OUTPUT, INPUT, RESIZE_EVENT, KEYFRAME, INDEX = range(5)
+KEYFRAME_INTERVAL = 5.0  # Secondes entre deux images clés d'une même session
+
+
+class RecordingError(Exception):
+    """Fichier qui n'est pas un enregistrement Temporalis"""
+
+
+class Recorder:
+    """Écrit les événements des sessions au fil de l'eau (activé par `--record`)"""
+
+    def __init__(self, path, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + START.pack(time.time()))
+        self._start = time.monotonic()
+        self._index = []  # (instant, session, position) de chaque image clé
+        self._last_keyframe = {}  # Session -> instant de sa dernière image clé
+        self._duration = 0.0  # Instant du dernier événement
+        self._sessions = []  # Sessions dans l'ordre de leur première taille
+
+    def _write(self, kind, number, payload, now=None):
+        now = time.monotonic() - self._start if now is None else now
+        if kind == RESIZE_EVENT and number not in self._sessions:
+            self._sessions.append(number)
+        self._duration = now
+        position = self._file.tell()
+        self._file.write(EVENT.pack(kind, number, now, len(payload)))
+        self._file.write(payload)
+        return position
+
+    def output(self, session, data):
+        """Octets bruts lus sur le PTY de `session` (après leur passage dans l'émulateur)"""
+        if self._file is None:
+            return
+        now = time.monotonic() - self._start
+        self._write(OUTPUT, session.number, data, now)
+        if (now - self._last_keyframe.get(session.number, 0.0) >= self.keyframe_interval
+                and not session.screen.in_sequence):
+            self.keyframe(session, now)
+
+    def input(self, session, data):
+        if self._file is not None:
+            self._write(INPUT, session.number, data)
+
+    def resize(self, session):
+        if self._file is not None:
+            self._write(RESIZE_EVENT, session.number, RESIZE.pack(session.screen.rows, session.screen.cols))
+
+    def keyframe(self, session, now=None):
+        """Image clé : taille puis écran de `session` (et état de son décodeur), point de reprise de la lecture"""
+        if self._file is None:
+            return
+        now = time.monotonic() - self._start if now is None else now
+        position = self._write(RESIZE_EVENT, session.number, RESIZE.pack(session.screen.rows, session.screen.cols), now)
+        pending = session.reader.pending()
+        self._write(KEYFRAME, session.number, PENDING.pack(len(pending)) + pending + session.screen.snapshot().encode(),
+                    now)
+        self._index.append((now, session.number, position))
+        self._last_keyframe[session.number] = now
+        self._file.flush()  # Ce qui précède une image clé survit à un arrêt brutal
+
+    def close(self):
+        """Écrit la durée, les sessions, l'index et la fin du fichier"""
+        if self._file is None:
+            return
+        summary = SUMMARY.pack(self._duration, len(self._sessions)) + bytes(self._sessions)
+        index = b"".join(INDEX_ENTRY.pack(*entry) for entry in self._index)
+        position = self._write(INDEX, 0, summary + index, self._duration)
+        self._file.write(FOOTER.pack(FOOTER_MAGIC, position))
+        self._file.close()
+        self._file = None
+
+
+class Recording:
+    """Enregistrement ouvert en lecture (mmap) : événements, durée et reprise à un instant"""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise RecordingError(f"{path}: fichier vide")
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise RecordingError(f"{path}: pas un enregistrement Temporalis")
+        self.start_time = START.unpack_from(self._map, len(MAGIC))[0]
+        self.data_start = len(MAGIC) + START.size
+        self.end = len(self._map)
+        self.duration = 0.0  # Instant du dernier événement
+        self.sessions = []  # Sessions dans l'ordre de leur première taille
+        self.index = self._read_index()  # (instant, session, position), par instant croissant
+
+    def _read_index(self):
+        """Index, durée et sessions écrits à la fermeture, ou reconstruits en parcourant les en-têtes"""
+        if self.end >= self.data_start + FOOTER.size:
+            magic, position = FOOTER.unpack_from(self._map, self.end - FOOTER.size)
+            if magic == FOOTER_MAGIC:
+                kind, _, _, length = EVENT.unpack_from(self._map, position)
+                self.end = position  # Les événements s'arrêtent à l'index
+                start = position + EVENT.size
+                self.duration, count = SUMMARY.unpack_from(self._map, start)
+                start += SUMMARY.size
+                self.sessions = list(self._map[start:start + count])
+                entries = memoryview(self._map)[start + count:position + EVENT.size + length]
+                index = list(INDEX_ENTRY.iter_unpack(entries))
+                entries.release()
+                return index
+        index = []
+        for kind, number, when, position, _ in self.events(check_end=True):
+            self.duration = when
+            if kind == RESIZE_EVENT:
+                if number not in self.sessions:
+                    self.sessions.append(number)
+                following = position + EVENT.size + RESIZE.size
+                if following + EVENT.size <= self.end and self._map[following] == KEYFRAME:
+                    index.append((when, number, position))
+        return index
+
+    def events(self, position=None, check_end=False):
+        """(type, session, instant, position, données) à partir de `position` (le début par défaut)
+
+        `check_end` arrête la lecture sur un événement tronqué (fichier en cours
+        d'écriture ou interface tuée) au lieu de renvoyer des données partielles.
+        """
+        data = self._map
+        position = self.data_start if position is None else position
+        end = self.end
+        while position + EVENT.size <= end:
+            kind, number, when, length = EVENT.unpack_from(data, position)
+            start = position + EVENT.size
+            if start + length > end:
+                if check_end:
+                    self.end = position
+                break
+            if kind == INDEX:
+                break
+            yield kind, number, when, position, memoryview(data)[start:start + length]
+            position = start + length
+
+    def seek(self, when, session):
+        """Position de la dernière image clé de `session` au plus tard à `when` (le début sinon)"""
+        entries = [entry for entry in self.index if entry[1] == session]
+        i = bisect_right([entry[0] for entry in entries], when)
+        return entries[i - 1][2] if i else self.data_start
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def read_keyframe(data):
+    """(octets en attente du décodeur, séquences VT de l'écran) d'une image clé"""
+    size, = PENDING.unpack_from(data)
+    return bytes(data[PENDING.size:PENDING.size + size]), bytes(data[PENDING.size + size:]).decode("utf-8", "replace")
+
+
+def export_asciicast(recording, session, out):
+    """Écrit la session `session` au format asciicast v2 (une ligne JSON par événement) dans le fichier texte `out`"""
+    rows, cols = 24, 80
+    for kind, number, _, _, data in recording.events():
+        if kind == RESIZE_EVENT and number == session:
+            rows, cols = RESIZE.unpack(data)
+            break
+    header = {"version": 2, "width": cols, "height": rows, "timestamp": int(recording.start_time),
+              "env": {"TERM": "xterm-256color"}}
+    out.write(json.dumps(header) + "\n")
+    decoders = {OUTPUT: codecs.getincrementaldecoder("utf-8")(errors="replace"),
+                INPUT: codecs.getincrementaldecoder("utf-8")(errors="replace")}
+    size = (rows, cols)
+    for kind, number, when, _, data in recording.events():
+        if number != session:
+            continue
+        if kind in decoders:
+            text = decoders[kind].decode(data)
+            if text:
+                out.write(json.dumps([round(when, 6), "o" if kind == OUTPUT else "i", text]) + "\n")
+        elif kind == RESIZE_EVENT and RESIZE.unpack(data) != size:
+            size = RESIZE.unpack(data)
+            out.write(json.dumps([round(when, 6), "r", f"{size[1]}x{size[0]}"]) + "\n")
@@ -0,0 +1,132 @@
+"""Rendu groupé : chaque section garde sa dernière image, seules les lignes modifiées sont réécrites
+
+Les sections modifiées sont préparées avec `noutrefresh` puis envoyées au
+terminal en une seule fois par `doupdate`, au plus `max_fps` fois par seconde.
+Une source rapide (sortie du PTY) peut aussi demander à être dessinée juste
+avant l'image suivante (`request`) : entre deux images, ses modifications
+s'accumulent et seul l'état final est dessiné. Quand le terminal change de
+taille, chaque section garde sa fenêtre et est seulement déplacée et
+redimensionnée (`Panel.move_resize`).
+"""
+import curses
+import time
+
+
+class Panel:
+    """Section encadrée avec un titre et l'image (lignes) affichée précédemment"""
+
+    def __init__(self, window, title, renderer, attr=None):
+        self.window = window
+        self.title = title
+        self.renderer = renderer
+        self.attr = curses.color_pair(1) if attr is None else attr
+        self.frame = []  # Lignes actuellement affichées à l'intérieur de la bordure
+        self.draw_border()
+
+    @property
+    def height(self):
+        """Nombre de lignes disponibles à l'intérieur de la bordure"""
+        return self.window.getmaxyx()[0] - 2
+
+    @property
+    def width(self):
+        """Nombre de colonnes disponibles à l'intérieur de la bordure"""
+        return self.window.getmaxyx()[1] - 2
+
+    def draw_border(self):
+        max_y, max_x = self.window.getmaxyx()
+        self.window.attron(self.attr)  # Couleur verte pour la bordure
+        self.window.box()
+        self.window.attroff(self.attr)
+        self.window.addstr(0, 1, self.title[:max_x - 2])  # Limiter le titre à la largeur de la section
+        self.stage()
+
+    def set_title(self, title):
+        if title != self.title:
+            self.title = title
+            self.draw_border()
+
+    def update(self, lines):
+        """Affiche `lines` en ne réécrivant que celles qui diffèrent de l'image précédente"""
+        height, width = self.height, self.width
+        frame = []
+        changed = False
+        for y in range(height):
+            line = lines[y] if y < len(lines) else ""
+            line = line[:width].ljust(width)
+            frame.append(line)
+            if y >= len(self.frame) or self.frame[y] != line:
+                self.window.addstr(y + 1, 1, line, self.attr)
+                changed = True
+        self.frame = frame
+        if changed:
+            self.stage()
+
+    def move_resize(self, height, width, y, x):
+        """Donne à la section sa nouvelle place (même fenêtre curses) ; son contenu est à redessiner"""
+        window = self.window
+        window.resize(1, 1)  # Assez petite pour être déplacée n'importe où
+        window.mvwin(y, x)  # Position à l'écran
+        window.mvderwin(y, x)  # Zone partagée avec l'écran parent (placé en 0, 0)
+        window.resize(height, width)
+        window.erase()
+        self.frame = []
+        self.draw_border()
+
+    def redraw(self):
+        """Réécrit la bordure et toute l'image (après un effacement de l'écran)"""
+        frame, self.frame = self.frame, []
+        self.draw_border()
+        self.update(frame)
+
+    def stage(self):
+        """Signale au moteur de rendu que la fenêtre a changé"""
+        self.renderer.stage(self.window)
+
+
+class Renderer:
+    """Regroupe les fenêtres modifiées et les envoie au terminal une fois par image"""
+
+    def __init__(self, reactor=None, max_fps=30, profiler=None):
+        self.reactor = reactor
+        self.profiler = profiler  # Reçoit la durée de chaque image quand il mesure (temporalis.perf)
+        self.frame_interval = 1.0 / max(1, max_fps)
+        self.frames = 0
+        self._staged = {}  # id(fenêtre) -> fenêtre, dans l'ordre de modification
+        self._requests = {}  # Rappels de dessin demandés pour la prochaine image (sans doublon)
+        self._scheduled = None
+        self._last_frame = 0.0
+
+    def stage(self, window):
+        self._staged[id(window)] = window
+        self._schedule()
+
+    def request(self, callback):
+        """Appelle `callback()` (qui dessine) juste avant la prochaine image ; les demandes répétées n'en font qu'une"""
+        self._requests[callback] = None
+        self._schedule()
+
+    def _schedule(self):
+        if self.reactor is not None and self._scheduled is None:
+            # Limite de débit : au plus une image toutes les `frame_interval` secondes
+            delay = max(0.0, self._last_frame + self.frame_interval - time.monotonic())
+            self._scheduled = self.reactor.call_later(delay, self.flush)
+
+    def flush(self):
+        """Prépare toutes les fenêtres modifiées puis met à jour le terminal en une fois"""
+        start = time.perf_counter()
+        while self._requests:
+            requests, self._requests = self._requests, {}
+            for callback in requests:
+                callback()
+        self._scheduled = None  # Après les rappels : ce qu'ils préparent part dans cette image
+        if not self._staged:
+            return
+        for window in self._staged.values():
+            window.noutrefresh()
+        self._staged.clear()
+        curses.doupdate()
+        self._last_frame = time.monotonic()
+        self.frames += 1
+        if self.profiler is not None and self.profiler.enabled:
+            self.profiler.record("frame", time.perf_counter() - start)  # Dessin demandé compris
@@ -0,0 +1,195 @@
+"""Lecture d'un enregistrement (`temporalis --replay FICHIER`) dans la chaîne de rendu de l'interface
+
+Le flux enregistré d'une session passe par le même émulateur (`Screen`), la
+même vue (`TerminalView`) et le même moteur de rendu (`Renderer`) que la
+sortie en direct, dans une section qui occupe tout le terminal. La lecture
+suit une horloge à vitesse réglable ; aller à un instant repart de l'image clé
+qui le précède (voir `temporalis.recording`), en avance rapide jusqu'à
+l'instant demandé.
+
+Touches : espace (pause), + / - (vitesse x2 / ÷2), flèches gauche / droite
+(10 secondes en arrière / en avant), Début (retour au début), q ou F8 (quitter).
+"""
+import codecs
+import curses
+import time
+
+from temporalis.reactor import Reactor
+from temporalis.recording import KEYFRAME, OUTPUT, RESIZE, RESIZE_EVENT, read_keyframe
+from temporalis.render import Panel, Renderer
+from temporalis.termview import TerminalView
+from temporalis.vt import Screen
+
+SEEK_STEP = 10.0  # Secondes sautées par les flèches
+MIN_SPEED, MAX_SPEED = 1 / 16, 64
+
+
+def format_time(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class Player:
+    """Écran de la session rejouée et horloge de lecture (instant de l'enregistrement affiché)"""
+
+    def __init__(self, recording, session, speed=1.0):
+        self.recording = recording
+        self.session = session
+        self.speed = min(MAX_SPEED, max(MIN_SPEED, speed))
+        self.paused = False
+        self.screen = Screen(24, 80)
+        self._decoder = None
+        self._events = None
+        self._pending = None  # Prochain événement lu mais pas encore dû
+        self._clock = (time.monotonic(), 0.0)  # (instant réel, instant de l'enregistrement) de référence
+        self._paused_at = 0.0
+        self.seek(0.0)
+
+    def now(self):
+        """Instant de l'enregistrement qui doit être affiché"""
+        if self.paused:
+            return self._paused_at
+        wall, position = self._clock
+        return min(self.recording.duration, position + (time.monotonic() - wall) * self.speed)
+
+    def seek(self, when):
+        """Repart de la dernière image clé avant `when` et rejoue jusqu'à `when` en avance rapide"""
+        when = min(self.recording.duration, max(0.0, when))
+        self.screen = Screen(self.screen.rows, self.screen.cols)
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = None
+        self._events = self.recording.events(self.recording.seek(when, self.session))
+        self.advance(when)  # Sans historique : seules les lignes qui restent à l'écran sont composées
+        self.screen.touch()
+        self._clock = (time.monotonic(), when)
+        self._paused_at = when
+
+    def advance(self, until):
+        """Applique les événements de la session jusqu'à `until` ; retourne l'instant du suivant (None à la fin)"""
+        screen = self.screen
+        while True:
+            event = self._pending or next(self._events, None)
+            self._pending = None
+            if event is None:
+                return None
+            kind, number, when, _, data = event
+            if when > until:
+                self._pending = event
+                return when
+            if number != self.session:
+                continue
+            if kind == OUTPUT:
+                screen.feed(self._decoder.decode(data))
+                screen.replies.clear()  # Le programme enregistré a déjà reçu ses réponses
+            elif kind == RESIZE_EVENT:
+                screen.resize(*RESIZE.unpack(data))
+            elif kind == KEYFRAME:
+                pending, snapshot = read_keyframe(data)
+                screen.reset()
+                screen.feed(snapshot)
+                self._decoder.setstate((pending, 0))  # La sortie suivante termine le caractère coupé
+
+    def set_speed(self, speed):
+        self._clock = (time.monotonic(), self.now())
+        self.speed = min(MAX_SPEED, max(MIN_SPEED, speed))
+
+    def toggle_pause(self):
+        if self.paused:
+            self._clock = (time.monotonic(), self._paused_at)
+        else:
+            self._paused_at = self.now()
+        self.paused = not self.paused
+
+    def close(self):
+        """Libère les vues sur le fichier (l'enregistrement peut alors être fermé)"""
+        self._pending = None
+        self._events = None
+
+
+def main(stdscr, recording, session, speed=1.0, max_fps=30):
+    curses.curs_set(0)
+    curses.start_color()
+    curses.init_pair(1, curses.COLOR_GREEN, curses.COLOR_BLACK)
+    stdscr.clear()
+    stdscr.nodelay(True)
+    stdscr.keypad(True)
+
+    reactor = Reactor()
+    renderer = Renderer(reactor, max_fps)
+    height, width = stdscr.getmaxyx()
+    panel = Panel(stdscr.subwin(height, width, 0, 0), "Replay", renderer)
+    view = TerminalView()
+    player = Player(recording, session, speed)
+    state = {"timer": None, "size": None}
+
+    def draw():
+        """Écran rejoué et titre (position, vitesse, touches)"""
+        screen = player.screen
+        full = state["size"] != (screen.rows, screen.cols)
+        if full:
+            panel.window.erase()  # L'écran enregistré a changé de taille
+            panel.draw_border()
+            state["size"] = (screen.rows, screen.cols)
+        view.draw(panel.window, screen, full)
+        paused = " [pause]" if player.paused else ""
+        panel.set_title(f"Replay {session}: {format_time(player.now())}/{format_time(recording.duration)}"
+                        f" x{player.speed:g}{paused} - space + - ← → Home q")
+        panel.stage()
+
+    def schedule(delay):
+        if state["timer"] is not None:
+            state["timer"].cancel()
+        state["timer"] = reactor.call_later(delay, tick)
+
+    def tick():
+        """Applique les événements dus ; se reprogramme pour le suivant (au plus une fois par image)"""
+        state["timer"] = None
+        renderer.request(draw)
+        if player.paused:
+            return
+        next_event = player.advance(player.now())
+        if next_event is None:
+            return  # Fin de l'enregistrement : l'horloge s'arrête sur la durée totale
+        delay = (next_event - player.now()) / player.speed
+        schedule(min(1.0, max(renderer.frame_interval, delay)))  # Le titre avance au moins chaque seconde
+
+    def seek(when):
+        player.seek(when)
+        state["size"] = None  # Nouvel écran : tout est redessiné
+        renderer.request(draw)
+        schedule(0)
+
+    def on_stdin():
+        key = stdscr.getch()
+        while key != -1:
+            if key in (ord('q'), curses.KEY_F8):
+                reactor.stop()
+                return
+            if key == ord(' '):
+                player.toggle_pause()
+                schedule(0)
+            elif key in (ord('+'), ord('=')):
+                player.set_speed(player.speed * 2)
+                schedule(0)
+            elif key == ord('-'):
+                player.set_speed(player.speed / 2)
+                schedule(0)
+            elif key == curses.KEY_RIGHT:
+                seek(player.now() + SEEK_STEP)
+            elif key == curses.KEY_LEFT:
+                seek(player.now() - SEEK_STEP)
+            elif key == curses.KEY_HOME:
+                seek(0.0)
+            elif key == curses.KEY_RESIZE:
+                panel.move_resize(*stdscr.getmaxyx(), 0, 0)
+                state["size"] = None
+                renderer.request(draw)
+            key = stdscr.getch()
+
+    reactor.add_reader(0, on_stdin)
+    seek(0.0)
+    try:
+        reactor.run()
+    finally:
+        player.close()
+        reactor.close()
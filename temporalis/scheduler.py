@@ -0,0 +1,166 @@
+"""Rafraîchissement des sections à rythme adaptatif : ralenti au repos, rétabli à la reprise
+
+Chaque section déclare sa tâche (`Scheduler.add`) : intervalle de base,
+intervalle maximal et budget (fraction d'un cœur qu'elle peut consommer).
+Après chaque passage, l'intervalle est doublé (`backoff`) jusqu'au maximum
+quand la tâche signale que rien n'a changé (elle retourne False) ou quand
+l'interface est au repos (aucune touche depuis `idle_after` secondes) ; il
+revient à la base dès que les données changent, qu'une touche est pressée ou
+que la section reçoit le focus (F1-F5). La section qui a le focus garde son
+intervalle de base. Le coût de chaque passage est mesuré (moyenne glissante) :
+une tâche qui dépasse son budget est espacée d'autant, même avec le focus.
+
+Les valeurs par défaut viennent de l'interface et peuvent être remplacées par
+un fichier INI (`read_config`) :
+
+    [refresh]
+    idle_after = 30
+    backoff = 2
+
+    [refresh.processes]
+    interval = 1
+    max_interval = 30
+    budget = 0.004
+"""
+import time
+
+IDLE_AFTER = 30.0  # Secondes sans touche avant le ralentissement de toutes les tâches
+BACKOFF = 2.0  # Facteur appliqué à l'intervalle à chaque passage sans changement
+COST_SMOOTHING = 0.25  # Poids du dernier passage dans la moyenne glissante du coût
+JOB_KEYS = ("interval", "max_interval", "budget")
+
+
+class Job:
+    """Tâche de rafraîchissement d'une section et son rythme courant"""
+
+    def __init__(self, name, callback, interval, max_interval=None, budget=None):
+        self.name = name
+        self.callback = callback  # Retourne False quand rien n'a changé
+        self.base = interval
+        self.interval = interval
+        self.max_interval = max(interval, max_interval or interval)
+        self.budget = budget  # Fraction d'un cœur (0.002 : 0.2 %), None sans limite
+        self.cost = 0.0  # Durée moyenne d'un passage (secondes)
+        self.on_interval = None  # Appelé avec le nouvel intervalle quand il change
+        self.timer = None
+        self._charged = 0.0
+
+    def charge(self, seconds):
+        """Ajoute au prochain passage un coût payé ailleurs (relevé dans un thread de fond)"""
+        self._charged += seconds
+
+    def _set_interval(self, interval):
+        if interval != self.interval:
+            self.interval = interval
+            if self.on_interval is not None:
+                self.on_interval(interval)
+
+
+class Scheduler:
+    """Tâches de rafraîchissement planifiées dans le réacteur, chacune à son rythme"""
+
+    def __init__(self, reactor, idle_after=IDLE_AFTER, backoff=BACKOFF):
+        self.reactor = reactor
+        self.idle_after = idle_after
+        self.backoff = max(1.0, backoff)
+        self.jobs = {}  # Nom -> Job, dans l'ordre d'ajout
+        self.focused = None  # Nom de la section qui a le focus
+        self.idle = False  # Vrai dès qu'une tâche a constaté le repos, jusqu'à la prochaine touche
+        self._last_activity = time.monotonic()
+
+    def add(self, name, callback, interval, max_interval=None, budget=None, delay=0):
+        """Planifie `callback()` toutes les `interval` secondes au plus vite (premier appel après `delay`)"""
+        job = self.jobs[name] = Job(name, callback, interval, max_interval, budget)
+        job.timer = self.reactor.call_later(delay, lambda: self._run(job))
+        return job
+
+    def activity(self, focus=None):
+        """Touche pressée (et section qui a le focus) : les tâches ralenties reprennent leur rythme de base"""
+        self._last_activity = time.monotonic()
+        if focus != self.focused:
+            self.focused = focus
+            job = self.jobs.get(focus)
+            if job is not None:
+                self._recover(job)
+        if self.idle:
+            self.idle = False
+            for job in self.jobs.values():
+                self._recover(job)
+
+    def _recover(self, job):
+        """Rythme de base ; une tâche ralentie passe tout de suite (ses données peuvent dater)"""
+        if job.interval > job.base:
+            job._set_interval(job.base)
+            if job.timer is not None:
+                job.timer.cancel()
+            job.timer = self.reactor.call_later(0, lambda: self._run(job))
+
+    def _run(self, job):
+        start = time.perf_counter()
+        changed = job.callback()
+        cost = time.perf_counter() - start + job._charged
+        job._charged = 0.0
+        job.cost = cost if not job.cost else job.cost + COST_SMOOTHING * (cost - job.cost)
+
+        if time.monotonic() - self._last_activity >= self.idle_after:
+            self.idle = True
+        if job.name == self.focused:
+            interval = job.base
+        elif self.idle or changed is False:
+            interval = min(job.max_interval, job.interval * self.backoff)
+        else:
+            interval = job.base
+        if job.budget:
+            interval = max(interval, job.cost / job.budget)  # Au-delà du budget, la tâche est espacée
+        job._set_interval(interval)
+        job.timer = self.reactor.call_later(interval, lambda: self._run(job))
+
+    def summary(self):
+        """Intervalle courant (secondes) de chaque tâche, sur une ligne (vue des performances)"""
+        rates = " ".join(f"{name[:3]}{job.interval:.2g}" for name, job in self.jobs.items())
+        return ("Idle " if self.idle else "Rate ") + rates
+
+    def close(self):
+        for job in self.jobs.values():
+            if job.timer is not None:
+                job.timer.cancel()
+
+
+def read_config(path, rates, idle_after=IDLE_AFTER, backoff=BACKOFF):
+    """Rythmes lus dans le fichier INI `path` par-dessus `rates` (nom -> dict de JOB_KEYS)
+
+    Retourne (rates, idle_after, backoff). Un fichier absent donne les valeurs
+    par défaut ; une valeur invalide lève ValueError avec le fichier et la clé.
+    """
+    import configparser  # Seulement au lancement, comme argparse
+    rates = {name: dict(values) for name, values in rates.items()}
+    parser = configparser.ConfigParser()
+    try:
+        if not parser.read(path):
+            return rates, idle_after, backoff
+    except configparser.Error as e:
+        raise ValueError(f"{path}: {e}")
+
+    def number(section, key, default):
+        try:
+            value = parser[section].getfloat(key, default)
+        except ValueError:
+            raise ValueError(f"{path}: [{section}] {key} = {parser[section][key]!r} n'est pas un nombre")
+        if value is not None and value < 0:
+            raise ValueError(f"{path}: [{section}] {key} ne peut pas être négatif")
+        return value
+
+    if parser.has_section("refresh"):
+        idle_after = number("refresh", "idle_after", idle_after)
+        backoff = number("refresh", "backoff", backoff)
+    for section in parser.sections():
+        if not section.startswith("refresh."):
+            continue
+        name = section[len("refresh."):]
+        if name not in rates:
+            raise ValueError(f"{path}: [{section}] section inconnue ({', '.join(rates)})")
+        for key in JOB_KEYS:
+            rates[name][key] = number(section, key, rates[name].get(key))
+        if not rates[name]["interval"]:
+            raise ValueError(f"{path}: [{section}] interval doit être positif")
+    return rates, idle_after, backoff
@@ -0,0 +1,69 @@
+"""Historique du terminal : tampon circulaire de lignes à capacité fixe"""
+
+
+class Scrollback:
+    """Tampon circulaire indexé par ligne, ajout et éviction en O(1)
+
+    Les lignes sont numérotées de façon absolue depuis la création du tampon :
+    `first_index` est le numéro de la plus ancienne ligne encore conservée,
+    `total` le numéro que recevra la prochaine ligne ajoutée.
+    """
+
+    def __init__(self, capacity=100000, max_line_length=4096):
+        self.capacity = max(1, capacity)
+        self.max_line_length = max_line_length
+        self._lines = [""] * self.capacity  # Pré-alloué : la mémoire reste bornée
+        self._start = 0  # Position de la plus ancienne ligne dans _lines
+        self._count = 0
+        self.total = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def first_index(self):
+        return self.total - self._count
+
+    def append(self, line):
+        """Ajoute une ligne ; la plus ancienne est évincée si le tampon est plein"""
+        if len(line) > self.max_line_length:
+            line = line[:self.max_line_length]
+        if self._count < self.capacity:
+            self._lines[(self._start + self._count) % self.capacity] = line
+            self._count += 1
+        else:
+            self._lines[self._start] = line
+            self._start = (self._start + 1) % self.capacity
+        self.total += 1
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def __getitem__(self, i):
+        """Ligne `i` en partant de la plus ancienne (les index négatifs partent de la fin)"""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("scrollback index out of range")
+        return self._lines[(self._start + i) % self.capacity]
+
+    def get(self, index):
+        """Ligne de numéro absolu `index`, ou None si elle a été évincée"""
+        i = index - self.first_index
+        if 0 <= i < self._count:
+            return self._lines[(self._start + i) % self.capacity]
+        return None
+
+    def window(self, height, offset=0):
+        """Les `height` lignes visibles quand on a remonté de `offset` lignes depuis le bas"""
+        offset = min(max(0, offset), max(0, self._count - height))
+        end = self._count - offset
+        begin = max(0, end - height)
+        return [self[i] for i in range(begin, end)]
+
+    def clear(self):
+        """Vide l'historique (la numérotation absolue continue)"""
+        self._lines = [""] * self.capacity
+        self._start = 0
+        self._count = 0
@@ -0,0 +1,157 @@
+"""Recherche dans l'historique d'une session : index des lignes trouvées, construit par tranches
+
+`ScrollbackSearch` parcourt l'historique de la plus ancienne ligne vers la
+plus récente, par tranches limitées en temps (`step`) : l'interface en traite
+une par tour de boucle, si bien qu'un historique de 100 000 lignes ne bloque
+jamais le clavier. Les numéros absolus des lignes trouvées sont gardés triés
+(`matches`) ; la sortie qui arrive ensuite n'est lue qu'une fois, à partir de
+la dernière ligne parcourue, et les lignes évincées de l'historique sont
+retirées de l'index. Quand on tape un caractère de plus, la nouvelle recherche
+(sous-chaîne plus longue) ne relit que les lignes déjà trouvées.
+
+Les lignes de l'écran courant, qui ne sont pas encore dans l'historique, sont
+relues à la demande (`positions`) : elles y reçoivent les numéros qui suivent
+celui de la dernière ligne de l'historique.
+"""
+import re
+import time
+from bisect import bisect_left, bisect_right
+
+SCAN_BUDGET = 0.004  # Secondes de parcours par tranche
+SCAN_BLOCK = 256  # Lignes lues entre deux vérifications du temps
+
+
+class ScrollbackSearch:
+    """Sous-chaîne ou expression régulière recherchée dans `scrollback` (casse ignorée si le motif est en minuscules)"""
+
+    def __init__(self, scrollback, pattern, regex=False, previous=None):
+        self.scrollback = scrollback
+        self.pattern = pattern
+        self.regex = regex
+        self.filter = False if previous is None else previous.filter  # Vue filtrée : seules les lignes trouvées
+        self.ignore_case = pattern == pattern.lower()
+        self.error = None
+        try:
+            self._compiled = re.compile(pattern if regex else re.escape(pattern),
+                                        re.IGNORECASE if self.ignore_case else 0)
+        except re.error as e:
+            self._compiled = None
+            self.error = str(e)
+        self.matches = []  # Numéros absolus des lignes trouvées, croissants
+        self.current = None  # Numéro de la ligne trouvée sélectionnée (navigation)
+        self.scanned = scrollback.first_index  # Prochaine ligne de l'historique à lire
+        self._candidates = []  # Lignes à relire avant de reprendre à `scanned` (affinage)
+        self._next_candidate = 0
+        if previous is not None and self._narrows(previous):
+            previous.prune()
+            # Lignes trouvées par `previous`, puis celles qu'il n'avait pas encore relues (croissantes à la suite)
+            self._candidates = [i for i in previous.matches if i < previous.scanned]
+            self._candidates += previous._candidates[previous._next_candidate:]
+            self.scanned = previous.scanned
+
+    def _narrows(self, previous):
+        """Vrai si chaque ligne trouvée par ce motif l'était déjà par `previous` (sous-chaîne plus longue)"""
+        if self.regex or previous.regex or previous.error or not previous.pattern:
+            return False
+        if self.ignore_case != previous.ignore_case:
+            return False
+        if self.ignore_case:
+            return previous.pattern.lower() in self.pattern.lower()
+        return previous.pattern in self.pattern
+
+    @property
+    def active(self):
+        """Faux tant que le motif est vide ou invalide"""
+        return bool(self.pattern) and self._compiled is not None
+
+    @property
+    def pending(self):
+        """Vrai tant qu'il reste des lignes à lire (historique ou sortie arrivée depuis)"""
+        return self.active and (self._next_candidate < len(self._candidates) or self.scanned < self.scrollback.total)
+
+    def prune(self):
+        """Oublie les lignes évincées de l'historique (ou effacées par F7)"""
+        first = self.scrollback.first_index
+        if self.matches and self.matches[0] < first:
+            del self.matches[:bisect_left(self.matches, first)]
+        if self.scanned < first:
+            self.scanned = first  # Évincées avant d'avoir été lues
+
+    def step(self, budget=SCAN_BUDGET):
+        """Lit une tranche de lignes (au plus `budget` secondes) ; retourne vrai s'il en reste"""
+        if not self.active:
+            return False
+        self.prune()
+        scrollback, search, matches = self.scrollback, self._compiled.search, self.matches
+        deadline = time.perf_counter() + budget
+        first = scrollback.first_index
+        candidates = self._candidates
+        while self._next_candidate < len(candidates):
+            start = self._next_candidate
+            self._next_candidate = min(len(candidates), start + SCAN_BLOCK)
+            for index in candidates[start:self._next_candidate]:
+                if index >= first and search(scrollback.get(index)):
+                    matches.append(index)
+            if time.perf_counter() >= deadline:
+                return self.pending
+        while self.scanned < scrollback.total:
+            end = min(scrollback.total, self.scanned + SCAN_BLOCK)
+            for index in range(self.scanned, end):
+                if search(scrollback.get(index)):
+                    matches.append(index)
+            self.scanned = end
+            if time.perf_counter() >= deadline:
+                break
+        return self.pending
+
+    def positions(self, screen):
+        """Lignes trouvées dans l'historique puis sur l'écran courant (numéros absolus, croissants)"""
+        if not self.active:
+            return []
+        self.prune()
+        total, search = self.scrollback.total, self._compiled.search
+        return self.matches + [total + row for row in range(screen.rows) if search(screen.line(row))]
+
+    def move(self, screen, direction):
+        """Sélectionne la ligne trouvée suivante (1, plus récente) ou précédente (-1) ; retourne son numéro ou None"""
+        positions = self.positions(screen)
+        if not positions:
+            self.current = None
+            return None
+        if self.current is None:
+            index = len(positions) - 1  # La plus récente d'abord
+        elif direction > 0:
+            index = min(len(positions) - 1, bisect_right(positions, self.current))
+        else:
+            index = max(0, bisect_left(positions, self.current) - 1)
+        self.current = positions[index]
+        return self.current
+
+    def offset(self, screen, height):
+        """Remontée (`scroll_pos`) qui place la sélection au milieu d'une vue de `height` lignes"""
+        if self.current is None:
+            return 0
+        if self.filter:
+            positions = self.positions(screen)
+            count, index = len(positions), bisect_left(positions, self.current)
+        else:
+            count, index = len(self.scrollback) + screen.rows, self.current - self.scrollback.first_index
+        return max(0, min(count - height, count - (index + height // 2 + 1)))
+
+    def spans(self, line):
+        """(début, fin) de chaque occurrence dans `line`, pour la surbrillance"""
+        if not self.active:
+            return []
+        return [m.span() for m in self._compiled.finditer(line) if m.end() > m.start()]
+
+    def describe(self, screen):
+        """Résumé pour le titre : motif, position de la sélection et nombre de lignes trouvées"""
+        kind = "re " if self.regex else ""
+        if self.error:
+            return f" [/{self.pattern} {kind}error: {self.error}]"
+        positions = self.positions(screen)
+        index = bisect_left(positions, self.current) if self.current is not None else len(positions)
+        rank = index + 1 if index < len(positions) and positions[index] == self.current else "-"
+        more = "…" if self.pending else ""
+        view = " filter" if self.filter else ""
+        return f" [/{self.pattern} {kind}{rank}/{len(positions)}{more}{view}]"
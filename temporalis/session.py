@@ -0,0 +1,201 @@
+"""Sessions shell (onglets) : un PTY, un émulateur, un historique et un répertoire chacune
+
+Toutes les sessions sont lues par le même réacteur. Celles en arrière-plan
+continuent d'alimenter leur émulateur et leur historique, mais ne sont pas
+dessinées ; passer de l'une à l'autre ne redessine que les lignes visibles.
+La mémoire de chaque session est bornée par son historique circulaire
+(nombre de lignes × longueur maximale d'une ligne).
+"""
+import os
+import pty
+import signal
+
+from temporalis.ptyio import PtyReader, set_winsize
+from temporalis.scrollback import Scrollback
+from temporalis.shellhook import CwdTracker, prepare_shell
+from temporalis.vt import Screen
+
+_closed_pids = set()  # Shells fermés pas encore récupérés par waitpid
+
+
+class Session:
+    """Un shell dans son propre PTY (lancé par pty.fork : le PTY devient son terminal de contrôle)"""
+
+    def __init__(self, number, rows, cols, shell, scrollback_lines=100000, shell_hook=True, procfs=True):
+        self.number = number
+        argv, env = prepare_shell(shell, shell_hook)  # Hook de prompt : répertoire et code de sortie
+        self.pid, self.fd = pty.fork()
+        if self.pid == 0:
+            try:
+                os.execvpe(argv[0], argv, env)
+            finally:
+                os._exit(127)
+        os.set_blocking(self.fd, False)  # Permet de vider le PTY sans bloquer
+        set_winsize(self.fd, rows, cols)  # vim, less, htop... s'adaptent à la section
+        self.reader = PtyReader(self.fd)
+
+        self.scrollback = Scrollback(scrollback_lines)
+        self.screen = Screen(rows, cols, self.scrollback)
+        self.tracker = CwdTracker(self.pid, procfs=procfs)  # Sondage par /proc, ou psutil sans /proc
+        self.screen.on_osc = self._on_osc
+        self.on_cwd_change = None  # Rappel `on_cwd_change(session)` (répertoire poussé par OSC 7)
+        self.on_command_done = None  # Rappel `on_command_done(session)` (OSC 133;D, retour au prompt)
+        self.program = None  # Programme interactif lancé dans le PTY, jusqu'au retour au prompt
+        self._command_marks = 0  # OSC 133;B/C reçus : début de chaque commande (hook de prompt)
+        self._program_mark = 0  # Valeur de `_command_marks` au lancement du programme
+        self._program_foreground = False  # Le programme a eu le premier plan du PTY (repli sans hook)
+        self.scroll_pos = 0  # Nombre de lignes remontées dans l'historique (0 = suit la sortie)
+        self.fast_forward = False  # Sortie dessinée au plus toutes les `fast_forward_interval` s (app)
+        self.search = None  # Recherche en cours dans l'historique (temporalis.search)
+        self.recorder = None  # Journal de la session (--record, temporalis.recording)
+        self.unseen = False  # Sortie reçue pendant que la session était en arrière-plan
+        self.on_write_pending = None  # Rappel `on_write_pending(session)` (PTY plein : le reste attend `flush`)
+        self.on_hangup = None  # Rappel `on_hangup(session)` (écriture refusée, EIO : le shell est terminé)
+        self.hung_up = False
+        self._pending = bytearray()  # Octets écrits mais pas encore acceptés par le PTY
+
+    @property
+    def cwd(self):
+        return self.tracker.cwd
+
+    @property
+    def exit_status(self):
+        return self.tracker.exit_status
+
+    def _on_osc(self, code, value):
+        if self.tracker.on_osc(code, value) and self.on_cwd_change is not None:
+            self.on_cwd_change(self)
+        if code == "133":
+            if value[:1] in ("B", "C"):
+                self._command_marks += 1
+            elif value.startswith("D") and self.program and self._command_marks > self._program_mark:
+                # Fin de la commande lancée par run_program : un 133;D plus ancien (prompt encore
+                # en cours d'affichage) arrive avant le 133;C de cette commande et ne compte pas
+                self._program_done()
+
+    def _program_done(self):
+        self.program = None
+        if self.on_command_done is not None:
+            self.on_command_done(self)
+
+    def poll_program(self):
+        """Repli sans 133;C : le programme est terminé quand le shell a repris le premier plan du PTY
+
+        Retourne True si le programme vient de se terminer. À appeler aussi
+        périodiquement : un programme qui se termine sans rien écrire ne
+        provoque pas de lecture.
+        """
+        if not self.program:
+            return False
+        try:
+            shell_in_front = os.tcgetpgrp(self.fd) == self.pid
+        except OSError:
+            return False
+        if not shell_in_front:
+            self._program_foreground = True
+        elif self._program_foreground:
+            self._program_done()
+            return True
+        return False
+
+    def run_program(self, command):
+        """Lance un programme interactif dans le shell de la session (même répertoire, même environnement)"""
+        self.program = command.split()[0]
+        self._program_mark = self._command_marks
+        self._program_foreground = False
+        self.scroll_pos = 0
+        self.write((command + "\n").encode())
+
+    def read(self):
+        """Vide le PTY dans l'émulateur ; retourne False quand le shell s'est terminé"""
+        data, eof = self.reader.read()
+        if data:
+            # L'émulateur met à jour sa grille ; les lignes qui sortent par le haut vont dans l'historique
+            scrolled_before = self.scrollback.total
+            was_alternate = self.screen.alternate is not None
+            self.screen.feed(data)
+            if self.recorder is not None:
+                self.recorder.output(self, self.reader.raw)  # Octets bruts, après l'émulateur (images clés)
+            if (self.program and was_alternate and self.screen.alternate is None
+                    and not self.tracker.hooked):
+                # Shell sans hook : le programme rend l'écran principal en quittant (vim, less, htop...)
+                self._program_done()
+            self.poll_program()  # Shell sans hook, ou sans 133;C (bash < 4.4)
+            if self.screen.replies:
+                # Réponses aux requêtes du programme (position du curseur, identification du terminal)
+                self.write("".join(self.screen.replies).encode())
+                self.screen.replies.clear()
+            if self.scroll_pos and not (self.search and self.search.filter):
+                # On garde la même vue pendant que l'utilisateur consulte l'historique
+                self.scroll_pos = min(self.scroll_pos + self.scrollback.total - scrolled_before,
+                                      len(self.scrollback))
+            self.unseen = True
+        return not eof
+
+    def resize(self, rows, cols):
+        """Nouvelle taille de la section : l'émulateur est redimensionné et le PTY prévient le programme (SIGWINCH)"""
+        self.screen.resize(rows, cols)
+        set_winsize(self.fd, self.screen.rows, self.screen.cols)
+        if self.recorder is not None:
+            self.recorder.resize(self)
+
+    def write(self, data):
+        """Envoie `data` au shell ; ce que le PTY n'accepte pas tout de suite attend le prochain `flush`"""
+        if self.hung_up:
+            return
+        if self.recorder is not None:
+            self.recorder.input(self, data)
+        waiting = bool(self._pending)
+        self._pending += data
+        if not waiting and not self.flush() and self.on_write_pending is not None:
+            self.on_write_pending(self)
+
+    def flush(self):
+        """Écrit le plus possible des octets en attente ; vrai quand il n'en reste plus"""
+        while self._pending:
+            try:
+                sent = os.write(self.fd, self._pending)
+            except BlockingIOError:
+                return False
+            except InterruptedError:
+                continue
+            except OSError:
+                # EIO (ou EBADF) : le shell a fermé le PTY, ce qui reste ne sera jamais lu
+                self._pending.clear()
+                if not self.hung_up:
+                    self.hung_up = True
+                    if self.on_hangup is not None:
+                        self.on_hangup(self)
+                return True
+            del self._pending[:sent]
+        return True
+
+    def clear(self):
+        """Vide l'historique et l'écran émulé"""
+        self.scrollback.clear()
+        self.screen.feed("\x1b[H\x1b[2J")  # Efface l'écran et replace le curseur en haut
+        self.scroll_pos = 0
+
+    def close(self):
+        """Ferme le PTY et termine le shell s'il tourne encore"""
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+        try:
+            os.kill(self.pid, signal.SIGHUP)
+        except ProcessLookupError:
+            pass
+        _closed_pids.add(self.pid)
+        reap_closed()
+
+
+def reap_closed():
+    """Récupère les shells fermés qui se sont terminés depuis (pas de zombie) ; à appeler régulièrement"""
+    for pid in list(_closed_pids):
+        try:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            done = pid
+        if done:
+            _closed_pids.discard(pid)
@@ -0,0 +1,143 @@
+"""Intégration shell : répertoire courant et code de sortie poussés par le prompt
+
+Le shell lancé dans le PTY reçoit un hook de prompt (bash : PROMPT_COMMAND via
+un --rcfile, zsh : precmd via ZDOTDIR) qui émet avant chaque prompt :
+
+- OSC 7 `file://hôte/chemin` : le répertoire courant du shell ;
+- OSC 133;D;code : le code de sortie de la dernière commande.
+
+Il émet aussi OSC 133;C juste avant d'exécuter chaque commande (bash : PS0,
+zsh : preexec) : le 133;D qui suit est celui qui termine cette commande.
+
+Ces séquences traversent l'émulateur VT (`Screen.on_osc`) : un `cd`, un
+`pushd` ou un chemin relatif devient un événement, sans aucun sondage. Pour
+les shells sans hook, `CwdTracker.poll()` lit le répertoire du processus :
+/proc/<pid>/cwd sous Linux, sinon psutil (sysctl KERN_PROC_FILEDESC sous
+FreeBSD, proc_pidinfo sous macOS). kqueue ne signale pas les changements de
+répertoire : ce repli reste un sondage.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+# Le code de sortie est lu en premier, avant que le hook ne le remplace
+_BASH_HOOK = r"""
+__temporalis_prompt() {
+    local status=$?
+    printf '\033]133;D;%s\007\033]7;file://%s%s\007' "$status" "$HOSTNAME" "${PWD//%/%25}"
+    return $status
+}
+PROMPT_COMMAND="__temporalis_prompt${PROMPT_COMMAND:+;$PROMPT_COMMAND}"
+PS0='\e]133;C\a'"${PS0:-}"
+"""
+
+_BASH_RC = r"""
+[ -f /etc/bash.bashrc ] && . /etc/bash.bashrc
+[ -f ~/.bashrc ] && . ~/.bashrc
+""" + _BASH_HOOK
+
+# zsh lit .zshenv puis .zshrc dans $ZDOTDIR : on charge ceux de l'utilisateur avant d'ajouter le hook
+_ZSH_ENV = r"""
+ZDOTDIR=${TEMPORALIS_USER_ZDOTDIR:-$HOME}
+[ -f "$ZDOTDIR/.zshenv" ] && . "$ZDOTDIR/.zshenv"
+TEMPORALIS_USER_ZDOTDIR=$ZDOTDIR
+ZDOTDIR=${TEMPORALIS_HOOK_DIR}
+"""
+
+_ZSH_RC = r"""
+ZDOTDIR=$TEMPORALIS_USER_ZDOTDIR
+[ -f "$ZDOTDIR/.zshrc" ] && . "$ZDOTDIR/.zshrc"
+__temporalis_prompt() {
+    local exit_status=$?
+    printf '\033]133;D;%s\007\033]7;file://%s%s\007' "$exit_status" "$HOST" "${PWD//\%/%25}"
+}
+__temporalis_preexec() {
+    printf '\033]133;C\007'
+}
+typeset -ag precmd_functions preexec_functions
+precmd_functions+=(__temporalis_prompt)
+preexec_functions+=(__temporalis_preexec)
+"""
+
+_hook_dir = None
+
+
+def _write_hook_files():
+    """Écrit les fichiers de démarrage une fois par exécution (supprimés à la sortie)"""
+    global _hook_dir
+    if _hook_dir is None:
+        _hook_dir = tempfile.mkdtemp(prefix="temporalis-")
+        atexit.register(shutil.rmtree, _hook_dir, True)
+        for name, content in (("bashrc", _BASH_RC), (".zshenv", _ZSH_ENV), (".zshrc", _ZSH_RC)):
+            with open(os.path.join(_hook_dir, name), "w") as f:
+                f.write(content)
+    return _hook_dir
+
+
+def prepare_shell(shell, enabled=True):
+    """(argv, environnement) pour lancer `shell` avec le hook ; les shells inconnus sont lancés tels quels"""
+    env = dict(os.environ)
+    name = os.path.basename(shell)
+    if not enabled or name not in ("bash", "zsh"):
+        return [shell], env
+    hook_dir = _write_hook_files()
+    if name == "bash":
+        return [shell, "--rcfile", os.path.join(hook_dir, "bashrc")], env
+    if "ZDOTDIR" in env:
+        env["TEMPORALIS_USER_ZDOTDIR"] = env["ZDOTDIR"]
+    env["ZDOTDIR"] = env["TEMPORALIS_HOOK_DIR"] = hook_dir
+    return [shell], env
+
+
+def process_cwd(pid, procfs=True):
+    """Répertoire courant du processus `pid` (/proc si `procfs`, sinon psutil), ou None"""
+    if procfs:
+        try:
+            return os.readlink(f"/proc/{pid}/cwd")
+        except OSError:
+            pass
+    import psutil  # Importé seulement sans /proc (BSD, macOS) : coûteux au démarrage
+    try:
+        return psutil.Process(pid).cwd()
+    except (psutil.Error, OSError, NotImplementedError):
+        return None
+
+
+class CwdTracker:
+    """Répertoire courant et code de sortie du shell, par OSC 7 / 133 ou par sondage"""
+
+    def __init__(self, pid, cwd=None, procfs=True):
+        self.pid = pid
+        self.procfs = procfs
+        self.cwd = cwd or process_cwd(pid, procfs) or os.getcwd()
+        self.exit_status = 0
+        self.hooked = False  # Devient vrai à la première séquence OSC 7 : le sondage est alors inutile
+        self._hostname = os.uname().nodename
+
+    def on_osc(self, code, value):
+        """À brancher sur `Screen.on_osc` ; retourne True si le répertoire a changé"""
+        if code == "133" and value.startswith("D"):
+            _, _, status = value.partition(";")
+            self.exit_status = int(status) if status.isdigit() else 0
+        elif code == "7":
+            from urllib.parse import unquote, urlsplit  # Importé au premier OSC 7, après la première image
+            url = urlsplit(value)
+            # Un shell distant (ssh) peut aussi envoyer OSC 7 : on ignore les autres machines
+            if url.scheme == "file" and url.hostname in (None, "", "localhost", self._hostname):
+                self.hooked = True
+                return self._set(unquote(url.path))
+        return False
+
+    def poll(self):
+        """Repli pour les shells sans hook ; retourne True si le répertoire a changé"""
+        if self.hooked:
+            return False
+        cwd = process_cwd(self.pid, self.procfs)
+        return cwd is not None and self._set(cwd)
+
+    def _set(self, cwd):
+        if cwd and cwd != self.cwd:
+            self.cwd = cwd
+            return True
+        return False
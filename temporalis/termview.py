@@ -0,0 +1,169 @@
+"""Affichage d'un `Screen` (émulateur VT) dans une fenêtre curses
+
+Seules les lignes marquées comme modifiées par l'émulateur sont redessinées.
+Les lignes sont complétées selon leur nombre de cellules et non de caractères :
+un caractère large occupe deux colonnes.
+"""
+import curses
+
+from temporalis.vt import BG_SHIFT, BOLD, DIM, FG_MASK, REVERSE, UNDERLINE, char_width
+
+
+def fit(line, width):
+    """`line` coupée ou complétée pour occuper exactement `width` colonnes à l'écran"""
+    if line.isascii():
+        return line[:width].ljust(width)
+    parts = []
+    used = 0
+    for ch in line:
+        w = char_width(ch)
+        if used + w > width:
+            break
+        parts.append(ch)
+        used += w
+    return "".join(parts) + " " * (width - used)
+
+
+class TerminalView:
+    """Dessine l'écran émulé à l'intérieur de la bordure d'une section"""
+
+    def __init__(self, default_pair=1, first_pair=2):
+        self.default_pair = default_pair  # Paire de l'interface (vert sur noir)
+        self._next_pair = first_pair
+        self._pairs = {}
+        self._attr_cache = {}
+        self._cursor_row = None
+        self.live = True  # Faux quand on affiche l'historique
+
+    def _color_pair(self, fg, bg):
+        """Paire curses pour (fg, bg), allouée à la demande ; -1 = couleur de l'interface"""
+        if fg < 0 and bg < 0:
+            return curses.color_pair(self.default_pair)
+        key = (fg, bg)
+        pair = self._pairs.get(key)
+        if pair is None:
+            colors = getattr(curses, "COLORS", 8)
+            if self._next_pair >= getattr(curses, "COLOR_PAIRS", 64):
+                return curses.color_pair(self.default_pair)  # Plus de paires disponibles
+            try:
+                curses.init_pair(self._next_pair,
+                                 curses.COLOR_GREEN if fg < 0 else fg % colors,
+                                 curses.COLOR_BLACK if bg < 0 else bg % colors)
+            except curses.error:
+                return curses.color_pair(self.default_pair)
+            pair = self._pairs[key] = self._next_pair
+            self._next_pair += 1
+        return curses.color_pair(pair)
+
+    def attr(self, packed):
+        """Attribut curses correspondant à un attribut de cellule de l'émulateur"""
+        result = self._attr_cache.get(packed)
+        if result is None:
+            fg = (packed & FG_MASK) - 1
+            bg = ((packed >> BG_SHIFT) & FG_MASK) - 1
+            result = self._color_pair(fg, bg)
+            if packed & BOLD:
+                result |= curses.A_BOLD
+            if packed & DIM:
+                result |= curses.A_DIM
+            if packed & UNDERLINE:
+                result |= curses.A_UNDERLINE
+            if packed & REVERSE:
+                result |= curses.A_REVERSE
+            self._attr_cache[packed] = result
+        return result
+
+    def draw(self, window, screen, full=False):
+        """Redessine les lignes modifiées de `screen` (toutes si `full`)"""
+        max_y, max_x = window.getmaxyx()
+        height, width = max_y - 2, max_x - 2
+        rows = set(range(screen.rows)) if full or not self.live else set(screen.take_dirty())
+        if full or not self.live:
+            screen.take_dirty()
+        self.live = True
+
+        # Le curseur est dessiné en vidéo inverse : on repeint son ancienne et sa nouvelle ligne
+        cursor_row = screen.cursor_y if screen.cursor_visible else None
+        if self._cursor_row is not None:
+            rows.add(self._cursor_row)
+        if cursor_row is not None:
+            rows.add(cursor_row)
+        self._cursor_row = cursor_row
+
+        for y in sorted(rows):
+            if y >= height or y >= screen.rows:
+                continue
+            self._draw_row(window, y + 1, screen.chars[y], screen.attrs[y], width)
+            if y == cursor_row:
+                x = min(screen.cursor_x, screen.cols - 1)
+                if x < width:
+                    window.chgat(y + 1, 1 + x, 1, self.attr(screen.attrs[y][x]) | curses.A_REVERSE)
+
+    def _draw_row(self, window, y, chars, attrs, width):
+        n = min(width, len(chars))
+        if attrs.count(attrs[0]) == len(attrs):
+            # Cas courant : toute la ligne a le même attribut
+            window.addstr(y, 1, "".join(chars[:n]) + " " * (width - n), self.attr(attrs[0]))
+            return
+        x = 0
+        while x < n:
+            a = attrs[x]
+            end = x + 1
+            while end < n and attrs[end] == a:
+                end += 1
+            window.addstr(y, 1 + x, "".join(chars[x:end]), self.attr(a))
+            x = end
+        if n < width:
+            window.addstr(y, 1 + n, " " * (width - n), curses.color_pair(self.default_pair))
+
+    def draw_history(self, window, scrollback, screen, offset, search=None):
+        """Affiche l'historique remonté de `offset` lignes (historique + écran courant), occurrences de `search` en surbrillance"""
+        max_y, max_x = window.getmaxyx()
+        height, width = max_y - 2, max_x - 2
+        self.live = False
+        total = len(scrollback) + screen.rows
+        end = total - max(0, min(offset, total - height))
+        begin = max(0, end - height)
+        attr = curses.color_pair(self.default_pair)
+        for row, index in enumerate(range(begin, end)):
+            if index < len(scrollback):
+                line = scrollback[index]
+            else:
+                line = screen.line(index - len(scrollback))
+            window.addstr(row + 1, 1, fit(line, width), attr)
+            if search is not None:
+                self._highlight(window, row + 1, line, width, search, scrollback.first_index + index)
+
+    def draw_filtered(self, window, scrollback, screen, offset, search):
+        """Affiche seulement les lignes trouvées par `search` (historique puis écran), remontées de `offset`"""
+        max_y, max_x = window.getmaxyx()
+        height, width = max_y - 2, max_x - 2
+        self.live = False
+        positions = search.positions(screen)
+        end = len(positions) - max(0, min(offset, len(positions) - height))
+        shown = positions[max(0, end - height):end]
+        attr = curses.color_pair(self.default_pair)
+        for row in range(height):
+            if row >= len(shown):
+                window.addstr(row + 1, 1, " " * width, attr)
+                continue
+            index = shown[row]
+            line = scrollback.get(index) if index < scrollback.total else screen.line(index - scrollback.total)
+            window.addstr(row + 1, 1, fit(line, width), attr)
+            self._highlight(window, row + 1, line, width, search, index)
+
+    def _highlight(self, window, y, line, width, search, index):
+        """Occurrences en vidéo inverse ; en gras sur la ligne sélectionnée"""
+        attr = curses.color_pair(self.default_pair) | curses.A_REVERSE
+        if index == search.current:
+            attr |= curses.A_BOLD
+        ascii_line = line.isascii()
+        for start, end in search.spans(line):
+            if ascii_line:
+                x, cells = start, end - start
+            else:
+                x = sum(char_width(ch) for ch in line[:start])
+                cells = sum(char_width(ch) for ch in line[start:end])
+            if x >= width:
+                break
+            window.chgat(y, 1 + x, min(cells, width - x), attr)
@@ -0,0 +1,924 @@
+"""Émulateur VT100/ANSI incrémental
+
+`Screen` garde une grille de cellules (caractère + attribut), un curseur, une
+zone de défilement et l'ensemble des lignes modifiées depuis le dernier
+affichage. Le parseur est une machine à états : une séquence d'échappement
+coupée entre deux lectures du PTY est simplement reprise à la lecture suivante.
+
+Le texte imprimable est recherché par expression régulière et écrit par blocs,
+seules les séquences de contrôle passent par la machine à états caractère par
+caractère. Une suite de lignes simples (texte, tabulations, couleurs SGR,
+effacements de ligne : `cat`, `ls --color`, journaux de build) qui défile en
+bas de l'écran principal est traitée d'un bloc : l'écran n'est décalé qu'une
+fois, seules les lignes qui restent visibles sont composées dans leurs rangées,
+les autres ne donnent que leur texte à l'historique.
+
+Les caractères larges (CJK, emoji) occupent deux cellules : la seconde reste
+vide (""), si bien que `"".join(ligne)` a toujours la largeur de l'écran. Les
+caractères de largeur nulle (accents combinants) s'ajoutent à la cellule
+précédente. La largeur de chaque caractère est mise en cache ; le texte ASCII
+ne la consulte jamais.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# États du parseur
+GROUND, ESCAPE, CSI, OSC, OSC_ESCAPE, CHARSET = range(6)
+
+_CSI_FINAL = re.compile(r"[\x40-\x7e]")
+_OSC_END = re.compile(r"[\x07\x1b]")
+_TEXT_CSI = re.compile(r"([^\x00-\x1f\x7f]*)(?:\x1b\[([0-?]*[ -/]*)([@-~]))?")  # Texte, puis séquence CSI complète
+# Lignes terminées par CR LF faites de texte, de tabulations, de couleurs (SGR) et d'effacements de ligne (EL)
+_SIMPLE_LINES = re.compile(r"(?:[^\x00-\x1f\x7f]*(?:(?:\t|\x1b\[[0-9;:]*m|\x1b\[[012]?K)[^\x00-\x1f\x7f]*)*\r\n)+")
+_LINE_CONTROLS = re.compile(r"(\t|\x1b\[[0-9;:]*m|\x1b\[[012]?K)")
+_SGR_PARAMS = re.compile(r"\x1b\[([0-9;:]*)m")
+
+# Attributs : couleur de texte et de fond sur 9 bits chacune (0 = couleur par défaut,
+# n + 1 = couleur n de la palette 256), puis les styles
+FG_MASK = 0x1FF
+BG_SHIFT = 9
+BG_MASK = 0x1FF << BG_SHIFT
+BOLD = 1 << 18
+UNDERLINE = 1 << 19
+REVERSE = 1 << 20
+DIM = 1 << 21
+DEFAULT_ATTR = 0
+
+_SGR_FLAGS = {1: BOLD, 2: DIM, 4: UNDERLINE, 7: REVERSE}
+_SGR_RESET_FLAGS = {21: BOLD, 22: BOLD | DIM, 24: UNDERLINE, 27: REVERSE}
+_sgr_cache = {}  # (attribut courant, paramètres SGR) -> nouvel attribut
+
+
+@lru_cache(maxsize=4096)
+def char_width(ch):
+    """Nombre de cellules occupées par `ch` : 0 (combinant), 1 ou 2 (large)"""
+    if unicodedata.combining(ch) or unicodedata.category(ch) in ("Mn", "Me", "Cf"):
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+
+
+@lru_cache(maxsize=1024)
+def _cells(text):
+    """Cellules de `text` dessiné d'un bloc ("" : seconde moitié d'un caractère large) et son dernier caractère
+
+    None si `text` commence par un accent combinant : il rejoint une cellule déjà à l'écran.
+    """
+    cells = []
+    last = None
+    for ch in text:
+        width = char_width(ch) if ch > "\x7f" else 1
+        if width == 1:
+            cells.append(ch)
+        elif width == 2:
+            cells.append(ch)
+            cells.append("")
+        elif not cells:
+            return None
+        else:
+            cells[-1 if cells[-1] else -2] += ch  # L'accent rejoint le caractère précédent
+            continue
+        last = ch
+    return tuple(cells), last
+
+
+def rgb_to_256(r, g, b):
+    """Couleur 24 bits ramenée au cube 6x6x6 de la palette 256 couleurs"""
+    return 16 + 36 * round(r / 255 * 5) + 6 * round(g / 255 * 5) + round(b / 255 * 5)
+
+
+def sgr_sequence(attr):
+    """SGR qui donne l'attribut de cellule `attr` en partant des attributs par défaut"""
+    params = ["0"] + [str(code) for code, flag in _SGR_FLAGS.items() if attr & flag]
+    fg = attr & FG_MASK
+    bg = (attr >> BG_SHIFT) & FG_MASK
+    if fg:
+        params.append(f"38;5;{fg - 1}")
+    if bg:
+        params.append(f"48;5;{bg - 1}")
+    return "\x1b[" + ";".join(params) + "m"
+
+
+def _grid_sequences(chars, attrs):
+    """Chaque ligne de la grille, par plages d'attribut identique (espaces de fin sans couleur omis)"""
+    parts = []
+    for y, (line_chars, line_attrs) in enumerate(zip(chars, attrs)):
+        end = len(line_chars)
+        while end and line_attrs[end - 1] == DEFAULT_ATTR and line_chars[end - 1] == " ":
+            end -= 1
+        parts.append(f"\x1b[{y + 1};1H")
+        x = 0
+        while x < end:
+            attr = line_attrs[x]
+            run = x + 1
+            while run < end and line_attrs[run] == attr:
+                run += 1
+            parts.append(sgr_sequence(attr) + "".join(line_chars[x:run]))
+            x = run
+    return "".join(parts)
+
+
+class Screen:
+    """Grille de cellules alimentée par le flux brut du PTY"""
+
+    def __init__(self, rows, cols, scrollback=None):
+        self.rows = max(1, rows)
+        self.cols = max(1, cols)
+        self.scrollback = scrollback  # Reçoit les lignes qui sortent par le haut (écran principal)
+        self.replies = []  # Réponses à renvoyer au PTY (DSR, DA...)
+        self.title = ""
+        self.on_osc = None  # Rappel optionnel `on_osc(code, texte)` pour les OSC non gérées ici
+        self.reset()
+
+    # --- État -------------------------------------------------------------
+
+    def reset(self):
+        self.attr = DEFAULT_ATTR
+        self.chars = [self._blank_chars() for _ in range(self.rows)]
+        self.attrs = [self._blank_attrs() for _ in range(self.rows)]
+        self.cursor_y = 0
+        self.cursor_x = 0
+        self.scroll_top = 0
+        self.scroll_bottom = self.rows - 1
+        self.autowrap = True
+        self.cursor_visible = True
+        self.app_cursor = False  # DECCKM : flèches envoyées en ESC O A au lieu de ESC [ A
+        self.alternate = None  # Écran principal sauvegardé pendant l'écran alternatif
+        self._saved_cursor = (0, 0, DEFAULT_ATTR)
+        self._state = GROUND
+        self._params = ""
+        self._osc = ""
+        self._last_char = ""
+        self.dirty = set(range(self.rows))
+
+    def resize(self, rows, cols):
+        """Nouvelle taille de grille ; en rétrécissant, les lignes au-dessus du curseur passent à l'historique"""
+        rows, cols = max(1, rows), max(1, cols)
+        if (rows, cols) == (self.rows, self.cols):
+            return
+        # Lignes qui sortent par le haut pour que le curseur reste visible (comme xterm)
+        drop = max(0, self.cursor_y + 1 - rows)
+        if drop and self.alternate is None and self.scrollback is not None:
+            for chars in self.chars[:drop]:
+                self.scrollback.append("".join(chars).rstrip())
+        self.chars, self.attrs = self._resized(self.chars[drop:], self.attrs[drop:], rows, cols)
+        if self.alternate is not None:
+            chars, attrs, _, _ = self.alternate
+            chars, attrs = self._resized(chars, attrs, rows, cols)
+            self.alternate = (chars, attrs, 0, rows - 1)
+        self.rows, self.cols = rows, cols
+        self.cursor_y = max(0, self.cursor_y - drop)
+        self.cursor_x = min(self.cursor_x, cols - 1)
+        saved_y, saved_x, saved_attr = self._saved_cursor
+        self._saved_cursor = (min(saved_y, rows - 1), min(saved_x, cols - 1), saved_attr)
+        self.scroll_top, self.scroll_bottom = 0, rows - 1
+        self.touch()
+
+    def _resized(self, chars, attrs, rows, cols):
+        """Lignes coupées ou complétées à `cols` colonnes, puis tronquées ou complétées à `rows` lignes"""
+        blank = self.attr & BG_MASK
+        new_chars, new_attrs = [], []
+        for line_chars, line_attrs in zip(chars[:rows], attrs[:rows]):
+            pad = cols - len(line_chars)
+            new_chars.append(line_chars[:cols] + [" "] * pad)
+            new_attrs.append(line_attrs[:cols] + [blank] * pad)
+        for _ in range(rows - len(new_chars)):
+            new_chars.append([" "] * cols)
+            new_attrs.append([blank] * cols)
+        return new_chars, new_attrs
+
+    def _blank_chars(self):
+        return [" "] * self.cols
+
+    def _blank_attrs(self):
+        # Les cellules effacées prennent la couleur de fond courante (comme xterm)
+        return [self.attr & BG_MASK] * self.cols
+
+    def line(self, y):
+        """Texte de la ligne `y` sans les espaces de fin"""
+        return "".join(self.chars[y]).rstrip()
+
+    def display(self):
+        return [self.line(y) for y in range(self.rows)]
+
+    @property
+    def in_sequence(self):
+        """Vrai au milieu d'une séquence d'échappement (la suite arrivera à la prochaine lecture)"""
+        return self._state != GROUND
+
+    def snapshot(self):
+        """Séquences qui reconstruisent l'écran visible (grille, couleurs, curseur, modes) sur un émulateur neuf
+
+        Avec l'écran alternatif, l'écran principal est écrit d'abord puis
+        sauvegardé par ESC [?1049h, comme le ferait le programme.
+        """
+        parts = ["\x1b[0m\x1b[H\x1b[2J"]
+        if self.alternate is not None:
+            chars, attrs, _, _ = self.alternate
+            parts.append(_grid_sequences(chars, attrs))
+            y, x, attr = self._saved_cursor
+            parts.append(f"{sgr_sequence(attr)}\x1b[{y + 1};{x + 1}H\x1b[?1049h")
+        parts.append(_grid_sequences(self.chars, self.attrs))
+        parts.append(f"\x1b[{self.scroll_top + 1};{self.scroll_bottom + 1}r")
+        if not self.autowrap:
+            parts.append("\x1b[?7l")
+        if not self.cursor_visible:
+            parts.append("\x1b[?25l")
+        if self.app_cursor:
+            parts.append("\x1b[?1h")
+        parts.append(f"{sgr_sequence(self.attr)}\x1b[{self.cursor_y + 1};{min(self.cursor_x, self.cols - 1) + 1}H")
+        return "".join(parts)
+
+    def take_dirty(self):
+        """Lignes modifiées depuis le dernier appel, triées"""
+        dirty = sorted(self.dirty)
+        self.dirty = set()
+        return dirty
+
+    def touch(self):
+        """Marque toutes les lignes comme modifiées (réaffichage complet)"""
+        self.dirty = set(range(self.rows))
+
+    # --- Flux d'entrée ----------------------------------------------------
+
+    def feed(self, data):
+        """Interprète `data` (str) ; les séquences incomplètes sont reprises au prochain appel"""
+        i = 0
+        n = len(data)
+        while i < n:
+            state = self._state
+            if state == GROUND:
+                if ((self.cursor_x == 0 or i == 0) and self.cursor_y == self.scroll_bottom == self.rows - 1
+                        and self.scroll_top == 0 and self.alternate is None and self.autowrap and self.cols > 1):
+                    # Chemin rapide : bloc de lignes simples qui fait défiler tout l'écran (y compris la fin
+                    # de la ligne commencée à la lecture précédente)
+                    match = _SIMPLE_LINES.match(data, i)
+                    if match:
+                        self._feed_lines(match.group())
+                        i = match.end()
+                        continue
+                # Texte jusqu'au prochain contrôle, et la séquence CSI qui le suit si elle est complète
+                match = _TEXT_CSI.match(data, i)
+                text, params, final = match.groups()
+                if text:
+                    self._draw(text)
+                i = match.end()
+                if final is not None:
+                    self._csi(params, final)
+                elif i < n:
+                    self._control(data[i])
+                    i += 1
+            elif state == ESCAPE:
+                self._escape(data[i])
+                i += 1
+            elif state == CSI:
+                match = _CSI_FINAL.search(data, i)
+                if not match:
+                    self._params += data[i:]
+                    break
+                self._params += data[i:match.start()]
+                i = match.end()
+                self._state = GROUND
+                self._csi(self._params, match.group())
+            elif state == OSC:
+                match = _OSC_END.search(data, i)
+                if not match:
+                    self._osc += data[i:]
+                    break
+                self._osc += data[i:match.start()]
+                i = match.end()
+                if match.group() == "\x07":
+                    self._state = GROUND
+                    self._osc_dispatch(self._osc)
+                else:
+                    self._state = OSC_ESCAPE
+            elif state == OSC_ESCAPE:
+                # ESC \ (ST) termine l'OSC ; tout autre caractère démarre une nouvelle séquence
+                self._state = GROUND
+                self._osc_dispatch(self._osc)
+                if data[i] == "\\":
+                    i += 1
+                else:
+                    self._state = ESCAPE
+            else:  # CHARSET : ESC ( B et consorts, on ignore le jeu de caractères
+                self._state = GROUND
+                i += 1
+
+    # --- Texte ------------------------------------------------------------
+
+    def _feed_lines(self, block):
+        """Lignes terminées par CR LF, à partir du curseur sur la dernière ligne de l'écran principal
+
+        Le résultat est celui du chemin normal (retour à la ligne automatique,
+        couleurs et caractères larges compris), mais l'écran n'est décalé qu'une
+        fois pour tout le bloc : seules les lignes qui restent visibles sont
+        composées, les précédentes ne donnent que leur texte à l'historique.
+        """
+        cols, rows = self.cols, self.rows
+        lines = block.split("\r\n")
+        lines.pop()  # Après le dernier CR LF
+        # La première ligne continue celle du curseur
+        new_chars = [self.chars[-1][:]]
+        new_attrs = [self.attrs[-1][:]]
+        self._lay_out(lines[0], new_chars, new_attrs, self.cursor_x)
+        lines = lines[1:]
+
+        # Lignes de la fin qui remplissent l'écran : celles d'avant le traversent sans y rester
+        skipped = 0
+        if len(lines) >= rows:  # Sinon toutes restent (une rangée au moins par ligne)
+            kept = height = 0
+            while kept < len(lines) and height < rows - 1:
+                kept += 1
+                line = lines[-kept]
+                height += 1 if len(line) <= cols and line.isascii() else len(self._text_rows(line))
+            skipped = len(lines) - kept
+        old = rows - 1
+        scrollback = self.scrollback
+        if skipped:
+            # L'écran actuel et la première ligne sortent aussi
+            block = "".join(lines[:skipped])
+            if scrollback is not None:
+                for row in self.chars[:old] + new_chars:
+                    scrollback.append("".join(row).rstrip())
+                plain = block.isascii() and "\x1b" not in block and "\t" not in block
+                for line in lines[:skipped]:
+                    if plain and len(line) <= cols:
+                        scrollback.append(line.rstrip())
+                    else:
+                        scrollback.extend(self._text_rows(line))
+            if "\x1b" in block:
+                for params in _SGR_PARAMS.findall(block):
+                    self._csi(params, "m")  # Les couleurs des lignes sorties valent pour la suite
+            for line in reversed(lines[:skipped]):
+                text = _LINE_CONTROLS.sub("", line)
+                last = next((ch for ch in reversed(text) if ch <= "\x7f" or char_width(ch)), None)
+                if last is not None:
+                    self._last_char = last  # Pour REP
+                    break
+            lines = lines[skipped:]
+            new_chars, new_attrs, old = [], [], 0
+
+        texts = [None] * (old + len(new_chars))  # Texte déjà connu des rangées (historique), sinon None
+        for line in lines:
+            if line.isascii() and "\x1b" not in line and "\t" not in line:
+                # Texte simple (journaux, cat) : écrit d'un bloc par rangée, texte connu
+                attr = self.attr
+                for k in range(0, len(line), cols) if line else (0,):
+                    part = line[k:k + cols]
+                    new_chars.append(list(part.ljust(cols)))
+                    new_attrs.append([attr] * len(part) + [attr & BG_MASK] * (cols - len(part)))
+                    texts.append(part)
+                if line:
+                    self._last_char = line[-1]
+            else:
+                new_chars.append([" "] * cols)
+                new_attrs.append([self.attr & BG_MASK] * cols)
+                self._lay_out(line, new_chars, new_attrs)
+                texts += [None] * (len(new_chars) - len(texts) + old)
+        new_chars.append([" "] * cols)
+        new_attrs.append([self.attr & BG_MASK] * cols)
+        texts.append(None)
+
+        # Écran après coup : anciennes lignes (sauf celle du curseur), puis les nouvelles rangées
+        chars = self.chars[:old] + new_chars
+        attrs = self.attrs[:old] + new_attrs
+        scrolled = len(chars) - rows
+        if scrollback is not None:
+            for index in range(scrolled):
+                text = texts[index]
+                scrollback.append(("".join(chars[index]) if text is None else text).rstrip())
+        self.chars = chars[scrolled:]
+        self.attrs = attrs[scrolled:]
+        self.cursor_x = 0
+        self.dirty = set(range(rows))
+
+    def _lay_out(self, line, rows_chars, rows_attrs, x=0):
+        """Compose `line` (texte, tabulations, SGR, EL) à partir de la colonne `x` de la dernière rangée de `rows_*`
+
+        Les rangées du retour à la ligne automatique sont ajoutées à la suite.
+        Mêmes règles que `_draw`, `_draw_wide`, `_control` et `_erase_line`.
+        """
+        cols = self.cols
+        chars, attrs = rows_chars[-1], rows_attrs[-1]
+        attr = self.attr
+        sgr = _sgr_cache.get
+        last = None
+        wide = "" in chars  # Sinon, pas de moitié de caractère large à nettoyer avant d'en écrire un
+        parts = _LINE_CONTROLS.split(line)  # Texte, contrôle, texte... : terminé par du texte
+        parts.append("")
+        parts = iter(parts)
+        for part, control in zip(parts, parts):
+            end = x + len(part)
+            if not part:
+                pass
+            elif end <= cols and part.isascii():
+                # Cas courant : le segment tient sur la rangée
+                if wide:
+                    if x and not chars[x]:
+                        chars[x - 1] = " "
+                    if end < cols and not chars[end]:
+                        chars[end] = " "
+                chars[x:end] = part
+                attrs[x:end] = [attr] * len(part)
+                x = end
+                last = part[-1]
+            else:
+                if part.isascii():
+                    cells, last = part, part[-1]
+                else:
+                    layout = _cells(part) if len(part) <= 256 else _cells.__wrapped__(part)
+                    while layout is None:
+                        # Accent combinant en tête : rejoint la cellule déjà écrite
+                        prev = min(x, cols) - 1
+                        if prev >= 0:
+                            if not chars[prev] and prev > 0:
+                                prev -= 1
+                            chars[prev] += part[0]
+                        part = part[1:]
+                        layout = _cells(part) if part else ((), None)
+                    cells = layout[0]
+                    if cells:
+                        last = layout[1]
+                    wide = True
+                count = len(cells)
+                i = 0
+                while i < count:
+                    if x >= cols:
+                        chars = [" "] * cols
+                        attrs = [attr & BG_MASK] * cols
+                        rows_chars.append(chars)
+                        rows_attrs.append(attrs)
+                        x = 0
+                    end = min(cols, x + count - i)
+                    j = i + end - x
+                    if j < count and not cells[j]:
+                        # Caractère large coupé par le bord : il passe entier à la rangée suivante
+                        j -= 1
+                        end -= 1
+                    if j > i:
+                        if x and not chars[x]:
+                            chars[x - 1] = " "
+                        chars[x:end] = cells[i:j]
+                        if end < cols and not chars[end]:
+                            chars[end] = " "
+                        attrs[x:end] = [attr] * (end - x)
+                    x = end if j == count or end == cols else cols
+                    i = j
+            if not control:
+                pass
+            elif control[-1] == "m":
+                new = sgr((attr, control))
+                if new is None:
+                    self.attr = attr
+                    self._csi(control[2:-1], "m")
+                    new = self.attr
+                    if len(_sgr_cache) < 4096:
+                        _sgr_cache[attr, control] = new  # Clé : la séquence entière, sans découpage
+                attr = new
+            elif control == "\t":
+                x = min(cols - 1, (x // 8 + 1) * 8)
+            else:
+                mode = control[2:-1]
+                start, end = (0, cols) if mode == "2" else (0, min(x, cols - 1) + 1) if mode == "1" \
+                    else (min(x, cols - 1), cols)
+                chars[start:end] = " " * (end - start)
+                attrs[start:end] = [attr & BG_MASK] * (end - start)
+        self.attr = attr
+        if last is not None:
+            self._last_char = last
+
+    def _text_rows(self, line):
+        """Texte des rangées qu'occupera `line` une fois composée (lignes qui ne restent pas à l'écran)"""
+        cols = self.cols
+        if line.isascii() and "K" not in line:
+            text = _SGR_PARAMS.sub("", line) if "\x1b" in line else line
+            if "\t" not in text:
+                return [text[k:k + cols].rstrip() for k in range(0, len(text), cols)] or [""]
+            # Tabulations : des espaces jusqu'au taquet suivant, tant que la ligne tient sur une rangée
+            text = text.expandtabs()
+            if len(text) <= cols:
+                return [text.rstrip()]
+        attr, last = self.attr, self._last_char
+        rows_chars, rows_attrs = [self._blank_chars()], [self._blank_attrs()]
+        self._lay_out(line, rows_chars, rows_attrs)
+        self.attr, self._last_char = attr, last
+        return ["".join(row).rstrip() for row in rows_chars]
+
+    def _draw(self, text):
+        if not text.isascii():
+            self._draw_wide(text)
+            return
+        cols = self.cols
+        self._last_char = text[-1]
+        x = self.cursor_x
+        end = x + len(text)
+        if end <= cols:
+            # Cas courant (segment entre deux séquences de couleur) : tout tient sur la ligne du curseur
+            y = self.cursor_y
+            chars = self.chars[y]
+            if x and not chars[x]:
+                chars[x - 1] = " "
+            chars[x:end] = text
+            if end < cols and not chars[end]:
+                chars[end] = " "
+            self.attrs[y][x:end] = [self.attr] * len(text)
+            self.cursor_x = end
+            self.dirty.add(y)
+            return
+        while text:
+            if self.cursor_x >= cols:
+                if not self.autowrap:
+                    # Sans retour à la ligne automatique seul le dernier caractère reste visible,
+                    # dans la dernière colonne (qui peut être la seconde moitié d'un caractère large)
+                    self.cursor_x = cols - 1
+                    self._draw_wide(text[-1])
+                    return
+                self.cursor_x = 0
+                self._linefeed()
+            x = self.cursor_x
+            y = self.cursor_y
+            part = text[:cols - x]
+            text = text[len(part):]
+            end = x + len(part)
+            chars = self.chars[y]
+            if x and not chars[x]:
+                chars[x - 1] = " "  # Caractère large coupé par la gauche
+            chars[x:end] = part
+            if end < cols and not chars[end]:
+                chars[end] = " "  # Caractère large coupé par la droite
+            self.attrs[y][x:end] = [self.attr] * len(part)
+            self.cursor_x = end
+            self.dirty.add(y)
+
+    def _draw_wide(self, text):
+        """Comme `_draw`, caractère par caractère, pour du texte qui peut contenir des caractères larges"""
+        cols = self.cols
+        attr = self.attr
+        x = self.cursor_x
+        y = self.cursor_y
+        chars = self.chars[y]
+        attrs = self.attrs[y]
+        self.dirty.add(y)
+        layout = _cells(text) if len(text) <= 256 else None
+        if layout is not None and x + len(layout[0]) <= cols:
+            # Chemin rapide : tout tient sur la ligne, on remplace les cellules d'un bloc comme `_draw`
+            cells, last = layout
+            end = x + len(cells)
+            if x and not chars[x]:
+                chars[x - 1] = " "
+            chars[x:end] = cells
+            if end < cols and not chars[end]:
+                chars[end] = " "
+            attrs[x:end] = [attr] * len(cells)
+            self.cursor_x = end
+            self._last_char = last
+            return
+        last = None
+        for ch in text:
+            width = char_width(ch) if ch > "\x7f" else 1
+            if width == 1:
+                pass
+            elif width == 0:
+                # Accent combinant : rejoint le caractère précédent
+                prev = (x if x < cols else cols) - 1
+                if prev >= 0:
+                    if not chars[prev] and prev > 0:
+                        prev -= 1  # Seconde moitié d'un caractère large
+                    chars[prev] += ch
+                continue
+            elif width > cols:
+                continue  # Écran d'une seule colonne : le caractère large ne tient pas
+            if x + width > cols:
+                if self.autowrap:
+                    self._linefeed()  # Peut faire défiler : on reprend la ligne du curseur
+                    x = 0
+                    y = self.cursor_y
+                    chars = self.chars[y]
+                    attrs = self.attrs[y]
+                    self.dirty.add(y)
+                else:
+                    x = cols - width
+            if x and not chars[x]:
+                chars[x - 1] = " "  # On écrase la seconde moitié d'un caractère large
+            chars[x] = ch
+            attrs[x] = attr
+            x += 1
+            if width == 2:
+                if x + 1 < cols and not chars[x + 1]:
+                    chars[x + 1] = " "  # Seconde moitié orpheline d'un ancien caractère large
+                chars[x] = ""
+                attrs[x] = attr
+                x += 1
+            elif x < cols and not chars[x]:
+                chars[x] = " "  # L'ancien caractère large est écrasé : sa seconde moitié devient un blanc
+            last = ch
+        self.cursor_x = x
+        if last is not None:
+            self._last_char = last
+
+    def _control(self, ch):
+        if ch == "\x1b":
+            self._state = ESCAPE
+        elif ch == "\r":
+            self.cursor_x = 0
+        elif ch in "\n\x0b\x0c":
+            self._linefeed()
+        elif ch == "\x08":
+            self.cursor_x = max(0, min(self.cursor_x, self.cols) - 1)
+        elif ch == "\t":
+            self.cursor_x = min(self.cols - 1, (self.cursor_x // 8 + 1) * 8)
+        # BEL, SO, SI et les autres contrôles sont ignorés
+
+    def _linefeed(self):
+        if self.cursor_y == self.scroll_bottom:
+            self.scroll_up(1, history=True)
+        elif self.cursor_y < self.rows - 1:
+            self.cursor_y += 1
+
+    def _reverse_index(self):
+        if self.cursor_y == self.scroll_top:
+            self.scroll_down(1)
+        elif self.cursor_y > 0:
+            self.cursor_y -= 1
+
+    # --- Défilement et effacement -----------------------------------------
+
+    def scroll_up(self, count, top=None, history=False):
+        """Décale la zone de défilement (à partir de `top`) de `count` lignes vers le haut
+
+        Seules les lignes qui sortent par un saut de ligne (`history`) vont dans
+        l'historique ; celles supprimées par DL ou SU sont perdues.
+        """
+        top = self.scroll_top if top is None else top
+        bottom = self.scroll_bottom
+        count = min(count, bottom - top + 1)
+        history = history and top == 0 and self.alternate is None and self.scrollback is not None
+        for _ in range(count):
+            chars = self.chars.pop(top)
+            self.attrs.pop(top)
+            if history:
+                self.scrollback.append("".join(chars).rstrip())
+            self.chars.insert(bottom, self._blank_chars())
+            self.attrs.insert(bottom, self._blank_attrs())
+        self.dirty.update(range(top, bottom + 1))
+
+    def scroll_down(self, count, top=None):
+        top = self.scroll_top if top is None else top
+        bottom = self.scroll_bottom
+        count = min(count, bottom - top + 1)
+        for _ in range(count):
+            self.chars.pop(bottom)
+            self.attrs.pop(bottom)
+            self.chars.insert(top, self._blank_chars())
+            self.attrs.insert(top, self._blank_attrs())
+        self.dirty.update(range(top, bottom + 1))
+
+    def _erase(self, y, start, end):
+        end = min(end, self.cols)
+        if start >= end:
+            return
+        self.chars[y][start:end] = " " * (end - start)
+        self.attrs[y][start:end] = [self.attr & BG_MASK] * (end - start)
+        self.dirty.add(y)
+
+    def _erase_display(self, mode):
+        x = min(self.cursor_x, self.cols - 1)
+        if mode == 0:
+            self._erase(self.cursor_y, x, self.cols)
+            for y in range(self.cursor_y + 1, self.rows):
+                self._erase(y, 0, self.cols)
+        elif mode == 1:
+            for y in range(self.cursor_y):
+                self._erase(y, 0, self.cols)
+            self._erase(self.cursor_y, 0, x + 1)
+        elif mode in (2, 3):
+            for y in range(self.rows):
+                self._erase(y, 0, self.cols)
+
+    def _erase_line(self, mode):
+        x = min(self.cursor_x, self.cols - 1)
+        if mode == 0:
+            self._erase(self.cursor_y, x, self.cols)
+        elif mode == 1:
+            self._erase(self.cursor_y, 0, x + 1)
+        elif mode == 2:
+            self._erase(self.cursor_y, 0, self.cols)
+
+    def _insert_chars(self, count):
+        y, x = self.cursor_y, min(self.cursor_x, self.cols - 1)
+        count = min(count, self.cols - x)
+        self.chars[y][x:x] = [" "] * count
+        self.attrs[y][x:x] = [self.attr & BG_MASK] * count
+        del self.chars[y][self.cols:]
+        del self.attrs[y][self.cols:]
+        self.dirty.add(y)
+
+    def _delete_chars(self, count):
+        y, x = self.cursor_y, min(self.cursor_x, self.cols - 1)
+        count = min(count, self.cols - x)
+        del self.chars[y][x:x + count]
+        del self.attrs[y][x:x + count]
+        self.chars[y].extend([" "] * count)
+        self.attrs[y].extend([self.attr & BG_MASK] * count)
+        self.dirty.add(y)
+
+    # --- Séquences d'échappement ------------------------------------------
+
+    def _escape(self, ch):
+        self._state = GROUND
+        if ch == "[":
+            self._state = CSI
+            self._params = ""
+        elif ch == "]":
+            self._state = OSC
+            self._osc = ""
+        elif ch in "()*+":
+            self._state = CHARSET
+        elif ch == "7":
+            self._saved_cursor = (self.cursor_y, self.cursor_x, self.attr)
+        elif ch == "8":
+            self.cursor_y, self.cursor_x, self.attr = self._saved_cursor
+        elif ch == "D":
+            self._linefeed()
+        elif ch == "E":
+            self.cursor_x = 0
+            self._linefeed()
+        elif ch == "M":
+            self._reverse_index()
+        elif ch == "c":
+            self.reset()
+        elif ch == "\x1b":
+            self._state = ESCAPE
+        # '=', '>' (pavé numérique) et les autres séquences sont ignorées
+
+    def _csi(self, params, final):
+        if final == "m":
+            # Chemin rapide : les mêmes couples (attribut, SGR) reviennent sans cesse (ls, grep --color...)
+            key = (self.attr, params)
+            attr = _sgr_cache.get(key)
+            if attr is None:
+                if params[:1] in ("?", ">", "=", "<"):
+                    return
+                self._sgr([int(p) if p.isdigit() else 0 for p in params.replace(":", ";").split(";")] if params else [])
+                if len(_sgr_cache) < 4096:
+                    _sgr_cache[key] = self.attr
+            else:
+                self.attr = attr
+            return
+        private = ""
+        if params and params[0] in "?>=<":
+            private, params = params[0], params[1:]
+        params = params.rstrip(" !\"#$%&'()*+,-./")  # Octets intermédiaires ignorés
+        args = []
+        for p in params.split(";") if params else ():
+            p = p.split(":")[0]
+            args.append(int(p) if p.isdigit() else 0)
+        first = args[0] if args else 0
+        count = first or 1  # Les compteurs valent 1 par défaut (ou si 0)
+
+        if final in "HfABCDEFGd":
+            self._move(final, args, count)
+        elif final == "J":
+            self._erase_display(first)
+        elif final == "K":
+            self._erase_line(first)
+        elif final == "L":
+            if self.scroll_top <= self.cursor_y <= self.scroll_bottom:
+                self.scroll_down(count, top=self.cursor_y)
+        elif final == "M":
+            if self.scroll_top <= self.cursor_y <= self.scroll_bottom:
+                self.scroll_up(count, top=self.cursor_y)
+        elif final == "@":
+            self._insert_chars(count)
+        elif final == "P":
+            self._delete_chars(count)
+        elif final == "b" and self._last_char:
+            # REP : répète le dernier caractère affiché (au plus un écran : le compte vient du PTY)
+            self._draw(self._last_char * min(count, self.rows * self.cols))
+        elif final == "X":
+            x = min(self.cursor_x, self.cols - 1)
+            self._erase(self.cursor_y, x, x + count)
+        elif final == "S":
+            self.scroll_up(count)
+        elif final == "T" and not private:
+            self.scroll_down(count)
+        elif final == "r":
+            top = (args[0] if args and args[0] else 1) - 1
+            bottom = (args[1] if len(args) > 1 and args[1] else self.rows) - 1
+            if 0 <= top < bottom < self.rows:
+                self.scroll_top, self.scroll_bottom = top, bottom
+                self.cursor_y, self.cursor_x = 0, 0
+        elif final == "s" and not private:
+            self._saved_cursor = (self.cursor_y, self.cursor_x, self.attr)
+        elif final == "u" and not private:
+            self.cursor_y, self.cursor_x, self.attr = self._saved_cursor
+        elif final in "hl":
+            self._set_modes(private, args, final == "h")
+        elif final == "n" and first == 6:
+            self.replies.append(f"\x1b[{self.cursor_y + 1};{min(self.cursor_x, self.cols - 1) + 1}R")
+        elif final == "n" and first == 5:
+            self.replies.append("\x1b[0n")
+        elif final == "c" and not private and first == 0:
+            self.replies.append("\x1b[?1;2c")  # VT100 avec options avancées
+
+    def _move(self, final, args, count):
+        if final in "Hf":
+            row = (args[0] if args and args[0] else 1) - 1
+            col = (args[1] if len(args) > 1 and args[1] else 1) - 1
+            self.cursor_y, self.cursor_x = row, col
+        elif final == "A":
+            self.cursor_y -= count
+            if self.cursor_y < self.scroll_top <= self.cursor_y + count:
+                self.cursor_y = self.scroll_top
+        elif final == "B":
+            self.cursor_y += count
+            if self.cursor_y > self.scroll_bottom >= self.cursor_y - count:
+                self.cursor_y = self.scroll_bottom
+        elif final == "C":
+            self.cursor_x = min(self.cursor_x, self.cols - 1) + count
+        elif final == "D":
+            self.cursor_x = min(self.cursor_x, self.cols - 1) - count
+        elif final == "E":
+            self.cursor_y += count
+            self.cursor_x = 0
+        elif final == "F":
+            self.cursor_y -= count
+            self.cursor_x = 0
+        elif final == "G":
+            self.cursor_x = count - 1
+        elif final == "d":
+            self.cursor_y = count - 1
+        self.cursor_y = max(0, min(self.cursor_y, self.rows - 1))
+        self.cursor_x = max(0, min(self.cursor_x, self.cols - 1))
+
+    def _set_modes(self, private, args, enable):
+        for mode in args:
+            if private == "?":
+                if mode == 1:
+                    self.app_cursor = enable
+                elif mode == 7:
+                    self.autowrap = enable
+                elif mode == 25:
+                    self.cursor_visible = enable
+                elif mode in (47, 1047, 1049):
+                    self._switch_alternate(enable, save_cursor=(mode == 1049))
+            # Les modes ANSI (IRM, LNM...) ne sont pas gérés
+
+    def _switch_alternate(self, enable, save_cursor):
+        if enable and self.alternate is None:
+            if save_cursor:
+                self._saved_cursor = (self.cursor_y, self.cursor_x, self.attr)
+            self.alternate = (self.chars, self.attrs, self.scroll_top, self.scroll_bottom)
+            self.chars = [self._blank_chars() for _ in range(self.rows)]
+            self.attrs = [self._blank_attrs() for _ in range(self.rows)]
+            self.touch()
+        elif not enable and self.alternate is not None:
+            self.chars, self.attrs, self.scroll_top, self.scroll_bottom = self.alternate
+            self.alternate = None
+            if save_cursor:
+                self.cursor_y, self.cursor_x, self.attr = self._saved_cursor
+            self.touch()
+
+    def _sgr(self, args):
+        if not args:
+            args = [0]
+        attr = self.attr
+        i = 0
+        while i < len(args):
+            a = args[i]
+            if a == 0:
+                attr = DEFAULT_ATTR
+            elif a in _SGR_FLAGS:
+                attr |= _SGR_FLAGS[a]
+            elif a in _SGR_RESET_FLAGS:
+                attr &= ~_SGR_RESET_FLAGS[a]
+            elif 30 <= a <= 37 or 90 <= a <= 97:
+                attr = (attr & ~FG_MASK) | (a - 30 if a < 90 else a - 82) + 1
+            elif 40 <= a <= 47 or 100 <= a <= 107:
+                attr = (attr & ~BG_MASK) | ((a - 40 if a < 100 else a - 92) + 1) << BG_SHIFT
+            elif a == 39:
+                attr &= ~FG_MASK
+            elif a == 49:
+                attr &= ~BG_MASK
+            elif a in (38, 48) and i + 1 < len(args):
+                color = None
+                if args[i + 1] == 5 and i + 2 < len(args):
+                    color = args[i + 2] & 0xFF
+                    i += 2
+                elif args[i + 1] == 2 and i + 4 < len(args):
+                    color = rgb_to_256(*args[i + 2:i + 5])
+                    i += 4
+                if color is not None:
+                    if a == 38:
+                        attr = (attr & ~FG_MASK) | (color + 1)
+                    else:
+                        attr = (attr & ~BG_MASK) | (color + 1) << BG_SHIFT
+            i += 1
+        self.attr = attr
+
+    def _osc_dispatch(self, text):
+        code, _, value = text.partition(";")
+        if code in ("0", "2"):
+            self.title = value
+        elif self.on_osc is not None:
+            self.on_osc(code, value)
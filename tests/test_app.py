@@ -0,0 +1,38 @@
+"""Interface : l'import ne charge que ce qu'il faut pour la première image, sections d'E/S"""
+import subprocess
+import sys
+
+from temporalis import app
+from temporalis.iostats import IORate, IOSnapshot
+
+LAZY = ("psutil", "tempfile", "temporalis.session", "temporalis.shellhook", "temporalis.dirwatch",
+        "temporalis.iostats", "temporalis.search", "temporalis.recording", "temporalis.collector")
+
+
+def test_import_leaves_heavy_modules_to_their_users():
+    code = f"import sys, temporalis.app; print(','.join(m for m in {LAZY!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+class FakeSection:
+    def __init__(self, height, width=40):
+        self.height, self.width = height, width
+        self.title, self.lines = "", []
+
+    def set_title(self, title):
+        self.title = title
+
+    def update(self, lines):
+        self.lines = lines
+
+
+def test_io_section_shows_one_row_of_each_family_at_minimum_height():
+    rows = lambda *names: tuple(IORate(name, 1, 1024.0, 0.0, 1.0, [1.0]) for name in names)
+    snapshot = IOSnapshot(0.0, rows("sda", "sdb"), rows("eth0", "wlan0"), 1.0)
+    section = FakeSection(app.IO_MIN_HEIGHT - 2)
+    app.display_io(section, snapshot)
+    assert [line.split()[0] for line in section.lines] == ["DISK", "sda", "NIC", "eth0"]
+    small = FakeSection(app.IO_MIN_HEIGHT - 3)
+    app.display_io(small, snapshot)
+    assert small.lines[0].startswith("Needs") and len(small.lines) == 1
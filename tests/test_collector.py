@@ -0,0 +1,103 @@
+"""Collecteur partagé : différences de la table des processus, sources distantes et vérification du pair"""
+import os
+import socket
+
+import pytest
+
+from temporalis import collector
+from temporalis.collector import (CollectorClient, RemoteProcessSource, RemoteSystemSource, apply_processes, connect,
+                                  encode_processes, encode_system)
+from temporalis.metrics import MetricsSampler
+from temporalis.procs import ProcessMonitor, ProcessRow
+
+
+def row(pid, cpu=1.5, started=100.0, name=None, cmdline=""):
+    return ProcessRow(pid, 1, name or f"p{pid}", "user", cmdline, cpu, pid * 4096, started)
+
+
+def send(previous, table, rows, reset=False):
+    """Encode comme le collecteur et applique comme le client (sans l'en-tête)"""
+    message = encode_processes(previous, rows, reset)
+    apply_processes(table, message[collector.HEADER.size:])
+    return message
+
+
+def test_processes_round_trip():
+    previous, table = {}, {}
+    rows = [row(1), row(2, cmdline="sleep 10"), row(3)]
+    send(previous, table, rows, reset=True)
+    assert table == {r.pid: r for r in rows}
+
+    # 1 disparaît, 2 change de CPU, 3 est réutilisé par un autre programme du même nom
+    rows = [row(2, cpu=50.0, cmdline="sleep 10"), row(3, started=200.0, cmdline="new"), row(4)]
+    message = send(previous, table, rows)
+    assert table == {r.pid: r for r in rows}
+    assert b"sleep 10" not in message  # Ligne modifiée : seuls les champs dynamiques passent
+    assert b"new" in message
+
+
+def test_unchanged_table_sends_an_empty_difference():
+    previous, table = {}, {}
+    rows = [row(1), row(2)]
+    send(previous, table, rows, reset=True)
+    assert len(send(previous, table, rows)) == collector.HEADER.size + 1 + 3 * collector.COUNT.size
+
+
+class FakeClient:
+    connected = True
+    system = None
+    rows = None
+
+
+def test_no_sample_before_the_first_message():
+    client = FakeClient()
+    sampler = MetricsSampler(source=RemoteSystemSource(client))
+    monitor = ProcessMonitor(source=RemoteProcessSource(client))
+    sampler.sample()
+    monitor.sample()
+    assert sampler.snapshot is None and len(sampler.cpu) == 0
+    assert monitor.generation == 0
+
+    message = encode_system(0.0, [10.0, 30.0], 40.0, 5.0)
+    client.system = collector.decode_system(message[collector.HEADER.size:])
+    client.rows = (row(1),)
+    sampler.sample()
+    monitor.sample()
+    assert list(sampler.snapshot.cpu) == [20.0] and sampler.snapshot.ram[-1] == 40.0
+    assert monitor.snapshot == (row(1),) and monitor.generation == 1
+
+
+def listening(path):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen(1)
+    return server
+
+
+def test_collector_of_another_user_is_ignored(tmp_path, monkeypatch):
+    path = tmp_path / "collector.sock"
+    server = listening(path)
+    try:
+        monkeypatch.setattr(collector, "_peer_uid", lambda sock: os.getuid() + 1)
+        assert connect(str(path)) is None
+        monkeypatch.setattr(collector, "_peer_uid", lambda sock: os.getuid())
+        client = connect(str(path))
+        assert isinstance(client, CollectorClient)
+        client.sock.shutdown(socket.SHUT_RDWR)
+        client.join(5)
+        assert not client.connected
+    finally:
+        server.close()
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_PEERCRED"), reason="SO_PEERCRED : Linux seulement")
+def test_peer_uid_is_read_from_the_socket(tmp_path):
+    path = tmp_path / "collector.sock"
+    server = listening(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+        assert collector._peer_uid(sock) == os.getuid()
+    finally:
+        sock.close()
+        server.close()
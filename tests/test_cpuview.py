@@ -0,0 +1,35 @@
+"""Partie CPU de System Info : barres ou grille selon la place, groupes et cœurs les plus chargés"""
+from temporalis import cpuview
+from temporalis.cpuview import cpu_lines, heatmap_lines, parse_cpulist
+
+
+def test_parse_cpulist():
+    assert parse_cpulist("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert parse_cpulist("") == []
+
+
+def test_one_bar_per_core_when_they_fit():
+    lines = cpu_lines([5.0, 55.0], height=4, width=40)
+    assert lines == ["CPU 1: 5.0% | " + " " * 10, "CPU 2: 55.0% | " + "█" * 5 + " " * 5]
+
+
+def test_heatmap_when_cores_do_not_fit(monkeypatch):
+    monkeypatch.setattr(cpuview, "cpu_groups", lambda: [("node0", [0, 1]), ("node1", [2, 3])])
+    percpu = [0.0, 100.0, 50.0, 50.0]
+    assert cpu_lines(percpu, height=4, width=20, mode="heatmap") == \
+        ["1 ·█▒▒", "node0:  50.0% ▒▒▒▒▒", "node1:  50.0% ▒▒▒▒▒", "Top: 2:100% 3:50%"]
+    # Trop court pour les moyennes : grille et classement seulement
+    assert cpu_lines(percpu, height=3, width=20) == ["1 ·█▒▒", "Top: 2:100% 3:50%"]
+
+
+def test_heatmap_wraps_rows_and_gives_up_group_averages_first():
+    percpu = [float(i) for i in range(12)]
+    lines = heatmap_lines(percpu, height=3, width=7, groups=[("node0", range(6)), ("node1", range(6, 12))])
+    assert lines[:2] == [" 1 ····", " 5 ····"]
+    assert lines[2].startswith("Top:")
+    assert len(lines) == 3
+
+
+def test_top_cores_fit_the_width():
+    lines = heatmap_lines([90.0, 80.0, 70.0, 60.0], height=5, width=12)
+    assert lines[-1] == "Top: 1:90%"
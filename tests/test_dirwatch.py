@@ -0,0 +1,157 @@
+"""Cache des répertoires : relecture après changement, inotify ou date de modification, listage en arrière-plan"""
+import os
+import sys
+
+import pytest
+
+from temporalis import dirwatch
+from temporalis.dirwatch import DirectoryCache
+from temporalis.filebrowser import load_listing
+
+inotify_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify : Linux seulement")
+
+
+class CountingLoader:
+    def __init__(self, loader=os.listdir):
+        self.loader = loader
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return self.loader(path)
+
+
+class ManualPool:
+    """Garde les tâches soumises ; le test les exécute quand il veut"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, token, job, *args):
+        self.jobs.append((job, args))
+
+    def run(self):
+        jobs, self.jobs = self.jobs, []
+        for job, args in jobs:
+            job(*args)
+
+
+@pytest.fixture
+def old_mtimes(monkeypatch):
+    """Dates de modification jugées fiables tout de suite (pas d'attente d'une seconde)"""
+    monkeypatch.setattr(dirwatch, "_MTIME_SLACK_NS", -10 ** 18)
+
+
+def touch_dir(path, delta):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + delta))
+
+
+def test_mtime_fallback_rescans_only_after_a_change(tmp_path, old_mtimes):
+    loader = CountingLoader()
+    cache = DirectoryCache(use_inotify=False, loader=loader)
+    (tmp_path / "a").touch()
+    assert cache.listing(str(tmp_path)) == ["a"]
+    assert cache.listing(str(tmp_path)) == ["a"]
+    assert loader.calls == 1
+    (tmp_path / "b").touch()
+    touch_dir(tmp_path, 10 ** 9)
+    assert sorted(cache.listing(str(tmp_path))) == ["a", "b"]
+    assert loader.calls == 2
+
+
+def test_least_recently_used_directory_is_evicted(tmp_path, old_mtimes):
+    paths = [tmp_path / name for name in "abc"]
+    for path in paths:
+        path.mkdir()
+    loader = CountingLoader()
+    cache = DirectoryCache(capacity=2, use_inotify=False, loader=loader)
+    for path in paths[:2] + paths[:1] + paths[2:]:
+        cache.listing(str(path))
+    assert list(cache._entries) == [str(paths[0]), str(paths[2])]
+
+
+def test_missing_directory_raises(tmp_path):
+    cache = DirectoryCache(use_inotify=False)
+    with pytest.raises(OSError):
+        cache.listing(str(tmp_path / "missing"))
+    assert not cache._entries
+
+
+@inotify_only
+def test_inotify_events_mark_the_listing_stale(tmp_path):
+    loader = CountingLoader()
+    cache = DirectoryCache(loader=loader)
+    if cache.fd is None:
+        pytest.skip("inotify indisponible")
+    try:
+        path = str(tmp_path)
+        assert cache.listing(path) == []
+        (tmp_path / "new").touch()
+        assert cache.handle_events() == {path}
+        assert cache.listing(path) == ["new"]
+        assert cache.listing(path) == ["new"]
+        assert loader.calls == 2
+    finally:
+        cache.close()
+
+
+@inotify_only
+def test_content_events_with_a_plain_name_list(tmp_path):
+    (tmp_path / "file").touch()
+    loader = CountingLoader()
+    cache = DirectoryCache(loader=loader, watch_content=True)  # os.listdir : pas d'attributs à oublier
+    if cache.fd is None:
+        pytest.skip("inotify indisponible")
+    try:
+        cache.listing(str(tmp_path))
+        (tmp_path / "file").write_text("x")
+        assert cache.handle_events() == {str(tmp_path)}
+        assert cache.listing(str(tmp_path)) == ["file"]
+        assert loader.calls == 1  # La liste des noms n'a pas changé
+    finally:
+        cache.close()
+
+
+@inotify_only
+def test_content_events_forget_file_attributes(tmp_path):
+    (tmp_path / "file").touch()
+    cache = DirectoryCache(loader=load_listing, watch_content=True)
+    if cache.fd is None:
+        pytest.skip("inotify indisponible")
+    try:
+        listing = cache.listing(str(tmp_path))
+        listing.stats[0] = (0, 0.0)
+        (tmp_path / "file").write_text("x")
+        cache.handle_events()
+        assert cache.listing(str(tmp_path)) is listing and listing.stats == {}
+    finally:
+        cache.close()
+
+
+def test_background_scan_keeps_the_previous_listing(tmp_path, old_mtimes):
+    pool = ManualPool()
+    cache = DirectoryCache(use_inotify=False, submit=pool.submit)
+    path = str(tmp_path)
+    assert cache.listing(path) is None  # Rien à montrer avant le premier listage
+    assert cache.listing(path) is None and len(pool.jobs) == 1  # Un seul listage en cours
+    pool.run()
+    assert cache.listing(path) == []
+
+    (tmp_path / "a").touch()
+    touch_dir(tmp_path, 10 ** 9)
+    assert cache.listing(path) == []  # Liste périmée en attendant
+    pool.run()
+    assert cache.listing(path) == ["a"]
+    assert not pool.jobs
+
+
+def test_background_scan_error_is_raised_on_the_next_call(tmp_path):
+    pool = ManualPool()
+    cache = DirectoryCache(use_inotify=False, submit=pool.submit)
+    path = str(tmp_path / "missing")
+    assert cache.listing(path) is None
+    pool.run()
+    with pytest.raises(OSError):
+        cache.listing(path)
+    assert not cache._entries and not cache._scanning
@@ -0,0 +1,85 @@
+"""Navigateur de fichiers : ordres de tri, lignes visibles et stat différés"""
+import os
+
+from temporalis.filebrowser import FileBrowser, compute_order, load_listing
+
+
+def make_tree(path):
+    (path / "b.txt").write_bytes(b"x" * 30)
+    (path / "a.txt").write_bytes(b"x" * 10)
+    (path / "c").mkdir()
+    os.utime(path / "a.txt", (1000, 3000))
+    os.utime(path / "b.txt", (1000, 2000))
+    os.utime(path / "c", (1000, 1000))
+    return load_listing(str(path))
+
+
+def run_jobs(browser):
+    """Exécute les tâches en attente comme le ferait le pool (dernière demande d'abord)"""
+    while not browser._jobs.empty():
+        browser._run(*browser._jobs.get_nowait())
+
+
+def names(listing, order):
+    return [listing.names[i] for i in order]
+
+
+def test_compute_order(tmp_path):
+    listing = make_tree(tmp_path)
+    assert listing.kinds[listing.names.index("c")] == "d"
+    assert names(listing, compute_order(listing, "name")) == ["a.txt", "b.txt", "c"]
+    assert names(listing, compute_order(listing, "type")) == ["c", "a.txt", "b.txt"]
+    assert names(listing, compute_order(listing, "mtime")) == ["a.txt", "b.txt", "c"]
+    assert [n for n in names(listing, compute_order(listing, "size")) if n != "c"] == ["b.txt", "a.txt"]
+
+
+def test_rows_before_and_after_stat(tmp_path):
+    listing = make_tree(tmp_path)
+    browser = FileBrowser(workers=0)
+    assert browser.rows(listing, "name", count=2) == [("a.txt", "-", None, None), ("b.txt", "-", None, None)]
+    run_jobs(browser)
+    assert browser.rows(listing, "name", count=2) == [("a.txt", "-", 10, 3000.0), ("b.txt", "-", 30, 2000.0)]
+    assert browser.rows(listing, "name", reverse=True, count=1, with_stats=False)[0][0] == "c"
+
+
+def test_large_sorts_run_in_the_pool(tmp_path):
+    listing = make_tree(tmp_path)
+    ready = []
+    browser = FileBrowser(workers=0, on_ready=lambda: ready.append(1))
+    assert browser.order(listing, "size") is None
+    assert browser.order(listing, "size") is None and browser._jobs.qsize() == 1
+    run_jobs(browser)
+    assert sorted(browser.order(listing, "size")) == [0, 1, 2]
+    assert ready == [1]
+
+
+def test_stat_requests_of_a_left_view_are_dropped(tmp_path):
+    for i in range(10):
+        (tmp_path / f"{i}").touch()
+    listing = load_listing(str(tmp_path))
+    browser = FileBrowser(workers=0)
+    browser.rows(listing, "name", start=0, count=3)
+    browser.rows(listing, "name", start=5, count=3)  # Défilement avant le passage du pool
+    run_jobs(browser)
+    assert sorted(listing.stats) == sorted(compute_order(listing, "name")[5:8])
+    assert not browser._pending
+
+
+def test_rows_still_visible_are_requested_again(tmp_path):
+    for i in range(4):
+        (tmp_path / f"{i}").touch()
+    listing = load_listing(str(tmp_path))
+    browser = FileBrowser(workers=0)
+    browser.rows(listing, "name", start=0, count=2)
+    browser.rows(listing, "name", start=1, count=2)  # La ligne 1 reste visible
+    run_jobs(browser)
+    assert sorted(listing.stats) == sorted(compute_order(listing, "name")[1:3])
+
+
+def test_untagged_jobs_are_never_dropped():
+    done = []
+    browser = FileBrowser(workers=0)
+    browser.submit("scan", done.append, "x")
+    browser.generation += 5
+    run_jobs(browser)
+    assert done == ["x"]
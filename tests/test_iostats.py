@@ -0,0 +1,59 @@
+"""Débits d'E/S : différences regroupées par ligne, compteurs qui reculent et lignes les plus chargées"""
+from temporalis.iostats import IORate, _Rates, group_name, top
+
+
+def classify(name):
+    """sda* : disque physique, veth/loop : virtuels, le reste ignoré (partitions)"""
+    if name.startswith(("veth", "loop")):
+        return True
+    return False if name in ("sda", "sdb") else None
+
+
+def by_name(rows):
+    return {row.name: row for row in rows}
+
+
+def test_group_name():
+    assert group_name("sda", False) == "sda"
+    assert group_name("veth3f2a1b0", True) == "veth*"
+    assert group_name("wg0", True) == "wg*"
+
+
+def test_first_reading_is_only_a_reference():
+    rates = _Rates(classify)
+    assert rates.update({"sda": (100, 0, 1)}, None) == ()
+
+
+def test_rates_are_grouped_and_partitions_skipped():
+    rates = _Rates(classify, skip=("lo",))
+    rates.update({"sda": (0, 0, 0), "sda1": (0, 0, 0), "veth1": (0, 0, 0), "lo": (0, 0, 0)}, None)
+    rows = by_name(rates.update({"sda": (2000, 1000, 30), "sda1": (2000, 1000, 30), "veth1": (100, 100, 2),
+                                 "veth2": (500, 0, 5), "lo": (9999, 9999, 9)}, 2.0))
+    assert set(rows) == {"sda", "veth*"}
+    assert (rows["sda"].read, rows["sda"].write, rows["sda"].ops, rows["sda"].count) == (1000.0, 500.0, 15.0, 1)
+    # veth2 vient d'apparaître : compté dans le groupe, sans débit avant son deuxième relevé
+    assert (rows["veth*"].read, rows["veth*"].count) == (50.0, 2)
+    assert list(rows["sda"].history) == [1500.0]
+
+
+def test_counter_going_back_counts_as_zero():
+    rates = _Rates(classify)
+    rates.update({"sda": (5000, 5000, 50)}, None)
+    (row,) = rates.update({"sda": (10, 6000, 40)}, 1.0)
+    assert (row.read, row.write, row.ops) == (0.0, 1000.0, 0.0)
+
+
+def test_history_of_a_vanished_row_is_dropped():
+    rates = _Rates(classify)
+    rates.update({"sda": (0, 0, 0), "sdb": (0, 0, 0)}, None)
+    rates.update({"sda": (10, 0, 1), "sdb": (10, 0, 1)}, 1.0)
+    rates.update({"sda": (20, 0, 2)}, 1.0)
+    assert set(rates._history) == {"sda"}
+    assert list(rates.update({"sda": (30, 0, 3)}, 1.0)[0].history) == [10.0, 10.0, 10.0]
+
+
+def test_top_keeps_the_busiest_rows():
+    rows = [IORate(name, 1, read, write, ops, ()) for name, read, write, ops in
+            (("a", 10, 0, 1), ("b", 0, 50, 1), ("c", 30, 20, 9), ("d", 30, 20, 2))]
+    assert [row.name for row in top(rows, 3)] == ["c", "d", "b"]
+    assert top(rows, 0) == [] and len(top(rows, 10)) == 4
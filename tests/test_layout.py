@@ -0,0 +1,42 @@
+"""Géométrie des sections : l'écran est couvert sans chevauchement, quelle que soit sa taille"""
+import pytest
+
+from temporalis.layout import IO_MIN_HEIGHT, MIN_HEIGHT, MIN_WIDTH, compute_layout
+
+
+def cells(layout):
+    """Cellule -> section qui l'occupe ; échoue si deux sections se chevauchent"""
+    owner = {}
+    for name, (height, width, y, x) in layout.items():
+        for row in range(y, y + height):
+            for col in range(x, x + width):
+                assert (row, col) not in owner, (name, owner.get((row, col)))
+                owner[row, col] = name
+    return owner
+
+
+@pytest.mark.parametrize("size", [(24, 80), (40, 150), (61, 203), (100, 37)])
+def test_sections_tile_the_screen(size):
+    height, width = size
+    owner = cells(compute_layout(height, width))
+    assert set(owner) == {(row, col) for row in range(height) for col in range(width)}
+
+
+def test_terminal_keeps_the_right_half():
+    layout = compute_layout(40, 160)
+    assert layout["output"] == (37, 80, 0, 80)
+    assert layout["input"] == (3, 80, 37, 80)
+    assert layout["system_info"][:2] == layout["files"][:2] == (20, 40)
+
+
+def test_io_gets_its_minimum_height_on_80x24():
+    layout = compute_layout(24, 80)
+    datetime, io, info = layout["datetime"], layout["io"], layout["info"]
+    assert io[0] == IO_MIN_HEIGHT and info[0] >= MIN_HEIGHT
+    assert datetime[2] + datetime[0] == io[2] and io[2] + io[0] == info[2] and info[2] + info[0] == 24
+    assert compute_layout(61, 203)["io"][0] > IO_MIN_HEIGHT  # Grand écran : la moitié du bas, comme avant
+
+
+def test_tiny_terminal_never_gives_empty_windows():
+    for height, width, _, _ in compute_layout(4, 6).values():
+        assert height >= MIN_HEIGHT and width >= MIN_WIDTH
@@ -0,0 +1,53 @@
+"""Mesures système : historique circulaire, relevés publiés et sparklines"""
+from temporalis.metrics import History, MetricsSampler, sparkline
+
+
+class FakeSource:
+    name = "fake"
+
+    def __init__(self, readings):
+        self.readings = iter(readings)
+
+    def read(self):
+        return next(self.readings)
+
+
+def test_history_keeps_the_most_recent_values():
+    history = History(3)
+    assert history.last() == 0.0 and not len(history)
+    for value in range(5):
+        history.append(value)
+    assert list(history.ordered()) == [2.0, 3.0, 4.0]
+    assert history.last() == 4.0 and len(history) == 3
+
+
+def test_history_before_it_is_full():
+    history = History(4)
+    history.append(1.5)
+    history.append(2.5)
+    assert list(history.ordered()) == [1.5, 2.5]
+
+
+def test_sampler_publishes_a_snapshot_per_reading():
+    sampler = MetricsSampler(interval=1.0, history_seconds=2,
+                             source=FakeSource([([10.0, 30.0], 50.0, 5.0), ([0.0, 100.0], 60.0, 6.0),
+                                                ([20.0, 20.0], 70.0, 7.0)]))
+    assert sampler.snapshot is None
+    sampler.sample()
+    first = sampler.snapshot
+    assert list(first.percpu) == [10.0, 30.0]
+    assert list(first.cpu) == [20.0]
+    sampler.sample()
+    sampler.sample()
+    snapshot = sampler.snapshot
+    assert list(snapshot.cpu) == [50.0, 20.0]  # Capacité : 2 s d'historique à 1 s
+    assert list(snapshot.ram) == [60.0, 70.0]
+    assert list(snapshot.swap) == [6.0, 7.0]
+    assert list(first.cpu) == [20.0]  # Un relevé publié n'est plus modifié
+
+
+def test_sparkline_keeps_peaks_when_shrinking():
+    assert sparkline([0, 100], 2) == "▁█"
+    assert sparkline([0, 0, 100, 0], 2) == "▁█"
+    assert sparkline([], 5) == ""
+    assert len(sparkline([50] * 3, 10)) == 3
@@ -0,0 +1,71 @@
+"""Instrumentation : inactive par défaut, résumé par seconde, journal JSONL"""
+import json
+
+from temporalis import perf
+from temporalis.perf import Profiler, percentile, process_syscalls, summarize
+
+
+def test_percentile_and_summary():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([1, 2, 3, 4], 0.5) == 3
+    assert percentile([1, 2, 3, 4], 0.99) == 4
+    assert summarize([0.002, 0.001, 0.004]) == {"count": 3, "p50_ms": 2.0, "p99_ms": 4.0, "max_ms": 4.0}
+    assert summarize([])["max_ms"] == 0.0
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    double = profiler.timed(lambda x: 2 * x, "double")
+    assert double(4) == 8
+    profiler.tick()
+    assert profiler.report is None and not profiler._durations
+    assert profiler.lines(5, 40) == ["Measuring..."]
+
+
+def test_tick_summarizes_the_window(monkeypatch):
+    monkeypatch.setattr(perf, "process_syscalls", lambda: None)
+    profiler = Profiler()
+    profiler.enable()
+
+    @profiler.timed
+    def draw():
+        return "ok"
+
+    assert draw() == "ok" and draw.__name__ == "draw"
+    for _ in range(3):
+        profiler.record("loop", 0.001)
+    profiler.record("frame", 0.004)
+    profiler.count("pty_bytes", 2048)
+    profiler.tick()
+
+    report = profiler.report
+    assert report["loop"]["count"] == 3 and report["frame"]["p50_ms"] == 4.0
+    assert report["phases"]["draw"]["count"] == 1
+    assert "loop" not in report["phases"] and "read" not in report["rates"]
+    assert report["rates"]["pty_bytes"] > 0 and report["rates"]["select"] > 0
+    lines = profiler.lines(5, 40)
+    assert lines[0].startswith("Frame 4.0/4.0ms") and lines[3].endswith("r ? w ?")
+    assert lines[4].startswith("draw ") and len(lines) == 5
+    assert not profiler._durations  # Nouvelle fenêtre
+
+
+def test_log_keeps_measuring_until_closed(tmp_path, monkeypatch):
+    monkeypatch.setattr(perf, "process_syscalls", lambda: (10, 5))
+    log = tmp_path / "perf.jsonl"
+    profiler = Profiler()
+    profiler.enable(str(log))
+    profiler.disable()  # Ignoré : les mesures vont dans le fichier
+    assert profiler.enabled
+    profiler.tick()
+    profiler.tick()
+    profiler.close()
+    reports = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(reports) == 2 and reports[0]["rates"]["read"] == 0.0
+    assert not profiler.enabled
+
+
+def test_process_syscalls(tmp_path):
+    io = tmp_path / "io"
+    io.write_text("rchar: 1\nsyscr: 12\nsyscw: 7\n")
+    assert process_syscalls(str(io)) == (12, 7)
+    assert process_syscalls(str(tmp_path / "missing")) is None
@@ -0,0 +1,85 @@
+"""Lecture directe de /proc sur une arborescence factice : CPU, mémoire et processus"""
+import os
+
+import pytest
+
+from temporalis import procfs
+from temporalis.procfs import ProcfsProcessSource, ProcfsSystemSource, _Reader
+
+MEMINFO = """MemTotal:       1000 kB
+MemFree:         100 kB
+MemAvailable:    250 kB
+SwapTotal:       400 kB
+SwapFree:        300 kB
+"""
+
+
+def cpu_stat(*cores):
+    """Contenu de /proc/stat : (user, idle) par cœur"""
+    lines = ["cpu  0 0 0 0 0 0 0 0 0 0"]
+    lines += [f"cpu{i} {user} 0 0 {idle} 0 0 0 0 0 0" for i, (user, idle) in enumerate(cores)]
+    return "\n".join(lines + ["intr 1 2 3", "ctxt 4"]) + "\n"
+
+
+def pid_stat(pid, name, ppid, ticks, start, rss_pages):
+    fields = ["S", ppid] + [0] * 9 + [ticks, 0] + [0] * 6 + [start, 0, rss_pages, 0]
+    return f"{pid} ({name}) " + " ".join(map(str, fields)) + "\n"
+
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    monkeypatch.setattr(procfs, "PROC", str(tmp_path))
+    (tmp_path / "meminfo").write_text(MEMINFO)
+    return tmp_path
+
+
+def add_process(proc, pid, name, ppid=1, ticks=0, start=100, rss_pages=1, cmdline=b""):
+    directory = proc / str(pid)
+    directory.mkdir(exist_ok=True)
+    (directory / "stat").write_text(pid_stat(pid, name, ppid, ticks, start, rss_pages))
+    (directory / "cmdline").write_bytes(cmdline)
+
+
+def test_reader_returns_bytes_and_length(tmp_path):
+    path = tmp_path / "file"
+    path.write_bytes(b"abc")
+    reader = _Reader(2)
+    assert reader.read_into(str(path)) == 2
+    assert reader.buffer[:2] == b"ab"
+    assert reader.read(str(path)) == b"ab"  # Tronqué à la taille du tampon
+    with pytest.raises(OSError):
+        reader.read(str(tmp_path / "missing"))
+
+
+def test_system_source_cpu_and_memory(proc):
+    (proc / "stat").write_text(cpu_stat((100, 100), (0, 200)))
+    source = ProcfsSystemSource()
+    (proc / "stat").write_text(cpu_stat((150, 150), (100, 200)))
+    percpu, ram, swap = source.read()
+    assert percpu == [50.0, 100.0]
+    assert (ram, swap) == (75.0, 25.0)
+
+
+def test_process_names_with_spaces_and_parentheses(proc):
+    add_process(proc, 42, "odd) name", ppid=7, rss_pages=3, cmdline=b"odd\0--flag\0")
+    (proc / "self").mkdir()
+    rows = ProcfsProcessSource().read()
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row.pid, row.ppid, row.name, row.cmdline) == (42, 7, "odd) name", "odd --flag")
+    assert row.rss == 3 * os.sysconf("SC_PAGE_SIZE")
+
+
+def test_truncated_name_is_completed_from_the_command_line(proc):
+    add_process(proc, 5, "a-very-long-pro", cmdline=b"/usr/bin/a-very-long-program\0")
+    assert ProcfsProcessSource().read()[0].name == "a-very-long-program"
+
+
+def test_reused_pid_reads_static_fields_again(proc):
+    source = ProcfsProcessSource()
+    add_process(proc, 9, "first", cmdline=b"first\0")
+    assert source.read()[0].cmdline == "first"
+    add_process(proc, 9, "second", start=200, cmdline=b"second\0")
+    assert source.read()[0].name == "second"
+    (proc / "9" / "stat").unlink()
+    assert source.read() == [] and not source._cache
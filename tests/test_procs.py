@@ -0,0 +1,71 @@
+"""Table des processus : relevés publiés, tri mis en cache, arbre et tailles"""
+from temporalis.procs import ProcessMonitor, ProcessRow, ProcessTree, format_size
+
+
+def row(pid, ppid, cpu=0.0, rss=0):
+    return ProcessRow(pid, ppid, f"p{pid}", "user", "", cpu, rss)
+
+
+ROWS = [row(1, 0, 1.0, 100), row(10, 1, 2.0, 10), row(11, 10, 4.0, 1), row(20, 1, 8.0, 20), row(30, 99, 16.0, 5)]
+
+
+def test_children_follow_parents_in_given_order():
+    tree = ProcessTree(ROWS)
+    assert [(r.row.pid, r.depth) for r in tree.flatten()] == [(1, 0), (10, 1), (11, 2), (20, 1), (30, 0)]
+    assert len(tree) == 5
+
+
+def test_totals_include_descendants():
+    totals = {r.row.pid: (r.cpu, r.rss) for r in ProcessTree(ROWS).flatten()}
+    assert totals[1] == (15.0, 131)
+    assert totals[10] == (6.0, 11)
+    assert totals[30] == (16.0, 5)  # Parent absent du relevé : racine
+
+
+def test_collapsed_node_hides_descendants():
+    flat = ProcessTree(ROWS).flatten(collapsed={10})
+    assert [r.row.pid for r in flat] == [1, 10, 20, 30]
+    node = flat[1]
+    assert node.collapsed and node.has_children and node.cpu == 6.0
+
+
+def test_self_parent_is_a_root():
+    tree = ProcessTree([row(0, 0), row(2, 0)])
+    assert [(r.row.pid, r.depth) for r in tree.flatten()] == [(0, 0), (2, 1)]
+
+
+class FakeSource:
+    name = "fake"
+
+    def __init__(self, *readings):
+        self.readings = iter(readings)
+
+    def read(self):
+        return next(self.readings)
+
+
+def test_sorted_rows_are_cached_until_the_next_reading():
+    monitor = ProcessMonitor(source=FakeSource([row(1, 0, 1.0, 30), row(2, 0, 5.0, 10)], [row(3, 0, 9.0, 20)]))
+    monitor.sample()
+    by_cpu = monitor.sorted_rows("cpu")
+    assert [r.pid for r in by_cpu] == [2, 1]
+    assert monitor.sorted_rows("cpu") is by_cpu
+    assert [r.pid for r in monitor.sorted_rows("mem")] == [1, 2]
+    monitor.sample()
+    assert [r.pid for r in monitor.sorted_rows("mem")] == [3]
+    assert monitor.generation == 2
+
+
+def test_faster_interval_wakes_the_thread():
+    monitor = ProcessMonitor(interval=5.0, source=FakeSource())
+    monitor.set_interval(10.0)
+    assert not monitor._wake.is_set()
+    monitor.set_interval(1.0)
+    assert monitor._wake.is_set()
+
+
+def test_format_size():
+    assert format_size(512) == "512B"
+    assert format_size(1536) == "1.5K"
+    assert format_size(20 * 1024 ** 2) == "20M"
+    assert format_size(3 * 1024 ** 5) == "3072T"
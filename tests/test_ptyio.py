@@ -0,0 +1,48 @@
+"""Lecture du PTY : tout ce qui est disponible, UTF-8 coupé entre deux lectures, fin du shell"""
+import os
+
+import pytest
+
+from temporalis.ptyio import PtyReader
+
+
+@pytest.fixture
+def pipe():
+    read_fd, write_fd = os.pipe()
+    os.set_blocking(read_fd, False)
+    yield read_fd, write_fd
+    for fd in (read_fd, write_fd):
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def test_character_split_between_reads(pipe):
+    read_fd, write_fd = pipe
+    reader = PtyReader(read_fd)
+    data = "é😀".encode()
+    os.write(write_fd, data[:3])  # é puis le premier octet de l'emoji
+    assert reader.read() == ("é", False)
+    assert bytes(reader.raw) == data[:3]
+    assert reader.pending() == data[2:3]  # Gardé pour les images clés de l'enregistrement
+    os.write(write_fd, data[3:])
+    assert reader.read() == ("😀", False)
+    assert reader.read() == ("", False)  # Rien de disponible : pas de blocage
+
+
+def test_drain_stops_at_the_limit(pipe):
+    read_fd, write_fd = pipe
+    reader = PtyReader(read_fd, limit=10)
+    os.write(write_fd, b"x" * 25)
+    assert reader.read() == ("x" * 10, False)
+    assert reader.read()[0] == "x" * 10
+    assert (reader.bytes_read, reader.reads) == (20, 2)
+
+
+def test_end_of_file_flushes_an_incomplete_character(pipe):
+    read_fd, write_fd = pipe
+    reader = PtyReader(read_fd)
+    os.write(write_fd, "😀".encode()[:2])
+    os.close(write_fd)
+    assert reader.read() == ("�", True)
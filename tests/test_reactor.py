@@ -0,0 +1,62 @@
+"""Réacteur : lecture et écriture sur un même descripteur, minuteries, appels depuis un autre thread"""
+import os
+import threading
+
+import pytest
+
+from temporalis.reactor import Reactor
+
+
+@pytest.fixture
+def reactor():
+    reactor = Reactor()
+    yield reactor
+    reactor.close()
+
+
+def test_reader_and_writer_on_same_fd(reactor):
+    a, b = os.pipe()
+    calls = []
+    try:
+        reactor.add_writer(b, lambda: calls.append("w") or reactor.remove_writer(b))
+        reactor.add_reader(a, lambda: calls.append(os.read(a, 10)))
+        reactor.run_once(0)
+        assert calls == ["w"]
+        os.write(b, b"x")
+        reactor.run_once(0)
+        reactor.remove_reader(a)
+        reactor.run_once(0)
+        assert calls == ["w", b"x"]
+    finally:
+        os.close(a)
+        os.close(b)
+
+
+def test_timers_fire_in_deadline_order_and_can_be_cancelled(reactor):
+    calls = []
+    reactor.call_later(0.02, lambda: calls.append("late"))
+    reactor.call_later(0, lambda: calls.append("soon"))
+    reactor.call_later(0, lambda: calls.append("cancelled")).cancel()
+    while len(calls) < 2:
+        reactor.run_once(1.0)
+    assert calls == ["soon", "late"]
+    assert reactor._next_timeout() is None
+
+
+def test_repeating_timer_is_rescheduled(reactor):
+    calls = []
+    timer = reactor.call_every(0.001, lambda: calls.append(1))
+    while len(calls) < 3:
+        reactor.run_once()  # Attend la prochaine échéance
+    timer.cancel()
+    reactor.run_once(0.01)
+    assert calls == [1, 1, 1]
+
+
+def test_call_soon_threadsafe_wakes_the_loop(reactor):
+    calls = []
+    thread = threading.Thread(target=reactor.call_soon_threadsafe, args=(lambda: calls.append("t"),))
+    thread.start()
+    thread.join()
+    reactor.run_once(1.0)  # Réveillé par le self-pipe, sans attendre la seconde
+    assert calls == ["t"]
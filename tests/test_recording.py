@@ -0,0 +1,187 @@
+"""Enregistrement et lecture : événements, images clés, index reconstruit et export asciicast"""
+import codecs
+import io
+import json
+
+import pytest
+
+from temporalis.recording import (FOOTER, INPUT, KEYFRAME, OUTPUT, RESIZE_EVENT, Recorder, Recording,
+                                  RecordingError, export_asciicast)
+from temporalis.replay import Player
+from temporalis.vt import Screen
+
+
+class FakeSession:
+    """Ce que le Recorder lit d'une session : son numéro, son écran et l'état de son décodeur"""
+
+    def __init__(self, number, rows=4, cols=20):
+        self.number = number
+        self.screen = Screen(rows, cols)
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.reader = self
+
+    def pending(self):
+        return self.decoder.getstate()[0]
+
+    def output(self, recorder, data):
+        """Comme Session.read : décodé, donné à l'écran, puis enregistré brut"""
+        data = data.encode() if isinstance(data, str) else data
+        self.screen.feed(self.decoder.decode(data))
+        recorder.output(self, data)
+
+
+def record(path, keyframe_interval=1000.0):
+    recorder = Recorder(str(path), keyframe_interval)
+    session = FakeSession(1)
+    recorder.keyframe(session)
+    return recorder, session
+
+
+def test_events_round_trip(tmp_path):
+    recorder, session = record(tmp_path / "rec")
+    session.output(recorder, "$ ls\r\n")
+    recorder.input(session, b"ls\r")
+    session.screen.resize(5, 30)
+    recorder.resize(session)
+    recorder.close()
+
+    recording = Recording(str(tmp_path / "rec"))
+    kinds = [(kind, number, bytes(data)) for kind, number, _, _, data in recording.events()]
+    recording.close()
+    assert [kind for kind, _, _ in kinds] == [RESIZE_EVENT, KEYFRAME, OUTPUT, INPUT, RESIZE_EVENT]
+    assert kinds[2][2] == b"$ ls\r\n" and kinds[3][2] == b"ls\r"
+    assert recording.sessions == [1]
+    assert len(recording.index) == 1
+
+
+def test_index_is_rebuilt_without_footer(tmp_path):
+    path = tmp_path / "rec"
+    recorder, session = record(path)
+    session.output(recorder, "avant\r\n")
+    recorder.keyframe(session)
+    session.output(recorder, "après\r\n")
+    recorder.close()
+    closed = Recording(str(path))
+    index = closed.index
+    events = [(kind, bytes(data)) for kind, _, _, _, data in closed.events()]
+    closed.close()
+
+    # Interface tuée : ni index ni fin, et un dernier événement tronqué
+    with open(path, "rb") as f:
+        data = f.read()
+    _, index_position = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+    with open(path, "wb") as f:
+        f.write(data[:index_position] + data[index_position:index_position + 5])
+    killed = Recording(str(path))
+    assert killed.index == index
+    assert [(kind, bytes(data)) for kind, _, _, _, data in killed.events()] == events
+    killed.close()
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"hello world")
+    with pytest.raises(RecordingError):
+        Recording(str(path))
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+    with pytest.raises(RecordingError):
+        Recording(str(empty))
+
+
+def test_player_seek_matches_live_screen(tmp_path):
+    path = tmp_path / "rec"
+    recorder, session = record(path, keyframe_interval=0.0)  # Une image clé à chaque sortie
+    screens = []
+    for i in range(30):
+        session.output(recorder, f"\x1b[3{i % 8}mligne {i}\x1b[0m 中文\r\n")
+        screens.append(session.screen.display())
+    recorder.close()
+
+    recording = Recording(str(path))
+    assert len(recording.index) > 10
+    events = [when for kind, _, when, _, _ in recording.events() if kind == OUTPUT]
+    player = Player(recording, 1)
+    for i in (0, 12, 29, 5):
+        player.seek(events[i])
+        assert player.screen.display() == screens[i]
+    player.close()
+    recording.close()
+
+
+def test_export_asciicast(tmp_path):
+    path = tmp_path / "rec"
+    recorder, session = record(path)
+    session.output(recorder, "é")
+    session.output(recorder, "中".encode()[:2])  # Caractère coupé entre deux lectures
+    session.output(recorder, "中".encode()[2:])
+    recorder.input(session, b"q")
+    recorder.close()
+
+    recording = Recording(str(path))
+    out = io.StringIO()
+    export_asciicast(recording, 1, out)
+    recording.close()
+    header, *events = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert (header["version"], header["width"], header["height"]) == (2, 20, 4)
+    assert [(kind, text) for _, kind, text in events] == [("o", "é"), ("o", "中"), ("i", "q")]
+
+
+def test_footer_gives_duration_and_sessions_without_reading_events(tmp_path, monkeypatch):
+    path = tmp_path / "rec"
+    recorder, session = record(path)
+    other = FakeSession(3)
+    recorder.keyframe(other)
+    session.output(recorder, "fin\r\n")
+    recorder.close()
+    scanned = Recording(str(path))
+    expected = (scanned.duration, scanned.sessions, scanned.index)
+    scanned.close()
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("événements relus à l'ouverture")
+
+    monkeypatch.setattr(Recording, "events", no_scan)
+    recording = Recording(str(path))
+    assert (recording.duration, recording.sessions, recording.index) == expected
+    assert recording.sessions == [1, 3] and recording.duration > 0
+    recording.close()
+
+
+def test_footer_and_rebuilt_summary_agree(tmp_path):
+    path = tmp_path / "rec"
+    recorder, session = record(path)
+    session.output(recorder, "a\r\n")
+    recorder.close()
+    closed = Recording(str(path))
+    summary = (closed.duration, closed.sessions)
+    closed.close()
+
+    with open(path, "rb") as f:
+        data = f.read()
+    _, index_position = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+    with open(path, "wb") as f:
+        f.write(data[:index_position])
+    killed = Recording(str(path))
+    assert (killed.duration, killed.sessions) == summary
+    killed.close()
+
+
+def test_keyframe_keeps_a_character_split_between_reads(tmp_path):
+    path = tmp_path / "rec"
+    recorder, session = record(path)
+    data = "中文".encode()
+    session.output(recorder, data[:4])
+    recorder.keyframe(session)  # Le décodeur attend encore la fin de 文
+    session.output(recorder, data[4:])
+    live = session.screen.display()
+    recorder.close()
+
+    recording = Recording(str(path))
+    player = Player(recording, 1)
+    player.seek(recording.duration)
+    assert recording.seek(recording.duration, 1) == recording.index[-1][2]  # Reprise à la seconde image clé
+    assert player.screen.display() == live
+    assert "文" in player.screen.display()[0]
+    player.close()
+    recording.close()
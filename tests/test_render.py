@@ -0,0 +1,114 @@
+"""Rendu groupé : lignes réécrites, demandes de dessin regroupées et limite d'images par seconde"""
+import pytest
+
+from temporalis import render
+from temporalis.render import Panel, Renderer
+
+
+class FakeWindow:
+    def __init__(self, height, width):
+        self.size = (height, width)
+        self.written = []
+        self.refreshes = 0
+
+    def getmaxyx(self):
+        return self.size
+
+    def addstr(self, y, x, text, attr=0):
+        self.written.append((y, text))
+
+    def attron(self, attr):
+        pass
+
+    def attroff(self, attr):
+        pass
+
+    def box(self):
+        pass
+
+    def noutrefresh(self):
+        self.refreshes += 1
+
+
+class FakeTimer:
+    def __init__(self, delay, callback):
+        self.delay = delay
+        self.callback = callback
+
+
+class FakeReactor:
+    def __init__(self):
+        self.timers = []
+
+    def call_later(self, delay, callback):
+        timer = FakeTimer(delay, callback)
+        self.timers.append(timer)
+        return timer
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(render.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(render.curses, "doupdate", lambda: None, raising=False)
+    return now
+
+
+def panel(renderer, height=5, width=12):
+    window = FakeWindow(height, width)
+    result = Panel(window, "Test", renderer, attr=0)
+    window.written.clear()
+    return result
+
+
+def test_only_changed_lines_are_rewritten(clock):
+    output = panel(Renderer())
+    output.update(["one", "two", "three"])
+    assert [y for y, _ in output.window.written] == [1, 2, 3]
+    output.window.written.clear()
+    output.update(["one", "2", "three"])
+    assert output.window.written == [(2, "2".ljust(10))]
+
+
+def test_unchanged_frame_stages_nothing(clock):
+    renderer = Renderer()
+    output = panel(renderer)
+    output.update(["a"])
+    renderer.flush()
+    output.update(["a"])
+    assert not renderer._staged
+
+
+def test_repeated_requests_draw_once_per_frame(clock):
+    reactor = FakeReactor()
+    renderer = Renderer(reactor, max_fps=10)
+    output = panel(renderer)
+    renderer.flush()
+    reactor.timers.clear()
+    draws = []
+
+    def draw():
+        draws.append(len(draws))
+        output.update([str(len(draws))])
+
+    for _ in range(5):
+        renderer.request(draw)
+    assert len(reactor.timers) == 1
+    reactor.timers[0].callback()
+    assert draws == [0]
+    assert output.window.refreshes == 2
+    assert renderer.frames == 2
+
+
+def test_frames_are_capped(clock):
+    reactor = FakeReactor()
+    renderer = Renderer(reactor, max_fps=10)
+    output = panel(renderer)
+    reactor.timers[0].callback()  # Première image : la bordure
+    clock[0] += 0.03
+    output.update(["x"])
+    assert reactor.timers[1].delay == pytest.approx(0.07)  # Reste de l'intervalle de 0,1 s
+    clock[0] += 0.5
+    reactor.timers[1].callback()
+    output.update(["y"])
+    assert reactor.timers[2].delay == pytest.approx(0.1)
@@ -0,0 +1,106 @@
+"""Rythme des tâches : ralentissement sans changement ou au repos, reprise, focus et budget"""
+import pytest
+
+from temporalis import scheduler as scheduler_module
+from temporalis.scheduler import Scheduler, read_config
+
+
+class FakeTimer:
+    def __init__(self, delay, callback):
+        self.delay = delay
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class FakeReactor:
+    """Garde les minuteries planifiées sans les exécuter : le test appelle lui-même `job.timer.callback`"""
+
+    def __init__(self):
+        self.timers = []
+
+    def call_later(self, delay, callback):
+        timer = FakeTimer(delay, callback)
+        self.timers.append(timer)
+        return timer
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scheduler_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def run(job):
+    job.timer.callback()
+    return job.interval
+
+
+def test_unchanged_job_backs_off_to_max(clock):
+    results = iter([False] * 10)
+    scheduler = Scheduler(FakeReactor(), idle_after=100)
+    job = scheduler.add("files", lambda: next(results), 1, max_interval=5)
+    assert [run(job) for _ in range(4)] == [2, 4, 5, 5]
+    assert job.timer.delay == 5
+
+
+def test_change_restores_base_interval(clock):
+    results = iter([False, False, True])
+    scheduler = Scheduler(FakeReactor(), idle_after=100)
+    job = scheduler.add("files", lambda: next(results), 1, max_interval=10)
+    assert [run(job) for _ in range(3)] == [2, 4, 1]
+
+
+def test_idle_slows_everything_and_key_recovers(clock):
+    reactor = FakeReactor()
+    scheduler = Scheduler(reactor, idle_after=30)
+    job = scheduler.add("processes", lambda: True, 1, max_interval=30)
+    assert run(job) == 1
+    clock[0] += 31
+    assert [run(job) for _ in range(3)] == [2, 4, 8]
+    assert scheduler.idle
+    slow_timer = job.timer
+    scheduler.activity()
+    assert not scheduler.idle and job.interval == 1
+    assert slow_timer.cancelled and job.timer.delay == 0  # Données datées : passage immédiat
+
+
+def test_focused_job_keeps_base_interval(clock):
+    scheduler = Scheduler(FakeReactor(), idle_after=30)
+    job = scheduler.add("io", lambda: False, 1, max_interval=10)
+    scheduler.activity(focus="io")
+    clock[0] += 60
+    assert [run(job) for _ in range(3)] == [1, 1, 1]
+    assert scheduler.summary() == "Idle io1"
+
+
+def test_budget_spaces_expensive_job(clock):
+    scheduler = Scheduler(FakeReactor(), idle_after=100)
+    job = scheduler.add("processes", lambda: True, 1, budget=0.01)
+    job.charge(0.05)  # Relevé de 50 ms payé dans un thread de fond
+    assert run(job) == pytest.approx(5.0, rel=0.05)
+
+
+def test_read_config(tmp_path):
+    path = tmp_path / "temporalis.ini"
+    path.write_text("[refresh]\nidle_after = 10\n\n[refresh.files]\ninterval = 2\nmax_interval = 20\n")
+    rates, idle_after, backoff = read_config(str(path), {"files": {"interval": 1, "max_interval": 10}})
+    assert rates["files"] == {"interval": 2.0, "max_interval": 20.0, "budget": None}
+    assert (idle_after, backoff) == (10.0, scheduler_module.BACKOFF)
+    assert read_config(str(tmp_path / "absent.ini"), rates)[0] == rates
+
+
+@pytest.mark.parametrize("text", [
+    "[refresh.unknown]\ninterval = 1\n",
+    "[refresh.files]\ninterval = fast\n",
+    "[refresh.files]\ninterval = 0\n",
+    "[refresh]\nbackoff = -1\n",
+])
+def test_read_config_rejects_bad_values(tmp_path, text):
+    path = tmp_path / "temporalis.ini"
+    path.write_text(text)
+    with pytest.raises(ValueError, match="temporalis.ini"):
+        read_config(str(path), {"files": {"interval": 1}})
@@ -0,0 +1,48 @@
+"""Historique circulaire : numérotation absolue, éviction et fenêtre visible"""
+import pytest
+
+from temporalis.scrollback import Scrollback
+
+
+def test_append_and_index():
+    history = Scrollback(5)
+    history.extend(["a", "b", "c"])
+    assert len(history) == 3
+    assert (history[0], history[-1]) == ("a", "c")
+    assert (history.first_index, history.total) == (0, 3)
+
+
+def test_eviction_keeps_absolute_numbers():
+    history = Scrollback(3)
+    history.extend(str(i) for i in range(10))
+    assert list(history.window(3)) == ["7", "8", "9"]
+    assert (history.first_index, history.total) == (7, 10)
+    assert history.get(8) == "8"
+    assert history.get(6) is None
+    with pytest.raises(IndexError):
+        history[3]
+
+
+def test_window_offset_is_clamped():
+    history = Scrollback(100)
+    history.extend(str(i) for i in range(10))
+    assert history.window(3) == ["7", "8", "9"]
+    assert history.window(3, offset=2) == ["5", "6", "7"]
+    assert history.window(3, offset=50) == ["0", "1", "2"]
+    assert history.window(20) == [str(i) for i in range(10)]
+
+
+def test_long_lines_are_truncated():
+    history = Scrollback(2, max_line_length=4)
+    history.append("abcdefgh")
+    assert history[0] == "abcd"
+
+
+def test_clear_continues_numbering():
+    history = Scrollback(5)
+    history.extend(["a", "b"])
+    history.clear()
+    history.append("c")
+    assert len(history) == 1
+    assert history.get(2) == "c"
+    assert history.get(0) is None
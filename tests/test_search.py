@@ -0,0 +1,97 @@
+"""Recherche dans l'historique : parcours par tranches, affinage et lignes évincées"""
+from temporalis.scrollback import Scrollback
+from temporalis.search import SCAN_BLOCK, ScrollbackSearch
+from temporalis.vt import Screen
+
+
+def history_of(lines, capacity=100000):
+    history = Scrollback(capacity)
+    history.extend(lines)
+    return history
+
+
+def run(search):
+    while search.step():
+        pass
+    return search
+
+
+def fresh(history, pattern):
+    return run(ScrollbackSearch(history, pattern)).matches
+
+
+LINES = [f"{'error' if i % 3 == 0 else 'info'} {i} {'disk' if i % 5 == 0 else 'net'}" for i in range(4 * SCAN_BLOCK)]
+
+
+def test_finds_all_lines_in_order():
+    history = history_of(LINES)
+    assert fresh(history, "error disk") == []
+    matches = fresh(history, "disk")
+    assert matches == [i for i in range(len(LINES)) if i % 5 == 0]
+
+
+def test_step_is_incremental():
+    history = history_of(LINES)
+    search = ScrollbackSearch(history, "error")
+    assert search.step(budget=0)  # Une seule tranche lue
+    assert search.pending
+    assert search.scanned == SCAN_BLOCK
+    run(search)
+    assert not search.pending
+    assert search.matches == fresh(history, "error")
+
+
+def test_ignore_case_only_for_lowercase_pattern():
+    history = history_of(["Error", "error"])
+    assert fresh(history, "error") == [0, 1]
+    assert fresh(history, "Error") == [0]
+
+
+def test_narrowing_a_finished_search():
+    history = history_of(LINES)
+    search = run(ScrollbackSearch(history, "err"))
+    narrowed = run(ScrollbackSearch(history, "error 3", previous=search))
+    assert narrowed.matches == fresh(history, "error 3")
+
+
+def test_narrowing_an_unfinished_search_keeps_unchecked_lines():
+    history = history_of(LINES)
+    first = run(ScrollbackSearch(history, "e"))
+    # Affinage interrompu après une tranche : une partie des candidats n'a pas été relue
+    second = ScrollbackSearch(history, "er", previous=first)
+    second.step(budget=0)
+    assert second.pending
+    third = run(ScrollbackSearch(history, "err", previous=second))
+    assert third.matches == fresh(history, "err")
+    # Le parcours de l'historique lui-même était aussi inachevé
+    partial = ScrollbackSearch(history, "in")
+    partial.step(budget=0)
+    assert run(ScrollbackSearch(history, "inf", previous=partial)).matches == fresh(history, "inf")
+
+
+def test_regex_and_invalid_pattern():
+    history = history_of(LINES)
+    assert run(ScrollbackSearch(history, r"^info 1\d ", regex=True)).matches == [10, 11, 13, 14, 16, 17, 19]
+    broken = ScrollbackSearch(history, "(", regex=True)
+    assert broken.error and not broken.active and not broken.step()
+
+
+def test_new_output_and_evicted_lines():
+    history = history_of(["match 0", "other"], capacity=4)
+    search = run(ScrollbackSearch(history, "match"))
+    assert search.matches == [0]
+    history.extend(["match 2", "other", "match 4"])  # La ligne 0 est évincée
+    run(search)
+    assert search.matches == [2, 4]
+
+
+def test_screen_lines_follow_scrollback_numbers():
+    history = history_of(["match a", "b"])
+    screen = Screen(2, 10)
+    screen.feed("x\r\nmatch c")
+    search = run(ScrollbackSearch(history, "match"))
+    assert search.positions(screen) == [0, 3]
+    assert search.move(screen, 1) == 3  # La plus récente d'abord
+    assert search.move(screen, -1) == 0
+    assert search.move(screen, -1) == 0
+    assert search.describe(screen) == " [/match 1/2]"
@@ -0,0 +1,103 @@
+"""Sessions : écritures vers le shell (PTY plein, collage volumineux, shell terminé) et fin des programmes"""
+import os
+import shutil
+import time
+
+import pytest
+
+from temporalis.reactor import Reactor
+from temporalis.session import Session
+
+pytestmark = pytest.mark.skipif(shutil.which("sh") is None, reason="pas de /bin/sh")
+
+
+@pytest.fixture
+def reactor():
+    reactor = Reactor()
+    yield reactor
+    reactor.close()
+
+
+@pytest.fixture
+def session(reactor):
+    session = Session(1, 24, 80, "sh", scrollback_lines=1000, shell_hook=False)
+    session.on_write_pending = lambda s: reactor.add_writer(s.fd, lambda: s.flush() and reactor.remove_writer(s.fd))
+    reactor.add_reader(session.fd, session.read)
+    yield session
+    reactor.remove_reader(session.fd)
+    reactor.remove_writer(session.fd)
+    session.close()
+
+
+def shown(session):
+    return [session.scrollback[i] for i in range(len(session.scrollback))] + session.screen.display()
+
+
+def wait_for(reactor, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        reactor.run_once(0.05)
+    return condition()
+
+
+def test_large_paste_is_written_completely(reactor, session):
+    session.write(b"stty -echo; wc -c\n")
+    lines = 3000
+    session.write((b"x" * 99 + b"\n") * lines)
+    assert session._pending  # Plus que ce que le PTY accepte d'un coup
+    session.write(b"\x04")
+    expected = str(100 * lines)
+    # L'écho des premières lignes (avant `stty -echo`) peut précéder le compte sur la même ligne
+    assert wait_for(reactor, lambda: any(line.endswith(expected) for line in shown(session)))
+    assert not session._pending
+
+
+def test_write_after_shell_exit_ends_session(reactor, session):
+    hangups = []
+    session.on_hangup = hangups.append
+    session.write(b"exit\n")
+    assert wait_for(reactor, lambda: not session.read())
+    os.close(session.fd)  # Comme après la fermeture du PTY par l'interface
+    session.write(b"echo\n")
+    session.write(b"echo\n")
+    assert hangups == [session]
+    assert session.hung_up and not session._pending
+
+
+def test_stray_command_end_does_not_end_the_program(session):
+    done = []
+    session.on_command_done = done.append
+    session.run_program("true")
+    session._on_osc("133", "D;0")  # Prompt précédent, encore en cours d'affichage
+    assert session.program == "true" and not done
+    session._on_osc("133", "C")
+    session._on_osc("133", "D;0")
+    assert session.program is None and done == [session]
+
+
+def test_program_end_without_hook_follows_the_foreground_group(reactor, session):
+    done = []
+    session.on_command_done = done.append
+    session.run_program("sh -c 'echo started; sleep 0.3'")
+    assert wait_for(reactor, lambda: session._program_foreground)
+    assert session.program == "sh"
+    assert wait_for(reactor, lambda: session.program is None)
+    assert done == [session]
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="pas de bash")
+def test_program_end_with_the_bash_hook(reactor, tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))  # Sans le ~/.bashrc de l'utilisateur
+    session = Session(1, 24, 80, "bash", scrollback_lines=1000)
+    session.on_write_pending = lambda s: reactor.add_writer(s.fd, lambda: s.flush() and reactor.remove_writer(s.fd))
+    reactor.add_reader(session.fd, session.read)
+    try:
+        assert wait_for(reactor, lambda: session.tracker.hooked)  # Premier prompt
+        session.run_program("sleep 0.2")
+        assert session.program == "sleep"
+        assert wait_for(reactor, lambda: session.program is None)
+        assert session._command_marks >= 1
+    finally:
+        reactor.remove_reader(session.fd)
+        reactor.remove_writer(session.fd)
+        session.close()
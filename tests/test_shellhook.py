@@ -0,0 +1,52 @@
+"""Intégration shell : répertoire courant par OSC 7 (machine vérifiée), code de sortie et repli par sondage"""
+import os
+
+from temporalis import shellhook
+from temporalis.shellhook import CwdTracker, prepare_shell
+
+
+def tracker(tmp_path):
+    return CwdTracker(os.getpid(), cwd=str(tmp_path))
+
+
+def test_osc7_from_this_host_changes_directory(tmp_path):
+    cwd = tracker(tmp_path)
+    host = os.uname().nodename
+    assert cwd.on_osc("7", f"file://{host}/tmp/a%20b")
+    assert (cwd.cwd, cwd.hooked) == ("/tmp/a b", True)
+    assert not cwd.on_osc("7", f"file://{host}/tmp/a%20b")  # Même répertoire : pas d'événement
+    assert cwd.on_osc("7", "file:///srv")
+    assert cwd.on_osc("7", "file://localhost/opt")
+    assert cwd.cwd == "/opt"
+
+
+def test_osc7_from_another_host_is_ignored(tmp_path):
+    cwd = tracker(tmp_path)
+    assert not cwd.on_osc("7", "file://remote.example/home/me")
+    assert not cwd.on_osc("7", "http://localhost/x")
+    assert (cwd.cwd, cwd.hooked) == (str(tmp_path), False)
+
+
+def test_exit_status(tmp_path):
+    cwd = tracker(tmp_path)
+    cwd.on_osc("133", "D;3")
+    assert cwd.exit_status == 3
+    cwd.on_osc("133", "D")
+    assert cwd.exit_status == 0
+
+
+def test_poll_reads_the_process_directory_until_hooked(tmp_path, monkeypatch):
+    cwd = tracker(tmp_path)
+    monkeypatch.setattr(shellhook, "process_cwd", lambda pid, procfs=True: "/var")
+    assert cwd.poll() and cwd.cwd == "/var"
+    assert not cwd.poll()
+    cwd.on_osc("7", "file:///etc")
+    monkeypatch.setattr(shellhook, "process_cwd", lambda pid, procfs=True: "/usr")
+    assert not cwd.poll() and cwd.cwd == "/etc"
+
+
+def test_unknown_shells_start_without_hook():
+    assert prepare_shell("/bin/sh")[0] == ["/bin/sh"]
+    argv, _ = prepare_shell("/bin/bash")
+    assert argv[1] == "--rcfile" and os.path.exists(argv[2])
+    assert prepare_shell("/bin/bash", enabled=False)[0] == ["/bin/bash"]
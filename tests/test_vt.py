@@ -0,0 +1,139 @@
+"""Émulateur VT : texte, caractères larges, effacements et découpage du flux"""
+import pytest
+
+from temporalis.scrollback import Scrollback
+from temporalis.vt import BG_MASK, BG_SHIFT, BOLD, FG_MASK, Screen
+
+
+def feed(chunks, rows=3, cols=10, scrollback=None):
+    screen = Screen(rows, cols, scrollback)
+    for chunk in chunks:
+        screen.feed(chunk)
+    return screen
+
+
+def state(screen):
+    return screen.chars, screen.attrs, screen.cursor_y, screen.cursor_x
+
+
+def test_plain_text_and_newlines():
+    screen = feed(["hello\r\nworld"])
+    assert screen.display() == ["hello", "world", ""]
+    assert (screen.cursor_y, screen.cursor_x) == (1, 5)
+
+
+def test_scrolled_lines_go_to_scrollback():
+    history = Scrollback(10)
+    screen = feed(["".join(f"line {i}\r\n" for i in range(5))], scrollback=history)
+    assert list(history.window(10)) == ["line 0", "line 1", "line 2"]
+    assert screen.display() == ["line 3", "line 4", ""]
+
+
+def test_autowrap_and_wide_char_at_edge():
+    screen = feed(["abcd中"], cols=5)
+    # Le caractère large ne tient pas dans la dernière colonne : il passe à la ligne suivante
+    assert screen.chars[0] == list("abcd ")
+    assert screen.chars[1][:2] == ["中", ""]
+
+
+@pytest.mark.parametrize("data, cols", [
+    ("\x1b[?7l😀x", 2),
+    ("\x1b[?7lab中x", 4),
+    ("\x1b[?7l中中xyz", 3),
+    ("\x1b[1;31mré\x1b[0msumé 中文 😀\r\n\x1b[44mfin\x1b[K", 6),
+])
+def test_chunking_does_not_change_cells(data, cols):
+    whole = feed([data], cols=cols)
+    for size in (1, 2, 3):
+        chunked = feed([data[i:i + size] for i in range(0, len(data), size)], cols=cols)
+        assert state(chunked) == state(whole)
+
+
+def test_no_autowrap_overwrites_wide_char_in_last_columns():
+    screen = feed(["\x1b[?7l😀", "x"], rows=1, cols=2)
+    assert screen.chars[0] == [" ", "x"]
+
+
+def test_combining_accent_joins_previous_cell():
+    screen = feed(["e", "́中́"], rows=1)
+    assert screen.chars[0][:3] == ["é", "中́", ""]
+
+
+def test_sgr_colors_and_reset():
+    screen = feed(["\x1b[1;31;44mA\x1b[0mB"], rows=1)
+    bold_red_on_blue = screen.attrs[0][0]
+    assert bold_red_on_blue & BOLD
+    assert bold_red_on_blue & FG_MASK == 2  # Rouge (31) + 1
+    assert (bold_red_on_blue & BG_MASK) >> BG_SHIFT == 5  # Bleu (44) + 1
+    assert screen.attrs[0][1] == 0
+
+
+@pytest.mark.parametrize("sequence, expected", [
+    ("\x1b[1;3H\x1b[2@", "ab  cdef"),
+    ("\x1b[1;3H\x1b[2P", "abef"),
+])
+def test_insert_delete_chars_fill_with_background_only(sequence, expected):
+    screen = feed(["abcdef", "\x1b[1;4;31;42m", sequence], rows=1, cols=8)
+    assert screen.line(0) == expected
+    blank = screen.attr & BG_MASK
+    new_cells = [2, 3] if "@" in sequence else [6, 7]
+    assert [screen.attrs[0][x] for x in new_cells] == [blank, blank]
+
+
+def test_erase_line_keeps_background():
+    screen = feed(["abcdef\x1b[1;3H\x1b[44;1m\x1b[K"], rows=1)
+    assert screen.line(0) == "ab"
+    assert set(screen.attrs[0][2:]) == {screen.attr & BG_MASK}
+
+
+def test_snapshot_rebuilds_screen():
+    screen = feed(["\x1b[32mvert\x1b[0m\r\n中文\x1b[?7l\x1b[2;3H"], cols=6)
+    copy = feed([screen.snapshot()], cols=6)
+    assert state(copy) == state(screen)
+    assert copy.autowrap is False
+
+
+def test_alternate_screen_restores_main_screen():
+    screen = feed(["main", "\x1b[?1049h", "full screen", "\x1b[?1049l"])
+    assert screen.display()[0] == "main"
+
+
+def test_replies_to_cursor_position_report():
+    screen = feed(["ab\x1b[6n"])
+    assert screen.replies == ["\x1b[1;3R"]
+
+
+def test_repeat_count_is_capped_to_one_screen():
+    screen = feed(["x\x1b[999999999b"], rows=2, cols=4)
+    assert screen.display() == ["xxxx", "x"]
+
+
+@pytest.mark.parametrize("sequence", ["\x1b[2M", "\x1b[2S"])
+def test_deleted_lines_do_not_go_to_scrollback(sequence):
+    history = Scrollback(10)
+    screen = feed(["one\r\ntwo\r\nthree\x1b[H", sequence], scrollback=history)
+    assert len(history) == 0
+    assert screen.display() == ["three", "", ""]
+
+
+@pytest.mark.parametrize("data", [
+    "\x1b[01;34mdir\x1b[0m  file\tx\r\n" * 7,
+    "ファイル 😀 é́\r\n" * 5 + "abc",
+    "a\tb\x1b[44m\x1b[K\r\nxyzwxyzwxyz\x1b[1K\r\n" * 4,
+])
+def test_line_blocks_match_character_by_character_feed(data):
+    bulk_history, slow_history = Scrollback(100), Scrollback(100)
+    bulk = feed([data[:len(data) // 2 + 3], data[len(data) // 2 + 3:]], rows=3, cols=7, scrollback=bulk_history)
+    slow = feed(list(data), rows=3, cols=7, scrollback=slow_history)
+    assert state(bulk) == state(slow)
+    assert bulk_history.window(100) == slow_history.window(100)
+
+
+def test_lines_scrolled_off_within_one_block_keep_their_text():
+    history = Scrollback(1000)
+    lines = [f"{i}\tcol\x1b[32m{i * 'x'}\x1b[0m" for i in range(20)]
+    screen = feed(["".join(line + "\r\n" for line in lines)], rows=4, cols=16, scrollback=history)
+    expected = [f"{i}".ljust(8) + "col" + "x" * i for i in range(20)]
+    rows = [text[k:k + 16].rstrip() for text in expected for k in range(0, len(text), 16)]
+    assert history.window(1000) + screen.display()[:3] == rows
+    assert screen.dirty == set(range(4))  # Un seul décalage pour tout le bloc